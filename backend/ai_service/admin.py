@@ -1,3 +1,33 @@
 from django.contrib import admin
+from .models import AICallSample, ChunkSummary, TutorSession, TutorTurn
 
-# No models to register for ai_service app
+
+@admin.register(AICallSample)
+class AICallSampleAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'provider', 'endpoint', 'mode', 'outcome', 'error_class', 'fallback', 'latency_ms', 'prompt_tokens', 'completion_tokens']
+    list_filter = ['provider', 'endpoint', 'outcome', 'fallback', 'created_at']
+    search_fields = ['endpoint', 'error_class']
+    readonly_fields = ['created_at']
+
+
+@admin.register(ChunkSummary)
+class ChunkSummaryAdmin(admin.ModelAdmin):
+    list_display = ['content_hash', 'kind', 'created_at', 'last_used_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['content_hash', 'summary']
+    readonly_fields = ['content_hash', 'created_at', 'last_used_at']
+
+
+class TutorTurnInline(admin.TabularInline):
+    model = TutorTurn
+    extra = 0
+    readonly_fields = ['role', 'content', 'created_at']
+
+
+@admin.register(TutorSession)
+class TutorSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'lesson', 'summarized_turns', 'created_at', 'updated_at']
+    list_filter = ['created_at']
+    search_fields = ['user__username', 'lesson__title']
+    readonly_fields = ['summary', 'summarized_turns', 'created_at', 'updated_at']
+    inlines = [TutorTurnInline]
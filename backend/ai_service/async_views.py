@@ -0,0 +1,484 @@
+"""
+Async (ASGI) variants of the AI endpoints.
+
+``acall_ai`` mirrors ``views.call_ai``: same response cache, circuit
+breakers, per-provider limits and single-flight coalescing. OpenRouter
+requests go through the shared httpx client, so one worker can keep many
+provider calls waiting at once. The Gemini SDK is blocking, so Gemini calls
+run on the blocking-work pool (``services.async_api.run_blocking``).
+
+Response cache, circuit breaker and single-flight state live in the shared
+cache, which is a database table when REDIS_URL isn't set, so they are
+reached through the cache's async API or ``sync_to_async``, never called on
+the event loop. Prompts and response shapes come from ``views``, so both
+variants answer identically.
+"""
+
+import asyncio
+import logging
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+
+from courses.segments import parse_timestamp
+from jobs.queue import accepted_payload, enqueue, wants_background
+from services.async_api import async_api_view, run_blocking
+from services.async_http import get_async_client
+from users.metering import ai_metered
+from .cache import response_cache
+from .circuit_breaker import ProviderUnavailableError, breaker_for
+from .concurrency import async_provider_limiter, fanout_workers
+from .models import ChunkSummary, TutorSession
+from .providers import provider_chain
+from .streaming import quiz_sse_response, sse_response, wants_stream
+from .summaries import cached_summaries, chunk_hash, chunk_text_stable, global_hash, store_summaries
+from .telemetry import error_class, note_usage, provider_call, telemetry
+from .tutor_sessions import arecord_stream, get_session, record_exchange
+from .views import (
+    _breaker_failure_kind,
+    _openrouter_request,
+    _openrouter_stream_event,
+    _openrouter_text,
+    _provider_route,
+    ai_flight,
+    call_gemini,
+    chat_prompt,
+    chunk_summary_prompt,
+    explain_prompt,
+    global_summary_prompt,
+    parse_quiz_response,
+    quiz_prompt,
+    stream_gemini,
+    study_plan_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _unreachable(error: Exception) -> requests.exceptions.ConnectionError:
+    # Same error class as the requests-based client, so callers handle both alike
+    return requests.exceptions.ConnectionError(f'OpenRouter unreachable: {error}')
+
+
+async def acall_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400) -> str:
+    """Async OpenRouter completion; returns the response text."""
+    api_url, payload, headers = _openrouter_request(prompt, model_name, max_tokens)
+    try:
+        resp = await get_async_client().post(api_url, json=payload, headers=headers)
+    except httpx.TransportError as e:
+        raise _unreachable(e) from e
+    if resp.status_code >= 400:
+        logger.error("OpenRouter error: %s %s", resp.status_code, resp.text)
+        raise RuntimeError(f'OpenRouter error: {resp.status_code} {resp.text}')
+    data = resp.json()
+    usage = data.get('usage') or {}
+    note_usage(usage.get('prompt_tokens'), usage.get('completion_tokens'))
+    return _openrouter_text(data)
+
+
+async def astream_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
+    """Yield text fragments from OpenRouter's server-sent event stream."""
+    api_url, payload, headers = _openrouter_request(prompt, model_name, max_tokens)
+    payload['stream'] = True
+    try:
+        async with get_async_client().stream('POST', api_url, json=payload, headers=headers) as resp:
+            if resp.status_code >= 400:
+                body = (await resp.aread()).decode('utf-8', errors='replace')
+                logger.error("OpenRouter stream error: %s %s", resp.status_code, body)
+                raise RuntimeError(f'OpenRouter error: {resp.status_code} {body}')
+            async for line in resp.aiter_lines():
+                done, delta = _openrouter_stream_event(line)
+                if done:
+                    break
+                if delta:
+                    yield delta
+    except httpx.TransportError as e:
+        raise _unreachable(e) from e
+
+
+async def acall_gemini(prompt: str, max_output_tokens: int = 400) -> str:
+    return await run_blocking(lambda: call_gemini(prompt, max_output_tokens=max_output_tokens).text)
+
+
+async def astream_gemini(prompt: str, max_output_tokens: int = 400):
+    """Drive the blocking Gemini stream on the blocking-work pool, one fragment at a time."""
+    fragments = stream_gemini(prompt, max_output_tokens=max_output_tokens)
+    while True:
+        fragment = await run_blocking(next, fragments, _DONE)
+        if fragment is _DONE:
+            return
+        yield fragment
+
+
+async def acall_ai(
+    prompt: str,
+    *,
+    max_tokens: int = 400,
+    prefer_openrouter: bool | None = None,
+    endpoint: str | None = None,
+) -> str:
+    """Async counterpart of ``views.call_ai``."""
+    if prefer_openrouter is None:
+        prefer_openrouter = getattr(settings, 'PREFER_OPENROUTER', False)
+
+    cache_key = response_cache.make_key(prompt, _provider_route(prefer_openrouter), max_tokens)
+    ttl = response_cache.ttl_for(endpoint) if response_cache.enabled else 0
+    if ttl > 0:
+        cached = await response_cache.aget(cache_key)
+        if cached is not None:
+            logger.debug("AI response cache hit for %s", endpoint)
+            return cached
+
+    async def compute():
+        text = await _acall_providers(prompt, max_tokens, prefer_openrouter, endpoint)
+        if ttl > 0:
+            await response_cache.aset(cache_key, text, ttl)
+        return text
+
+    return await ai_flight.ado(cache_key, compute)
+
+
+async def _acall_providers(prompt: str, max_tokens: int, prefer_openrouter: bool, endpoint: str | None = None) -> str:
+    """Async provider fallback chain (see ``views._call_providers``)."""
+    chain = provider_chain(prefer_openrouter)
+    error = None
+    previous, fallback_reason = None, None
+    for position, provider in enumerate(chain):
+        breaker = breaker_for(provider.name)
+        if fallback_reason:
+            telemetry.record_fallback(endpoint, previous, provider.name, fallback_reason)
+        previous = provider.name
+        if not await sync_to_async(breaker.allow_request)():
+            logger.debug("%s circuit open, skipping", provider.name)
+            error, fallback_reason = None, 'circuit_open'
+            continue
+        try:
+            async with async_provider_limiter.acquire(provider.name):
+                with provider_call(provider.name, endpoint, prompt, fallback=position > 0) as call:
+                    text = await provider.acomplete(prompt, max_tokens)
+                    call.completed(text)
+        except asyncio.CancelledError:
+            # Client went away mid-call; don't leave a half-open probe slot taken
+            await sync_to_async(breaker.release_probe)()
+            raise
+        except Exception as e:
+            await sync_to_async(breaker.record_failure)(_breaker_failure_kind(e), e)
+            error, fallback_reason = e, error_class(e)
+            if position < len(chain) - 1:
+                if 'GEMINI_QUOTA_EXCEEDED' in str(e):
+                    logger.warning("%s quota exceeded, falling back: %s", provider.name, e)
+                else:
+                    logger.error("%s call failed, falling back: %s", provider.name, e, exc_info=True)
+            continue
+        await sync_to_async(breaker.record_success)()
+        return text
+
+    if error is not None:
+        raise error
+    raise ProviderUnavailableError('AI providers are temporarily unavailable, please retry shortly')
+
+
+async def acall_ai_stream(
+    prompt: str,
+    *,
+    max_tokens: int = 400,
+    prefer_openrouter: bool | None = None,
+    endpoint: str | None = None,
+):
+    """Async counterpart of ``views.call_ai_stream``."""
+    if prefer_openrouter is None:
+        prefer_openrouter = getattr(settings, 'PREFER_OPENROUTER', False)
+
+    ttl = response_cache.ttl_for(endpoint) if response_cache.enabled else 0
+    cache_key = None
+    if ttl > 0:
+        cache_key = response_cache.make_key(prompt, _provider_route(prefer_openrouter), max_tokens)
+        cached = await response_cache.aget(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    chain = provider_chain(prefer_openrouter)
+    error = None
+    previous, fallback_reason = None, None
+    for position, provider in enumerate(chain):
+        breaker = breaker_for(provider.name)
+        if fallback_reason:
+            telemetry.record_fallback(endpoint, previous, provider.name, fallback_reason)
+        previous = provider.name
+        if not await sync_to_async(breaker.allow_request)():
+            error, fallback_reason = None, 'circuit_open'
+            continue
+        try:
+            async with async_provider_limiter.acquire(provider.name):
+                with provider_call(provider.name, endpoint, prompt, mode='stream', fallback=position > 0) as call:
+                    async for fragment in provider.astream(prompt, max_tokens):
+                        parts.append(fragment)
+                        call.completed(fragment)
+                        yield fragment
+        except (GeneratorExit, asyncio.CancelledError):
+            await sync_to_async(breaker.release_probe)()
+            raise
+        except Exception as e:
+            await sync_to_async(breaker.record_failure)(_breaker_failure_kind(e), e)
+            if parts:
+                raise
+            error, fallback_reason = e, error_class(e)
+            if position < len(chain) - 1:
+                logger.warning("%s stream failed before first token, falling back: %s", provider.name, e)
+            continue
+        await sync_to_async(breaker.record_success)()
+        break
+    else:
+        if error is not None:
+            raise error
+        raise ProviderUnavailableError('AI providers are temporarily unavailable, please retry shortly')
+
+    if cache_key:
+        await response_cache.aset(cache_key, ''.join(parts), ttl)
+
+
+def _unavailable(error: Exception) -> JsonResponse:
+    return JsonResponse(
+        {'error': str(error), 'type': type(error).__name__},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+async def _background(request, kind: str, payload: dict) -> JsonResponse:
+    """Enqueue a job for the worker and answer 202 with its id."""
+    job = await sync_to_async(enqueue)(kind, payload, user=request.user)
+    body, status_code = accepted_payload(job)
+    return JsonResponse(body, status=status_code)
+
+
+@async_api_view(['POST'])
+@ai_metered
+async def generate_quiz(request):
+    """POST /api/ai/generate-quiz/ (see views.generate_quiz)"""
+    try:
+        transcript = request.data.get('transcript', '')
+        num_questions = request.data.get('num_questions', 5)
+        difficulty = request.data.get('difficulty', 'medium')
+
+        if not transcript:
+            return JsonResponse({'error': 'Transcript is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if wants_background(request):
+            return await _background(request, 'generate_quiz', {
+                'transcript': transcript,
+                'num_questions': num_questions,
+                'difficulty': difficulty,
+            })
+
+        prompt = quiz_prompt(transcript, num_questions, difficulty)
+        if wants_stream(request):
+            return quiz_sse_response(acall_ai_stream(prompt, max_tokens=1000, endpoint='generate_quiz'))
+        response_text = await acall_ai(prompt, max_tokens=1000, endpoint='generate_quiz')
+        return JsonResponse(parse_quiz_response(response_text), status=status.HTTP_200_OK, safe=False)
+
+    except ProviderUnavailableError as e:
+        return _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error generating quiz: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {'error': f'Failed to generate quiz: {str(e)}', 'type': type(e).__name__},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view(['POST'])
+@ai_metered
+async def chat(request):
+    """POST /api/ai/chat/ (see views.chat)"""
+    try:
+        message = request.data.get('message', '')
+        context = request.data.get('context', '')
+        lesson_id = request.data.get('lesson_id')
+
+        if not message:
+            return JsonResponse({'error': 'Message is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        playback_time = request.data.get('playback_time')
+        if playback_time is not None:
+            try:
+                playback_time = parse_timestamp(playback_time)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = None
+        if request.data.get('session') or request.data.get('session_id'):
+            try:
+                session = await sync_to_async(get_session)(request.user, request.data.get('session_id'))
+            except (TutorSession.DoesNotExist, ValueError):
+                return JsonResponse({'error': 'Chat session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Lesson lookup, index loading and session history touch the database
+        full_prompt, max_tokens = await sync_to_async(chat_prompt)(request.user, message, context, lesson_id, session, playback_time)
+
+        if wants_stream(request):
+            if session is None:
+                return sse_response(acall_ai_stream(full_prompt, max_tokens=max_tokens, endpoint='chat'))
+            return sse_response(
+                arecord_stream(session, message, acall_ai_stream(full_prompt, max_tokens=max_tokens, endpoint='chat')),
+                done_payload={'session_id': session.id}
+            )
+
+        response_text = await acall_ai(full_prompt, max_tokens=max_tokens, endpoint='chat')
+        payload = {'response': response_text}
+        if session is not None:
+            await sync_to_async(record_exchange)(session, message, response_text)
+            payload['session_id'] = session.id
+        return JsonResponse(payload, status=status.HTTP_200_OK)
+
+    except ProviderUnavailableError as e:
+        return _unavailable(e)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"OpenRouter connectivity error in chat: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {'error': 'AI service unreachable. Check network/DNS or OpenRouter URL.', 'type': type(e).__name__},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    except Exception as e:
+        logger.error(f"Error in chat: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {'error': f'Failed to generate response: {str(e)}', 'type': type(e).__name__},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@async_api_view(['POST'])
+@ai_metered
+async def generate_study_plan(request):
+    """POST /api/ai/study-plan/ (see views.generate_study_plan)"""
+    try:
+        topic = request.data.get('topic', '')
+        duration_weeks = request.data.get('duration_weeks', 4)
+        skill_level = request.data.get('skill_level', 'beginner')
+        goals = request.data.get('goals', '')
+
+        if not topic:
+            return JsonResponse({'error': 'Topic is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        prompt = study_plan_prompt(topic, duration_weeks, skill_level, goals)
+        response_text = await acall_ai(prompt, max_tokens=600, endpoint='study_plan')
+        return JsonResponse({'study_plan': response_text}, status=status.HTTP_200_OK)
+
+    except ProviderUnavailableError as e:
+        return _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error generating study plan: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {'error': f'Failed to generate study plan: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+async def asummarize_chunk_list(chunks) -> dict:
+    """Async counterpart of ``views.summarize_chunk_list`` (same stored summaries)."""
+    hashes = [chunk_hash(chunk_text) for chunk_text in chunks]
+    known = await sync_to_async(cached_summaries)(hashes)
+    missing = {key: chunk_text for key, chunk_text in zip(hashes, chunks) if key not in known}
+
+    # Same fan-out bound as the thread pool in the sync view
+    fanout = asyncio.Semaphore(fanout_workers(len(missing)))
+
+    async def summarize_chunk(chunk_text):
+        async with fanout:
+            return (await acall_ai(chunk_summary_prompt(chunk_text), max_tokens=200, endpoint='summarize_chunk')).strip()
+
+    outcomes = await asyncio.gather(
+        *(summarize_chunk(chunk_text) for chunk_text in missing.values()),
+        return_exceptions=True,
+    )
+    errors = {}
+    fresh = {}
+    for key, outcome in zip(missing, outcomes):
+        if isinstance(outcome, Exception):
+            errors[key] = outcome
+        else:
+            fresh[key] = outcome
+    await sync_to_async(store_summaries)(ChunkSummary.Kind.CHUNK, fresh)
+    known.update(fresh)
+
+    chunk_summaries = [
+        {'index': idx, 'summary': known[key] if key in known else f'Error generating summary: {str(errors[key])}'}
+        for idx, key in enumerate(hashes)
+    ]
+
+    summary_key = global_hash([item['summary'] for item in chunk_summaries])
+    global_summary = None if errors else (await sync_to_async(cached_summaries)([summary_key])).get(summary_key)
+    global_reused = global_summary is not None
+    if not global_reused:
+        try:
+            global_summary = (await acall_ai(global_summary_prompt(chunk_summaries), max_tokens=400, endpoint='summarize_global')).strip()
+            if not errors:
+                await sync_to_async(store_summaries)(ChunkSummary.Kind.GLOBAL, {summary_key: global_summary})
+        except Exception as e:
+            global_summary = f'Error generating global summary: {str(e)}'
+
+    return {
+        'success': True,
+        'chunk_summaries': chunk_summaries,
+        'global_summary': global_summary,
+        'reused': {'chunks': len(chunks) - len(missing), 'global': global_reused},
+    }
+
+
+@async_api_view(['POST'])
+@ai_metered
+async def summarize_chunks(request):
+    """POST /api/ai/summarize-chunks/ (see views.summarize_chunks)"""
+    try:
+        chunks = request.data.get('chunks')
+        transcript = request.data.get('transcript', '')
+
+        if not chunks and not transcript:
+            return JsonResponse({'error': 'Either "chunks" or "transcript" is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not chunks and transcript:
+            chunks = chunk_text_stable(transcript)
+
+        if not isinstance(chunks, list) or len(chunks) == 0:
+            return JsonResponse({'error': 'No valid chunks to summarize'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if wants_background(request):
+            return await _background(request, 'summarize_chunks', {'chunks': chunks})
+
+        return JsonResponse(await asummarize_chunk_list(chunks), status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error in summarize_chunks: {str(e)}", exc_info=True)
+        return JsonResponse({'error': f'Failed to summarize chunks: {str(e)}', 'type': type(e).__name__}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['POST'])
+@ai_metered
+async def explain_concept(request):
+    """POST /api/ai/explain/ (see views.explain_concept)"""
+    try:
+        concept = request.data.get('concept', '')
+        detail_level = request.data.get('detail_level', 'detailed')
+
+        if not concept:
+            return JsonResponse({'error': 'Concept is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        prompt = explain_prompt(concept, detail_level)
+        response_text = await acall_ai(prompt, max_tokens=300, endpoint='explain_concept')
+        return JsonResponse({'explanation': response_text}, status=status.HTTP_200_OK)
+
+    except ProviderUnavailableError as e:
+        return _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error explaining concept: {str(e)}", exc_info=True)
+        return JsonResponse(
+            {'error': f'Failed to explain concept: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -0,0 +1,167 @@
+"""
+Content-addressed cache for AI completions.
+
+Responses are keyed by a hash of the prompt, the provider route and
+``max_tokens``. A small in-process LRU sits in front of the shared Django
+cache so hot prompts are served without a network round-trip.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds each endpoint may reuse an identical completion. 0 disables caching.
+DEFAULT_TTLS = {
+    'generate_quiz': 60 * 60,
+    'lesson_generate_quiz': 60 * 60,
+    'quiz_section': 60 * 60,
+    'explain_concept': 24 * 60 * 60,
+    'study_plan': 6 * 60 * 60,
+    'summarize_chunk': 24 * 60 * 60,
+    'summarize_global': 24 * 60 * 60,
+    'chat': 10 * 60,
+}
+
+
+class LRUCache:
+    """Thread-safe, bounded LRU mapping with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class AIResponseCache:
+    """Two-level (process LRU + Django cache) store for AI completions."""
+
+    key_prefix = 'ai_response'
+
+    def __init__(self, max_entries: int = None):
+        if max_entries is None:
+            max_entries = getattr(settings, 'AI_CACHE_MAX_ENTRIES', 512)
+        self.local = LRUCache(max_entries)
+        self._stats_lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'stores': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, 'AI_CACHE_ENABLED', True)
+
+    def make_key(self, prompt: str, route: str, max_tokens: int) -> str:
+        digest = hashlib.sha256()
+        for part in (route, str(max_tokens), prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return f"{self.key_prefix}:{digest.hexdigest()}"
+
+    def ttl_for(self, endpoint: str) -> int:
+        if not endpoint:
+            return 0
+        ttls = {**DEFAULT_TTLS, **getattr(settings, 'AI_CACHE_TTLS', {})}
+        return int(ttls.get(endpoint, 0))
+
+    def get(self, key: str):
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        entry = cache.get(key)
+        if entry is not None:
+            # Carry the remaining shared TTL into the local layer
+            value, expires_at = entry
+            remaining = expires_at - time.time()
+            if remaining > 0:
+                self.local.set(key, value, remaining)
+                self._count('shared_hits')
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: str, ttl: int):
+        if ttl <= 0 or not value:
+            return
+        self.local.set(key, value, ttl)
+        cache.set(key, (value, time.time() + ttl), ttl)
+        self._count('stores')
+
+    async def aget(self, key: str):
+        """``get`` for async views; the shared cache may be a database table."""
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        entry = await cache.aget(key)
+        if entry is not None:
+            value, expires_at = entry
+            remaining = expires_at - time.time()
+            if remaining > 0:
+                self.local.set(key, value, remaining)
+                self._count('shared_hits')
+                return value
+
+        self._count('misses')
+        return None
+
+    async def aset(self, key: str, value: str, ttl: int):
+        if ttl <= 0 or not value:
+            return
+        self.local.set(key, value, ttl)
+        await cache.aset(key, (value, time.time() + ttl), ttl)
+        self._count('stores')
+
+    def clear_local(self):
+        self.local.clear()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        stats['local_entries'] = len(self.local)
+        stats['local_capacity'] = self.local.max_entries
+        return stats
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+
+response_cache = AIResponseCache()
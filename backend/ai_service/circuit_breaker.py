@@ -0,0 +1,158 @@
+"""
+Per-provider circuit breakers for AI calls.
+
+Breaker state lives in the shared Django cache (settings.CACHES: Redis, or
+a database table), so every worker skips a provider as soon as one of them
+has seen it fail.
+
+States:
+  closed     calls go through; server errors are counted in a rolling window
+  open       calls are skipped until the cooldown for the last failure expires
+  half_open  cooldown over; a single worker is allowed one probe call, which
+             closes the breaker on success or re-opens it on failure
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Failure kinds recorded by callers
+QUOTA = 'quota'
+SERVER = 'server'
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_FAILURE_WINDOW = 60
+DEFAULT_COOLDOWNS = {QUOTA: 300, SERVER: 30}
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised when every provider that could serve a call has an open breaker."""
+
+
+class CircuitBreaker:
+    """Shared-cache circuit breaker for one provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.key = f'ai_breaker:{provider}'
+        self.probe_key = f'ai_breaker:{provider}:probe'
+
+    @property
+    def failure_threshold(self) -> int:
+        return int(getattr(settings, 'AI_BREAKER_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD))
+
+    @property
+    def failure_window(self) -> int:
+        return int(getattr(settings, 'AI_BREAKER_FAILURE_WINDOW', DEFAULT_FAILURE_WINDOW))
+
+    def cooldown_for(self, kind: str) -> int:
+        cooldowns = {**DEFAULT_COOLDOWNS, **getattr(settings, 'AI_BREAKER_COOLDOWNS', {})}
+        return int(cooldowns.get(kind, cooldowns[SERVER]))
+
+    def _load(self) -> dict:
+        return cache.get(self.key) or {'failures': 0, 'window_started': 0.0, 'open_until': 0.0}
+
+    def _store(self, state: dict):
+        # Keep the record a while past any cooldown so snapshots stay informative
+        cache.set(self.key, state, max(self.cooldown_for(QUOTA), self.failure_window) * 4)
+
+    def state(self) -> str:
+        data = self._load()
+        if not data.get('open_until'):
+            return CLOSED
+        return OPEN if time.time() < data['open_until'] else HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """Whether this caller may use the provider now."""
+        current = self.state()
+        if current == CLOSED:
+            return True
+        if current == OPEN:
+            return False
+        # Half-open: only the worker that wins the probe slot goes through
+        return cache.add(self.probe_key, time.time(), timeout=self.cooldown_for(SERVER))
+
+    def record_success(self):
+        data = self._load()
+        # A closed, clean breaker has nothing to clear; skip the write
+        if data.get('open_until') or data.get('failures'):
+            if data.get('open_until'):
+                logger.info("AI provider %s recovered; closing circuit", self.provider)
+            cache.delete_many([self.key, self.probe_key])
+
+    def release_probe(self):
+        """Free the half-open probe slot after a call that ended without an outcome (client went away)."""
+        if self.state() == HALF_OPEN:
+            cache.delete(self.probe_key)
+
+    def record_failure(self, kind: str, error: Exception = None):
+        """
+        Count a failure of ``kind`` (QUOTA or SERVER); other kinds are ignored.
+
+        Quota exhaustion opens the circuit immediately; server errors open it
+        once ``failure_threshold`` occur within ``failure_window`` seconds or
+        when the half-open probe fails.
+        """
+        now = time.time()
+        data = self._load()
+        was_probing = bool(data.get('open_until')) and now >= data['open_until']
+        try:
+            if kind not in (QUOTA, SERVER):
+                return
+
+            if now - data.get('window_started', 0.0) > self.failure_window:
+                data['failures'] = 0
+                data['window_started'] = now
+            data['failures'] = data.get('failures', 0) + 1
+            data['last_error'] = str(error)[:300] if error is not None else kind
+            data['last_failure_kind'] = kind
+            data['last_failure_at'] = now
+
+            if kind == QUOTA or was_probing or data['failures'] >= self.failure_threshold:
+                data['open_until'] = now + self.cooldown_for(kind)
+                logger.warning(
+                    "Opening AI circuit for %s for %ss after %s failure",
+                    self.provider, self.cooldown_for(kind), kind,
+                )
+            self._store(data)
+        finally:
+            # The probe is over whether or not its failure counted
+            if was_probing:
+                cache.delete(self.probe_key)
+
+    def snapshot(self) -> dict:
+        data = self._load()
+        open_until = data.get('open_until') or 0.0
+        return {
+            'state': self.state(),
+            'failures_in_window': data.get('failures', 0),
+            'retry_in_seconds': max(0, round(open_until - time.time(), 1)) if open_until else 0,
+            'last_failure_kind': data.get('last_failure_kind'),
+            'last_error': data.get('last_error'),
+        }
+
+
+breakers = {
+    'gemini': CircuitBreaker('gemini'),
+    'openrouter': CircuitBreaker('openrouter'),
+}
+
+
+def breaker_for(provider: str) -> CircuitBreaker:
+    """The breaker for ``provider``, created on first use for providers beyond the built-in two."""
+    breaker = breakers.get(provider)
+    if breaker is None:
+        breaker = breakers.setdefault(provider, CircuitBreaker(provider))
+    return breaker
+
+
+def breaker_snapshots() -> dict:
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
@@ -0,0 +1,123 @@
+"""
+Concurrency helpers for AI calls.
+
+``provider_limiter`` caps how many requests this process has in flight per
+provider (so fan-out cannot blow through Gemini quota), and
+``map_concurrent`` runs independent calls on a bounded thread pool while
+keeping results in input order. ``async_provider_limiter`` applies the same
+limits to coroutines on an event loop (ASGI views).
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+Outcome = namedtuple('Outcome', ['value', 'error'])
+
+
+class ProviderLimiter:
+    """Per-provider semaphores sized from settings.AI_PROVIDER_CONCURRENCY."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def limit_for(self, provider: str) -> int:
+        limits = getattr(settings, 'AI_PROVIDER_CONCURRENCY', {})
+        return max(1, int(limits.get(provider, DEFAULT_PROVIDER_CONCURRENCY)))
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        limit = self.limit_for(provider)
+        with self._lock:
+            current = self._semaphores.get(provider)
+            if current is None or current[0] != limit:
+                current = (limit, threading.BoundedSemaphore(limit))
+                self._semaphores[provider] = current
+            return current[1]
+
+    @contextmanager
+    def acquire(self, provider: str):
+        semaphore = self._semaphore(provider)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+provider_limiter = ProviderLimiter()
+
+
+class AsyncProviderLimiter(ProviderLimiter):
+    """Per-provider asyncio semaphores, one set per event loop."""
+
+    def __init__(self):
+        super().__init__()
+        self._loops = weakref.WeakKeyDictionary()
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        limit = self.limit_for(provider)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._loops.setdefault(loop, {})
+            current = semaphores.get(provider)
+            if current is None or current[0] != limit:
+                current = (limit, asyncio.Semaphore(limit))
+                semaphores[provider] = current
+            return current[1]
+
+    @asynccontextmanager
+    async def acquire(self, provider: str):
+        async with self._semaphore(provider):
+            yield
+
+
+async_provider_limiter = AsyncProviderLimiter()
+
+
+def fanout_workers(num_items: int) -> int:
+    """Pool size for a fan-out over ``num_items`` independent AI calls."""
+    max_workers = int(getattr(settings, 'AI_FANOUT_MAX_WORKERS', 8))
+    return max(1, min(num_items, max_workers))
+
+
+def map_concurrent(func, items, max_workers: int = None):
+    """
+    Apply ``func`` to every item on a bounded thread pool.
+
+    Returns a list of ``Outcome(value, error)`` in the same order as ``items``;
+    an exception raised for one item is captured in its outcome and does not
+    affect the others.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if max_workers is None:
+        max_workers = fanout_workers(len(items))
+
+    def run(item):
+        try:
+            return Outcome(func(item), None)
+        except Exception as exc:
+            return Outcome(None, exc)
+
+    if max_workers == 1:
+        return [run(item) for item in items]
+
+    def run_in_worker(item):
+        try:
+            return run(item)
+        finally:
+            # Worker threads get their own DB connections; don't leak them
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-fanout') as pool:
+        return list(pool.map(run_in_worker, items))
@@ -0,0 +1 @@
+# AI service management package
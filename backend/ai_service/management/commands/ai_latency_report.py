@@ -0,0 +1,81 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ai_service.models import AICallSample
+from ai_service.telemetry import telemetry
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints AI provider latency percentiles (p50/p95/p99), error and fallback "
+        "rates and average token counts per provider and endpoint, from the "
+        "recorded AICallSample rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Report on the last N hours (default: 24)')
+        parser.add_argument('--provider', help='Only this provider (gemini, openrouter)')
+        parser.add_argument('--endpoint', help='Only this endpoint (e.g. chat, generate_quiz)')
+        parser.add_argument('--mode', choices=['call', 'stream'], help='Only blocking calls or streams')
+
+    def handle(self, *args, **options):
+        # Include calls this process has not flushed yet
+        telemetry.flush()
+
+        samples = AICallSample.objects.filter(created_at__gte=timezone.now() - timedelta(hours=options['hours']))
+        for field in ('provider', 'endpoint', 'mode'):
+            if options[field]:
+                samples = samples.filter(**{field: options[field]})
+
+        groups = defaultdict(list)
+        for row in samples.values_list(
+            'provider', 'endpoint', 'outcome', 'fallback', 'latency_ms', 'prompt_tokens', 'completion_tokens'
+        ).iterator():
+            groups[(row[0], row[1] or '-')].append(row[2:])
+
+        if not groups:
+            self.stdout.write(f"No AI calls recorded in the last {options['hours']:g} hours.")
+            return
+
+        header = (
+            f"{'provider':<11} {'endpoint':<18} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>7} {'fallbk':>7} {'in tok':>7} {'out tok':>7}"
+        )
+        self.stdout.write(f"AI provider calls, last {options['hours']:g} hours")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for (provider, endpoint), rows in sorted(groups.items()):
+            calls = len(rows)
+            latencies = sorted(row[2] for row in rows)
+            errors = sum(1 for row in rows if row[0] == AICallSample.Outcome.ERROR)
+            fallbacks = sum(1 for row in rows if row[1])
+            self.stdout.write(
+                f"{provider:<11} {endpoint[:18]:<18} {calls:>6} "
+                f"{_percentile(latencies, 50):>8.0f} {_percentile(latencies, 95):>8.0f} {_percentile(latencies, 99):>8.0f} "
+                f"{errors / calls:>7.1%} {fallbacks / calls:>7.1%} "
+                f"{sum(row[3] for row in rows) / calls:>7.0f} {sum(row[4] for row in rows) / calls:>7.0f}"
+            )
+
+        error_classes = (
+            samples.filter(outcome=AICallSample.Outcome.ERROR)
+            .values_list('provider', 'error_class')
+        )
+        counts = defaultdict(int)
+        for provider, error in error_classes:
+            counts[(provider, error or 'unknown')] += 1
+        if counts:
+            self.stdout.write('')
+            self.stdout.write('Errors by class:')
+            for (provider, error), n in sorted(counts.items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  {provider:<11} {error:<20} {n:>6}")
@@ -0,0 +1,148 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ai_service import views
+from ai_service.providers import FakeProvider, using_provider
+from courses.models import Course, Lesson
+from courses.views import LessonViewSet
+
+ENDPOINTS = ('generate_quiz', 'chat', 'summarize_chunks', 'explain_concept', 'ai_tutor')
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _transcript(n: int, paragraphs: int = 40) -> str:
+    return '\n\n'.join(
+        f"Part {p} of lecture {n}. The lecturer explains concept {p} and how it relates to "
+        f"recursion, variables and functions, with a worked example and a short summary. " * 3
+        for p in range(paragraphs)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the AI endpoints (generate_quiz, chat, summarize_chunks, "
+        "explain_concept, ai_tutor) in-process against the deterministic fake "
+        "provider and reports throughput and latency percentiles, plus the "
+        "per-request overhead outside the provider (prompt building, chunking, "
+        "retrieval, parsing), measured one request at a time with an instant provider."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}")
+        parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint (default: 100)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once (default: 8)')
+        parser.add_argument('--latency', type=float, default=0.05, help='Fake provider latency in seconds (default: 0.05)')
+        parser.add_argument('--per-token', type=float, default=0.0, help='Fake provider seconds per token (default: 0)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of provider calls that fail (default: 0)')
+        parser.add_argument('--error', default='server', choices=sorted(FakeProvider.ERRORS), help='Injected error kind')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for error injection (default: 0)')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        provider = FakeProvider(
+            latency=options['latency'],
+            per_token=options['per_token'],
+            error_rate=options['error_rate'],
+            error=options['error'],
+            seed=options['seed'],
+        )
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(
+            f"Fake provider: latency {options['latency'] * 1000:.0f} ms, error rate {options['error_rate']:.0%}; "
+            f"{options['requests']} requests per endpoint, concurrency {concurrency}"
+        )
+        self.stdout.write(
+            f"  {'endpoint':<17} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'calls':>6} {'errors':>6} {'overhead p50/p99 ms':>20}"
+        )
+        instant = FakeProvider(latency=0)
+
+        # ai_tutor needs a stored user and lesson; removed again at the end
+        user = get_user_model().objects.create_user(username=f'benchmark-{uuid.uuid4().hex[:8]}')
+        try:
+            with override_settings(
+                AI_CACHE_ENABLED=False,
+                AI_SUMMARY_CACHE_ENABLED=False,
+                AI_USAGE_LIMITS_ENABLED=False,
+                AI_TELEMETRY_ENABLED=False,
+                QUESTION_POOL_ENABLED=False,
+                AI_PROVIDER_CONCURRENCY={'fake': concurrency},
+                AI_BREAKER_FAILURE_THRESHOLD=10 ** 9,
+            ), using_provider(provider):
+                course = Course.objects.create(title='Benchmark course', description='Benchmark', owner=user)
+                lesson = Lesson.objects.create(course=course, title='Benchmark lesson', video_id='benchmark', transcript=_transcript(0))
+                for endpoint in endpoints:
+                    provider.reset_stats()
+                    results, wall = self._run(endpoint, options['requests'], concurrency, user, lesson)
+                    calls = provider.stats()['calls']
+                    with using_provider(instant):
+                        overhead, _ = self._run(endpoint, min(options['requests'], 50), 1, user, lesson)
+                    self._report(endpoint, results, wall, calls, overhead)
+        finally:
+            user.delete()
+
+    def _request(self, endpoint, i, user, lesson, factory):
+        # Distinct prompts per request, so single-flight coalescing doesn't merge them
+        if endpoint == 'generate_quiz':
+            request = factory.post('/api/ai/generate-quiz/', {'transcript': _transcript(i, 8), 'num_questions': 5}, format='json')
+            view = views.generate_quiz
+        elif endpoint == 'chat':
+            request = factory.post('/api/ai/chat/', {'message': f'What is recursion? ({i})', 'context': _transcript(i)}, format='json')
+            view = views.chat
+        elif endpoint == 'summarize_chunks':
+            request = factory.post('/api/ai/summarize-chunks/', {'transcript': _transcript(i)}, format='json')
+            view = views.summarize_chunks
+        elif endpoint == 'explain_concept':
+            request = factory.post('/api/ai/explain/', {'concept': f'Recursion {i}'}, format='json')
+            view = views.explain_concept
+        else:
+            request = factory.post(f'/api/lessons/{lesson.pk}/ai_tutor/', {'message': f'Explain concept {i % 40} again'}, format='json')
+            view = LessonViewSet.as_view({'post': 'ai_tutor'})
+            force_authenticate(request, user=user)
+            return lambda: view(request, pk=lesson.pk)
+        force_authenticate(request, user=user)
+        return lambda: view(request)
+
+    def _run(self, endpoint, num_requests, concurrency, user, lesson):
+        """``([(seconds, ok), ...], wall_seconds)`` for ``num_requests`` requests."""
+        factory = APIRequestFactory()
+
+        def one_request(i):
+            call = self._request(endpoint, i, user, lesson, factory)
+            started = time.perf_counter()
+            try:
+                response = call()
+                response.render()
+            finally:
+                connections.close_all()
+            return time.perf_counter() - started, response.status_code < 400
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_request, range(num_requests)))
+        return results, time.perf_counter() - started
+
+    def _report(self, endpoint, results, wall, calls, overhead):
+        latencies = sorted(elapsed for elapsed, _ in results)
+        overheads = sorted(elapsed for elapsed, _ in overhead)
+        failed = sum(1 for _, ok in results if not ok)
+        self.stdout.write(
+            f"  {endpoint:<17} {len(results) / wall:>7.1f} "
+            f"{_percentile(latencies, 50) * 1000:>8.1f} {_percentile(latencies, 95) * 1000:>8.1f} "
+            f"{_percentile(latencies, 99) * 1000:>8.1f} {calls:>6d} {failed:>6d} "
+            f"{_percentile(overheads, 50) * 1000:>10.2f}/{_percentile(overheads, 99) * 1000:<9.2f}"
+        )
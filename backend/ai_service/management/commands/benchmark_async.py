@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ai_service import async_views, views
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _InFlight:
+    """Tracks the peak number of concurrent provider calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests ai/chat in-process: the sync view behind a fixed number of "
+        "WSGI worker threads versus the async view on one event loop, against a "
+        "fake provider with fixed latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Concurrent requests to send (default: 200)')
+        parser.add_argument('--latency', type=float, default=1.0, help='Fake provider latency in seconds (default: 1.0)')
+        parser.add_argument(
+            '--wsgi-slots', type=int, default=4,
+            help='Request threads of the WSGI deployment, workers x threads (default: 4, as in start.sh)',
+        )
+
+    def handle(self, *args, **options):
+        num_requests = options['requests']
+        latency = options['latency']
+        slots = options['wsgi_slots']
+        user = get_user_model()(username='benchmark')
+
+        self.stdout.write(
+            f"ai/chat: {num_requests} concurrent requests, provider latency {latency * 1000:.0f} ms"
+        )
+        # Provider limits would cap in-flight calls for both modes; lift them so
+        # the comparison measures the serving model
+        limits = {'gemini': num_requests, 'openrouter': num_requests}
+        with override_settings(
+            PREFER_OPENROUTER=True, AI_CACHE_ENABLED=False, AI_USAGE_LIMITS_ENABLED=False, AI_TELEMETRY_ENABLED=False,
+            AI_PROVIDER_CONCURRENCY=limits,
+        ):
+            sync_result = self._run_sync(num_requests, latency, slots, user)
+            async_result = self._run_async(num_requests, latency, user)
+
+        self._report(f'wsgi ({slots} threads)', *sync_result)
+        self._report('asgi (1 event loop)', *async_result)
+
+    def _run_sync(self, num_requests, latency, slots, user):
+        in_flight = _InFlight()
+
+        def fake_complete(prompt, model_name=None, max_tokens=400):
+            with in_flight:
+                time.sleep(latency)
+            return _StubResponse('ok')
+
+        factory = APIRequestFactory()
+
+        def one_request(i):
+            # Distinct prompts, so single-flight coalescing doesn't merge them
+            request = factory.post('/api/ai/chat/', {'message': f'Question {i}?'}, format='json')
+            force_authenticate(request, user=user)
+            response = views.chat(request)
+            response.render()
+            return time.perf_counter(), response.status_code
+
+        with mock.patch.object(views, 'call_openrouter', fake_complete):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=slots) as pool:
+                finished = list(pool.map(one_request, range(num_requests)))
+            wall = time.perf_counter() - started
+        return wall, [(done - started, code) for done, code in finished], in_flight.peak
+
+    def _run_async(self, num_requests, latency, user):
+        in_flight = _InFlight()
+
+        async def fake_complete(prompt, model_name=None, max_tokens=400):
+            with in_flight:
+                await asyncio.sleep(latency)
+            return 'ok'
+
+        factory = AsyncRequestFactory()
+        # Skip JWT auth (it needs a stored user); the view body is what's measured
+        chat = inspect.unwrap(async_views.chat)
+
+        async def one_request(i):
+            request = factory.post('/api/ai/chat/', {'message': f'Question {i}?'}, content_type='application/json')
+            request.user = user
+            request.data = {'message': f'Question {i}?'}
+            request.query_params = request.GET
+            response = await chat(request)
+            return time.perf_counter(), response.status_code
+
+        async def run_all():
+            return await asyncio.gather(*(one_request(i) for i in range(num_requests)))
+
+        with mock.patch.object(async_views, 'acall_openrouter', fake_complete):
+            started = time.perf_counter()
+            finished = asyncio.run(run_all())
+            wall = time.perf_counter() - started
+        return wall, [(done - started, code) for done, code in finished], in_flight.peak
+
+    def _report(self, label, wall, results, peak):
+        # All requests arrive together, so latency includes time spent queued
+        latencies = sorted(elapsed for elapsed, _ in results)
+        errors = sum(1 for _, code in results if code != 200)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"  {label:<20} wall={wall:7.2f} s  throughput={len(results) / wall:7.1f} req/s  "
+            f"p50={statistics.median(latencies) * 1000:8.0f} ms  p95={p95 * 1000:8.0f} ms  "
+            f"peak in-flight={peak:4d}  errors={errors}"
+        )
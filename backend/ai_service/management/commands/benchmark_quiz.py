@@ -0,0 +1,77 @@
+import json
+import re
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_service import views
+from courses.quizzes import build_lesson_quiz
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares lesson quiz generation in 'quick' mode (one call on the start of "
+        "the transcript) and 'full' map-reduce mode against a stubbed provider: "
+        "wall-clock time, prompt size and how much of the lecture the quiz covers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=60, help='Lecture length; one topic per minute (default: 60)')
+        parser.add_argument('--questions', type=int, default=10, help='Questions per quiz (default: 10)')
+        parser.add_argument('--latency', type=float, default=0.5, help='Stub latency per call in seconds (default: 0.5)')
+        parser.add_argument(
+            '--per-question', type=float, default=0.3,
+            help='Extra stub latency per requested question, as output tokens cost (default: 0.3)',
+        )
+
+    def handle(self, *args, **options):
+        minutes = options['minutes']
+        # ~150 spoken words per minute, each minute about its own topic
+        transcript = '\n\n'.join(
+            f"Minute {m}: today we look at topic{m}. " + ' '.join([f'topic{m} matters because it builds on the idea.'] * 18)
+            for m in range(minutes)
+        )
+        prompt_chars = []
+
+        def stub_openrouter(prompt, model_name=None, max_tokens=400):
+            prompt_chars.append(len(prompt))
+            requested = int(re.search(r'[Gg]enerate (\d+)', prompt).group(1))
+            time.sleep(options['latency'] + options['per_question'] * requested)
+            topics = list(dict.fromkeys(re.findall(r'topic\d+', prompt)))
+            step = max(1, len(topics) // requested)
+            return _StubResponse(json.dumps({'questions': [
+                {
+                    'question': f'Why does {topic} matter?',
+                    'type': 'mcq',
+                    'options': ['A', 'B', 'C', 'D'],
+                    'correct_answer': 'A',
+                    'explanation': f'{topic} builds on the idea.',
+                }
+                for topic in topics[::step][:requested]
+            ]}))
+
+        self.stdout.write(
+            f"Lesson quiz: {minutes}-minute lecture ({len(transcript)} chars), {options['questions']} questions"
+        )
+        with override_settings(PREFER_OPENROUTER=True, AI_CACHE_ENABLED=False, AI_TELEMETRY_ENABLED=False), \
+                mock.patch.object(views, 'call_openrouter', stub_openrouter):
+            for mode in ('quick', 'full'):
+                prompt_chars.clear()
+                started = time.perf_counter()
+                quiz = build_lesson_quiz(transcript, options['questions'], 'medium', mode)
+                elapsed = time.perf_counter() - started
+
+                asked = sorted({int(m) for q in quiz['questions'] for m in re.findall(r'topic(\d+)', q['question'])})
+                last_minute = asked[-1] if asked else 0
+                self.stdout.write(
+                    f"  {mode:<5} elapsed={elapsed:6.2f}s  calls={len(prompt_chars):<3d} "
+                    f"prompt_chars={sum(prompt_chars):<7d} questions={len(quiz['questions']):<3d} "
+                    f"latest_minute_covered={last_minute}/{minutes - 1}"
+                )
@@ -0,0 +1,91 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai_service.retrieval import ChunkIndex
+from ai_service.views import chunk_text_for_ai
+
+
+def legacy_find_relevant_context_chunks(chunks, message, max_chunks=3):
+    """The regex scorer find_relevant_context_chunks used before BM25."""
+    if not chunks:
+        return []
+
+    keywords = [
+        word for word in re.split(r'\s+', message.lower())
+        if len(word) > 3 and word.isalpha()
+    ]
+    if not keywords:
+        return chunks[:max_chunks]
+
+    scored = []
+    for index, chunk in enumerate(chunks):
+        chunk_lower = chunk.lower()
+        score = 0
+        for keyword in keywords:
+            exact = len(re.findall(rf'\b{re.escape(keyword)}\b', chunk_lower))
+            score += exact * 3
+            partial = len(re.findall(re.escape(keyword), chunk_lower))
+            score += max(partial - exact, 0)
+        score += (len(chunks) - index) * 0.1
+        scored.append((score, chunk, index))
+
+    scored.sort(key=lambda item: (-item[0], item[2]))
+    relevant = [item[1] for item in scored[:max_chunks] if item[0] > 0]
+
+    return relevant or chunks[:max_chunks]
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark of chunk retrieval on a synthetic transcript: legacy regex "
+        "scoring vs the cached BM25 index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=100_000, help='Transcript length in words (default: 100000)')
+        parser.add_argument('--queries', type=int, default=50, help='Queries to time (default: 50)')
+        parser.add_argument('--top-k', type=int, default=3, help='Chunks returned per query (default: 3)')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+            for _ in range(5000)
+        ]
+        words = [rng.choice(vocabulary) for _ in range(options['words'])]
+        # Sentence breaks every ~15 words so the chunker can split long paragraphs
+        sentences = [' '.join(words[i:i + 15]) + '.' for i in range(0, len(words), 15)]
+        transcript = ' '.join(sentences)
+        queries = [
+            f"Can you explain {rng.choice(vocabulary)} and how it relates to {rng.choice(vocabulary)}?"
+            for _ in range(options['queries'])
+        ]
+        top_k = options['top_k']
+
+        chunks = chunk_text_for_ai(transcript)
+        self.stdout.write(
+            f"Transcript: {len(words)} words, {len(transcript)} chars, {len(chunks)} chunks; "
+            f"{len(queries)} queries, top {top_k}"
+        )
+
+        started = time.perf_counter()
+        for query in queries:
+            legacy_find_relevant_context_chunks(chunks, query, top_k)
+        legacy = (time.perf_counter() - started) / len(queries)
+
+        started = time.perf_counter()
+        index = ChunkIndex(chunks)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for query in queries:
+            index.top_chunks(query, top_k)
+        bm25 = (time.perf_counter() - started) / len(queries)
+
+        self.stdout.write(f"  legacy regex  {legacy * 1000:9.3f} ms/query")
+        self.stdout.write(f"  bm25 build    {build * 1000:9.3f} ms (once per transcript)")
+        self.stdout.write(f"  bm25 query    {bm25 * 1000:9.3f} ms/query  ({legacy / bm25:,.0f}x faster)")
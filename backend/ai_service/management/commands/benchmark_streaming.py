@@ -0,0 +1,71 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ai_service import views
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares time-to-first-byte of ai/chat in blocking and SSE streaming mode "
+        "against a fake provider that emits tokens at a fixed rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=150, help='Tokens per completion (default: 150)')
+        parser.add_argument('--first-token', type=float, default=0.4, help='Seconds before the first token (default: 0.4)')
+        parser.add_argument('--per-token', type=float, default=0.02, help='Seconds between tokens (default: 0.02)')
+
+    def handle(self, *args, **options):
+        num_tokens = options['tokens']
+        first_token = options['first_token']
+        per_token = options['per_token']
+
+        def fake_stream(prompt, model_name=None, max_tokens=400):
+            time.sleep(first_token)
+            for i in range(num_tokens):
+                if i:
+                    time.sleep(per_token)
+                yield f'tok{i} '
+
+        def fake_complete(prompt, model_name=None, max_tokens=400):
+            return _StubResponse(''.join(fake_stream(prompt)))
+
+        factory = APIRequestFactory()
+        user = get_user_model()(username='benchmark')
+
+        self.stdout.write(
+            f"ai/chat: {num_tokens} tokens, first token after {first_token * 1000:.0f} ms, "
+            f"{per_token * 1000:.0f} ms/token"
+        )
+        with override_settings(PREFER_OPENROUTER=True, AI_CACHE_ENABLED=False, AI_USAGE_LIMITS_ENABLED=False,
+                               AI_TELEMETRY_ENABLED=False), \
+                mock.patch.object(views, 'call_openrouter', fake_complete), \
+                mock.patch.object(views, 'stream_openrouter', fake_stream):
+            for mode in ('blocking', 'stream'):
+                body = {'message': 'What is recursion?', 'stream': mode == 'stream'}
+                request = factory.post('/api/ai/chat/', body, format='json')
+                force_authenticate(request, user=user)
+
+                started = time.perf_counter()
+                response = views.chat(request)
+                if mode == 'stream':
+                    ttfb = None
+                    for chunk in response.streaming_content:
+                        if ttfb is None and b'event: token' in chunk:
+                            ttfb = time.perf_counter() - started
+                else:
+                    response.render()
+                    ttfb = time.perf_counter() - started
+                total = time.perf_counter() - started
+
+                self.stdout.write(f"  {mode:<9} ttfb={ttfb * 1000:8.1f} ms  total={total * 1000:8.1f} ms")
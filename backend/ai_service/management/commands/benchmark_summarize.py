@@ -0,0 +1,62 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ai_service import views
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives summarize_chunks against a stubbed provider with fixed latency and "
+        "reports end-to-end time for several fan-out widths."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunks', type=int, default=40, help='Chunks per request (default: 40)')
+        parser.add_argument('--latency', type=float, default=0.2, help='Stub provider latency in seconds (default: 0.2)')
+        parser.add_argument('--workers', default='1,4,8', help='Comma-separated fan-out widths (default: 1,4,8)')
+
+    def handle(self, *args, **options):
+        latency = options['latency']
+        chunks = [f'Chunk {i}: the lecturer explains concept {i} with an example.' for i in range(options['chunks'])]
+
+        def stub_openrouter(prompt, model_name=None, max_tokens=400):
+            time.sleep(latency)
+            return _StubResponse(f'Summary of {len(prompt)} chars')
+
+        factory = APIRequestFactory()
+        user = get_user_model()(username='benchmark')
+
+        self.stdout.write(f"summarize_chunks: {len(chunks)} chunks, stub latency {latency * 1000:.0f} ms")
+        for width in [int(w) for w in options['workers'].split(',') if w.strip()]:
+            with override_settings(
+                PREFER_OPENROUTER=True,
+                AI_CACHE_ENABLED=False,
+                AI_USAGE_LIMITS_ENABLED=False,
+                AI_TELEMETRY_ENABLED=False,
+                AI_SUMMARY_CACHE_ENABLED=False,
+                AI_FANOUT_MAX_WORKERS=width,
+                AI_PROVIDER_CONCURRENCY={'openrouter': width},
+            ), mock.patch.object(views, 'call_openrouter', stub_openrouter):
+                request = factory.post('/api/ai/summarize-chunks/', {'chunks': chunks}, format='json')
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                response = views.summarize_chunks(request)
+                elapsed = time.perf_counter() - started
+
+            ordered = [item['index'] for item in response.data['chunk_summaries']] == list(range(len(chunks)))
+            # n chunk calls in ceil(n / k) waves, plus the global summary call
+            expected = (-(-len(chunks) // width) + 1) * latency
+            self.stdout.write(
+                f"  workers={width:<3d} elapsed={elapsed:7.2f}s  "
+                f"ideal={expected:7.2f}s  ordered={ordered}"
+            )
@@ -0,0 +1,71 @@
+"""
+Operational metrics for the AI service (admin only).
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from services.http_client import connection_stats
+from services.youtube_service import transcript_flight
+from .cache import response_cache
+from .circuit_breaker import breaker_snapshots
+from .telemetry import telemetry
+from .views import ai_flight
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def ai_metrics(request):
+    """
+    Snapshot of this worker's AI service counters and the shared provider
+    circuit breaker states.
+
+    GET /api/ai/metrics/
+    """
+    return Response({
+        'response_cache': response_cache.stats(),
+        'http_pools': connection_stats(),
+        'circuit_breakers': breaker_snapshots(),
+        'singleflight': {'ai': ai_flight.stats(), 'youtube': transcript_flight.stats()},
+    })
+
+
+def _has_metrics_token(request) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+
+
+def _is_admin(request) -> bool:
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    user = result[0] if result else request.user
+    return bool(user and user.is_active and user.is_staff)
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    This worker's AI provider telemetry in the Prometheus text format:
+    call counts, latency histograms, token counts, error classes and
+    fallbacks per provider and endpoint.
+
+    GET /api/ai/metrics/prometheus/
+    Allowed for admin users, or with ``Authorization: Bearer <METRICS_TOKEN>``
+    (a plain Django view, so the scrape token is not parsed as a JWT).
+    """
+    if not (_has_metrics_token(request) or _is_admin(request)):
+        return JsonResponse({'error': 'Admin access or metrics token required'}, status=403)
+    return HttpResponse(telemetry.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AICallSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('provider', models.CharField(max_length=20)),
+                ('endpoint', models.CharField(blank=True, max_length=50)),
+                ('mode', models.CharField(default='call', help_text='call or stream', max_length=10)),
+                ('outcome', models.CharField(choices=[('ok', 'OK'), ('error', 'Error')], max_length=10)),
+                ('error_class', models.CharField(blank=True, max_length=50)),
+                ('fallback', models.BooleanField(default=False, help_text='Served after the primary provider failed or was skipped')),
+                ('latency_ms', models.FloatField()),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('tokens_estimated', models.BooleanField(default=False, help_text='Provider reported no usage; counted from characters')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['provider', 'endpoint', 'created_at'], name='ai_service__provide_0d8837_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,102 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# No models needed for ai_service app
+
+class AICallSample(models.Model):
+    """One provider call, recorded by ai_service.telemetry for latency/token reports."""
+
+    class Outcome(models.TextChoices):
+        OK = 'ok', 'OK'
+        ERROR = 'error', 'Error'
+
+    created_at = models.DateTimeField(db_index=True)
+    provider = models.CharField(max_length=20)
+    endpoint = models.CharField(max_length=50, blank=True)
+    mode = models.CharField(max_length=10, default='call', help_text='call or stream')
+    outcome = models.CharField(max_length=10, choices=Outcome.choices)
+    error_class = models.CharField(max_length=50, blank=True)
+    fallback = models.BooleanField(default=False, help_text='Served after the primary provider failed or was skipped')
+    latency_ms = models.FloatField()
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    tokens_estimated = models.BooleanField(default=False, help_text='Provider reported no usage; counted from characters')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['provider', 'endpoint', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}/{self.endpoint or '-'} {self.latency_ms:.0f} ms ({self.outcome})"
+
+
+class ChunkSummary(models.Model):
+    """A transcript chunk (or global) summary stored under the hash of its input."""
+
+    class Kind(models.TextChoices):
+        CHUNK = 'chunk', 'Chunk'
+        GLOBAL = 'global', 'Global'
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-last_used_at']
+
+    def __str__(self):
+        return f"{self.kind} summary {self.content_hash[:12]}"
+
+
+class TutorSession(models.Model):
+    """A tutor conversation: older turns are folded into ``summary`` (ai_service.tutor_sessions)."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tutor_sessions'
+    )
+    lesson = models.ForeignKey(
+        'courses.Lesson',
+        on_delete=models.CASCADE,
+        related_name='tutor_sessions',
+        null=True,
+        blank=True
+    )
+    summary = models.TextField(blank=True, help_text='Running summary of the folded turns')
+    summarized_turns = models.PositiveIntegerField(default=0, help_text='Turns (oldest first) covered by the summary')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"Tutor session {self.pk} ({self.user_id})"
+
+
+class TutorTurn(models.Model):
+    """One message of a TutorSession."""
+
+    class Role(models.TextChoices):
+        STUDENT = 'student', 'Student'
+        TUTOR = 'tutor', 'Tutor'
+
+    session = models.ForeignKey(
+        TutorSession,
+        on_delete=models.CASCADE,
+        related_name='turns'
+    )
+    role = models.CharField(max_length=10, choices=Role.choices)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.role}: {self.content[:60]}"
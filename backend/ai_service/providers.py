@@ -0,0 +1,298 @@
+"""
+AI provider interface.
+
+``call_ai`` and its async/streaming variants walk a chain of providers
+(Gemini, then OpenRouter by default) with the same circuit breakers,
+concurrency limits and telemetry for each. A provider only has to answer a
+prompt::
+
+    complete(prompt, max_tokens) -> str
+    stream(prompt, max_tokens)   -> iterator of text fragments
+    acomplete / astream          -> the same for the async views
+
+The chain is settings.AI_PROVIDERS when set (e.g. ``['fake']`` to run
+offline), otherwise Gemini (when configured and not PREFER_OPENROUTER)
+followed by OpenRouter. ``using_provider`` routes every call through one
+provider instance, which is how the benchmark commands install a
+``FakeProvider``.
+
+``FakeProvider`` answers locally and deterministically, with configurable
+latency, token rate and injected errors, so the non-LLM work around a call
+can be measured and load-tested without spending quota.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+
+
+class AIProvider:
+    """One AI backend. ``name`` keys its circuit breaker, concurrency limit and telemetry."""
+
+    name = ''
+
+    def route(self) -> str:
+        """Provider and model, as part of response cache keys."""
+        return self.name
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, max_tokens: int):
+        yield self.complete(prompt, max_tokens)
+
+    async def acomplete(self, prompt: str, max_tokens: int) -> str:
+        from services.async_api import run_blocking
+        return await run_blocking(self.complete, prompt, max_tokens)
+
+    async def astream(self, prompt: str, max_tokens: int):
+        yield await self.acomplete(prompt, max_tokens)
+
+
+# The real providers call through the views modules at call time, so code
+# that patches views.call_openrouter & co. keeps working.
+
+class GeminiProvider(AIProvider):
+    name = 'gemini'
+
+    def route(self) -> str:
+        return f"gemini:{getattr(settings, 'GEMINI_MODEL_NAME', 'gemini-2.5-flash')}"
+
+    def complete(self, prompt, max_tokens):
+        from . import views
+        return views.call_gemini(prompt, max_output_tokens=max_tokens).text
+
+    def stream(self, prompt, max_tokens):
+        from . import views
+        return views.stream_gemini(prompt, max_output_tokens=max_tokens)
+
+    async def acomplete(self, prompt, max_tokens):
+        from . import async_views
+        return await async_views.acall_gemini(prompt, max_output_tokens=max_tokens)
+
+    def astream(self, prompt, max_tokens):
+        from . import async_views
+        return async_views.astream_gemini(prompt, max_output_tokens=max_tokens)
+
+
+class OpenRouterProvider(AIProvider):
+    name = 'openrouter'
+
+    def route(self) -> str:
+        return f"openrouter:{getattr(settings, 'OPENROUTER_MODEL', 'gpt-4o-mini')}"
+
+    def complete(self, prompt, max_tokens):
+        from . import views
+        return views.call_openrouter(prompt, max_tokens=max_tokens).text
+
+    def stream(self, prompt, max_tokens):
+        from . import views
+        return views.stream_openrouter(prompt, max_tokens=max_tokens)
+
+    async def acomplete(self, prompt, max_tokens):
+        from . import async_views
+        return await async_views.acall_openrouter(prompt, max_tokens=max_tokens)
+
+    def astream(self, prompt, max_tokens):
+        from . import async_views
+        return async_views.astream_openrouter(prompt, max_tokens=max_tokens)
+
+
+class FakeProvider(AIProvider):
+    """
+    Local, deterministic provider for benchmarks and offline development.
+
+    - ``latency``: seconds before the first token; ``per_token``: seconds
+      per further token (a completion takes latency + per_token * tokens)
+    - ``tokens``: completion length in words (capped by max_tokens)
+    - ``error_rate``: fraction of calls that fail with ``error`` (``server``,
+      ``quota``, ``timeout`` or ``connection``); which calls fail depends only
+      on ``seed`` and the call's sequence number
+    - ``responder(prompt, max_tokens) -> str`` replaces the built-in answers
+
+    Quiz prompts get valid quiz JSON with the requested number of questions;
+    other prompts get text made of words from the prompt.
+    """
+
+    name = 'fake'
+
+    ERRORS = {
+        'server': lambda: RuntimeError('OpenRouter error: 503 fake provider unavailable'),
+        'quota': lambda: RuntimeError('429 RESOURCE_EXHAUSTED: fake provider quota exceeded'),
+        'timeout': lambda: requests.exceptions.Timeout('fake provider timed out'),
+        'connection': lambda: requests.exceptions.ConnectionError('fake provider unreachable'),
+    }
+
+    def __init__(self, latency=0.2, per_token=0.0, tokens=60, error_rate=0.0, error='server', seed=0, responder=None):
+        if error not in self.ERRORS:
+            raise ValueError(f"error must be one of: {', '.join(self.ERRORS)}")
+        self.latency = latency
+        self.per_token = per_token
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.error = error
+        self.seed = seed
+        self.responder = responder
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+            }
+
+    def _begin(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            n = next(self._sequence)
+        if self.error_rate:
+            draw = int.from_bytes(hashlib.blake2b(f'{self.seed}:{n}'.encode(), digest_size=8).digest(), 'big')
+            if draw / 2 ** 64 < self.error_rate:
+                with self._lock:
+                    self.errors += 1
+                return self.ERRORS[self.error]()
+        return None
+
+    def _end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def response_for(self, prompt: str, max_tokens: int) -> str:
+        if self.responder is not None:
+            return self.responder(prompt, max_tokens)
+        words = list(dict.fromkeys(re.findall(r'[A-Za-z]\w{3,}', prompt))) or ['answer']
+        start = int(hashlib.blake2b(prompt.encode('utf-8'), digest_size=4).hexdigest(), 16)
+        pick = lambda i: words[(start + i * 7) % len(words)]  # noqa: E731
+        count = re.search(r'[Gg]enerate (\d+)', prompt)
+        if count and '"questions"' in prompt:
+            return json.dumps({'questions': [
+                {
+                    'question': f'What does the lecture say about {pick(i)} and {pick(i + 1)}?',
+                    'type': 'mcq',
+                    'options': [f'{pick(i)} {option}' for option in 'ABCD'],
+                    'correct_answer': f'{pick(i)} A',
+                    'explanation': f'The lecture explains {pick(i)}.',
+                }
+                for i in range(int(count.group(1)))
+            ]})
+        return ' '.join(pick(i) for i in range(max(1, min(self.tokens, max_tokens))))
+
+    def _fragments(self, text: str):
+        return re.findall(r'\S+\s*', text) or [text]
+
+    def complete(self, prompt, max_tokens):
+        error = self._begin()
+        try:
+            text = self.response_for(prompt, max_tokens)
+            time.sleep(self.latency + self.per_token * max(0, len(self._fragments(text)) - 1))
+            if error is not None:
+                raise error
+            return text
+        finally:
+            self._end()
+
+    def stream(self, prompt, max_tokens):
+        error = self._begin()
+        try:
+            time.sleep(self.latency)
+            if error is not None:
+                raise error
+            for i, fragment in enumerate(self._fragments(self.response_for(prompt, max_tokens))):
+                if i and self.per_token:
+                    time.sleep(self.per_token)
+                yield fragment
+        finally:
+            self._end()
+
+    async def acomplete(self, prompt, max_tokens):
+        error = self._begin()
+        try:
+            text = self.response_for(prompt, max_tokens)
+            await asyncio.sleep(self.latency + self.per_token * max(0, len(self._fragments(text)) - 1))
+            if error is not None:
+                raise error
+            return text
+        finally:
+            self._end()
+
+    async def astream(self, prompt, max_tokens):
+        error = self._begin()
+        try:
+            await asyncio.sleep(self.latency)
+            if error is not None:
+                raise error
+            for i, fragment in enumerate(self._fragments(self.response_for(prompt, max_tokens))):
+                if i and self.per_token:
+                    await asyncio.sleep(self.per_token)
+                yield fragment
+        finally:
+            self._end()
+
+
+_providers = {
+    'gemini': GeminiProvider(),
+    'openrouter': OpenRouterProvider(),
+}
+_providers_lock = threading.Lock()
+_override = None
+
+
+def get_provider(name: str) -> AIProvider:
+    provider = _providers.get(name)
+    if provider is None and name == 'fake':
+        # Configured from settings on first use
+        with _providers_lock:
+            provider = _providers.setdefault('fake', FakeProvider(**getattr(settings, 'AI_FAKE_PROVIDER', {})))
+    if provider is None:
+        raise ValueError(f'Unknown AI provider: {name}')
+    return provider
+
+
+def register_provider(provider: AIProvider):
+    with _providers_lock:
+        _providers[provider.name] = provider
+
+
+def provider_chain(prefer_openrouter: bool):
+    """Providers call_ai tries, in order."""
+    if _override is not None:
+        return [_override]
+    names = getattr(settings, 'AI_PROVIDERS', None)
+    if not names:
+        names = ['openrouter']
+        if bool(getattr(settings, 'GEMINI_API_KEY', None)) and not prefer_openrouter:
+            names.insert(0, 'gemini')
+    return [get_provider(name) for name in names]
+
+
+@contextmanager
+def using_provider(provider: AIProvider):
+    """Route every AI call in this process through ``provider`` alone."""
+    global _override
+    previous, _override = _override, provider
+    try:
+        yield provider
+    finally:
+        _override = previous
@@ -0,0 +1,154 @@
+"""
+Map-reduce quiz generation over a whole transcript.
+
+A single prompt can only carry the start of a long lecture, so the quiz
+ends up covering its first few minutes. Instead the transcript is split
+with ``chunk_text_for_ai`` and:
+
+- map: each section is asked for a few candidate questions, all sections
+  in parallel on the AI fan-out pool, so wall-clock time stays close to one
+  call. Adjacent chunks are grouped so there is at most one call per pool
+  worker (one round) however long the transcript is.
+- reduce: candidates are validated, near-duplicates dropped and
+  ``num_questions`` picked round-robin across sections, then returned in
+  lecture order. The merge is local; it needs no extra model call.
+"""
+
+import logging
+import math
+import re
+
+from .concurrency import fanout_workers, map_concurrent
+from .views import call_ai, chunk_text_for_ai, parse_quiz_response
+
+logger = logging.getLogger(__name__)
+
+# Extra candidates per section, so deduplication still leaves enough
+OVERGENERATE = 1
+TOKENS_PER_QUESTION = 180
+DUPLICATE_SIMILARITY = 0.6
+
+_STOPWORDS = frozenset(
+    'a an and are as at be by does for from how in is it of on or that the this to was what when which who why with'.split()
+)
+
+
+def section_quiz_prompt(section: str, part: int, parts: int, num_questions: int, difficulty: str) -> str:
+    return f"""This is part {part} of {parts} of a lecture transcript.
+Generate {num_questions} {difficulty} difficulty quiz questions about the key concepts in THIS part only.
+
+{section}
+
+Return ONLY valid JSON (no extra text):
+{{"questions": [{{"question": "?", "type": "mcq", "options": ["A", "B", "C", "D"], "correct_answer": "A", "explanation": "Why"}}]}}
+
+Be concise. Each question must be answerable from this part."""
+
+
+def transcript_sections(transcript: str, max_sections: int = None):
+    """``chunk_text_for_ai`` chunks, adjacent ones joined into at most ``max_sections``."""
+    chunks = chunk_text_for_ai(transcript)
+    if max_sections is None:
+        max_sections = fanout_workers(len(chunks))
+    if len(chunks) <= max_sections:
+        return chunks
+    per_section = math.ceil(len(chunks) / max_sections)
+    return ['\n\n'.join(chunks[i:i + per_section]) for i in range(0, len(chunks), per_section)]
+
+
+def _valid_question(question) -> bool:
+    if not isinstance(question, dict) or not str(question.get('question', '')).strip():
+        return False
+    options = question.get('options')
+    if question.get('type', 'mcq') == 'mcq':
+        # An MCQ whose answer is not one of its options cannot be graded
+        return isinstance(options, list) and len(options) >= 2 and question.get('correct_answer') in options
+    return True
+
+
+def _terms(text: str) -> frozenset:
+    return frozenset(word for word in re.findall(r'\w+', text.lower()) if word not in _STOPWORDS)
+
+
+def _similar(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= DUPLICATE_SIMILARITY
+
+
+def drop_duplicates(questions, existing=()):
+    """Valid ``questions`` that are not near-duplicates of each other or of ``existing``."""
+    seen = [_terms(question['question']) for question in existing]
+    kept = []
+    for question in questions:
+        if not _valid_question(question):
+            continue
+        terms = _terms(question['question'])
+        if any(_similar(terms, other) for other in seen):
+            continue
+        seen.append(terms)
+        kept.append(question)
+    return kept
+
+
+def merge_questions(candidates_by_section, num_questions: int):
+    """
+    Pick ``num_questions`` distinct questions, spread across sections.
+
+    Sections take turns contributing their next candidate, so every part of
+    the lecture is represented before any part gets a second question.
+    The result is ordered by section, i.e. in lecture order.
+    """
+    picked = []  # (section, position, question)
+    seen = []
+    rounds = max((len(candidates) for candidates in candidates_by_section), default=0)
+    for position in range(rounds):
+        for section, candidates in enumerate(candidates_by_section):
+            if len(picked) >= num_questions:
+                break
+            if position >= len(candidates):
+                continue
+            question = candidates[position]
+            terms = _terms(question['question'])
+            if any(_similar(terms, other) for other in seen):
+                continue
+            seen.append(terms)
+            picked.append((section, position, question))
+    picked.sort(key=lambda item: item[:2])
+    return [question for _, _, question in picked]
+
+
+def generate_quiz_map_reduce(transcript: str, num_questions: int, difficulty: str, endpoint: str = 'quiz_section') -> dict:
+    """
+    Quiz covering the whole transcript: ``{'questions': [...]}``.
+
+    Sections whose call fails or returns unusable JSON are skipped; raises
+    ValueError when no section produced a usable question.
+    """
+    num_questions = max(1, int(num_questions))
+    sections = transcript_sections(transcript)
+    per_section = min(num_questions, math.ceil(num_questions / len(sections)) + OVERGENERATE)
+
+    def generate(item):
+        idx, section = item
+        prompt = section_quiz_prompt(section, idx + 1, len(sections), per_section, difficulty)
+        response_text = call_ai(prompt, max_tokens=per_section * TOKENS_PER_QUESTION + 100, endpoint=endpoint)
+        return [q for q in parse_quiz_response(response_text).get('questions', []) if _valid_question(q)]
+
+    outcomes = map_concurrent(generate, enumerate(sections))
+    candidates = []
+    errors = []
+    for idx, outcome in enumerate(outcomes):
+        if outcome.error is not None:
+            logger.warning(f"Quiz generation failed for section {idx + 1}/{len(sections)}: {outcome.error}")
+            errors.append(outcome.error)
+        candidates.append(outcome.value or [])
+
+    questions = merge_questions(candidates, num_questions)
+    if not questions:
+        if errors:
+            raise errors[0]
+        raise ValueError('AI response contained no questions')
+    if len(questions) < num_questions:
+        logger.info(f"Map-reduce quiz: {len(questions)}/{num_questions} questions after merging {len(sections)} sections")
+    return {'questions': questions}
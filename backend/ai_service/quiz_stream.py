@@ -0,0 +1,145 @@
+"""
+Incremental parsing of quiz JSON.
+
+Quiz responses are ``{"questions": [{...}, {...}, ...]}``, possibly wrapped
+in a code fence or preceded by a sentence. ``QuestionScanner`` reads the
+response as it streams in and returns each question object as soon as its
+closing brace arrives, so a client can show the first question while the
+model is still writing the rest.
+
+The same scanner salvages truncated responses: a reply cut off by
+``max_tokens`` in the middle of question five still holds four complete
+questions, which ``salvage_questions`` recovers where ``json.loads`` would
+reject the whole reply.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_KEY = 'questions'
+
+
+class QuestionScanner:
+    """
+    Feed a quiz response in fragments; ``feed`` returns the question objects
+    completed by each fragment.
+
+    Only bracket and string state is tracked, so scanning costs one pass over
+    the text; ``json.loads`` runs once per completed question. Questions are
+    the objects directly inside the array under the top-level ``"questions"``
+    key, or inside a top-level array when the model returns a bare list.
+    """
+
+    def __init__(self):
+        self._stack = []  # open '{' / '[' outside the current question
+        self._in_string = False
+        self._escape = False
+        self._string = []  # current string, when it may be a key
+        self._last_string = None
+        self._key = None  # key awaiting its value in the top-level object
+        self._array_depth = None  # stack depth inside the questions array
+        self._question = None  # characters of the question being read
+        self._question_depth = 0
+        self.started = False
+        self.count = 0
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level JSON value has been closed."""
+        return self.started and not self._stack and self._question is None
+
+    def feed(self, text: str) -> list:
+        questions = []
+        for ch in text:
+            if self._question is not None:
+                question = self._feed_question(ch)
+                if question is not None:
+                    questions.append(question)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = ''.join(self._string)
+                    self._string = []
+                    continue
+                self._string.append(ch)
+                continue
+
+            if not self._stack:
+                # Text around the JSON (code fences, a lead-in sentence) is skipped
+                if ch == '{' or ch == '[':
+                    self.started = True
+                    self._stack.append(ch)
+                    if ch == '[':
+                        self._array_depth = 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == ':':
+                if len(self._stack) == 1 and self._stack[0] == '{':
+                    self._key = self._last_string
+            elif ch == ',':
+                self._key = None
+            elif ch == '{':
+                if len(self._stack) == self._array_depth:
+                    self._question = ['{']
+                    self._question_depth = 1
+                else:
+                    self._stack.append(ch)
+            elif ch == '[':
+                self._stack.append(ch)
+                if self._array_depth is None and len(self._stack) == 2 and self._key == QUESTIONS_KEY:
+                    self._array_depth = 2
+            elif ch == ']' or ch == '}':
+                if len(self._stack) == self._array_depth:
+                    self._array_depth = None
+                self._stack.pop()
+        return questions
+
+    def _feed_question(self, ch: str):
+        self._question.append(ch)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == '\\':
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+            return None
+        if ch == '"':
+            self._in_string = True
+        elif ch == '{' or ch == '[':
+            self._question_depth += 1
+        elif ch == '}' or ch == ']':
+            self._question_depth -= 1
+            if self._question_depth == 0:
+                text, self._question = ''.join(self._question), None
+                try:
+                    question = json.loads(text)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed quiz question: %.200s", text)
+                    return None
+                if isinstance(question, dict):
+                    self.count += 1
+                    return question
+        return None
+
+
+def iter_questions(fragments, scanner: QuestionScanner = None):
+    """Yield question objects from an iterator of response fragments as they complete."""
+    scanner = scanner or QuestionScanner()
+    for fragment in fragments:
+        yield from scanner.feed(fragment)
+
+
+def salvage_questions(text: str) -> list:
+    """The complete question objects in a quiz response, even a truncated one."""
+    return QuestionScanner().feed(text)
@@ -0,0 +1,173 @@
+"""
+BM25 retrieval over transcript chunks.
+
+An inverted index is built once per chunk list (or raw context string) and
+kept in a process-local LRU, so repeated chat messages about the same
+transcript only pay for the query itself.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+from itertools import islice
+
+from .cache import LRUCache
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just let me more most my no nor not now of off on once only or other our ours out over
+own same she should so some such than that the their theirs them then there these they
+this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours
+""".split())
+
+# Built indexes are small relative to the text; keep enough for many live lessons
+INDEX_CACHE_SIZE = 128
+
+
+def tokenize(text: str):
+    """Lowercase alphanumeric terms, without stopwords and single characters."""
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class ChunkIndex:
+    """Okapi BM25 inverted index over a list of text chunks."""
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        postings = {}
+        doc_lengths = []
+        for doc_id, chunk in enumerate(self.chunks):
+            counts = {}
+            for token in tokenize(chunk):
+                counts[token] = counts.get(token, 0) + 1
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self._prepare()
+
+    @classmethod
+    def from_dict(cls, chunks, data: dict):
+        """Rebuild an index persisted with ``to_dict`` without re-tokenizing."""
+        index = cls.__new__(cls)
+        index.chunks = list(chunks)
+        index.postings = {term: [tuple(entry) for entry in docs] for term, docs in data['postings'].items()}
+        index.doc_lengths = list(data['doc_lengths'])
+        index._prepare()
+        return index
+
+    def to_dict(self) -> dict:
+        """JSON-serializable postings and document lengths."""
+        return {
+            'postings': {term: [list(entry) for entry in docs] for term, docs in self.postings.items()},
+            'doc_lengths': self.doc_lengths,
+        }
+
+    def _prepare(self):
+        """Derive IDF and per-document length norms from postings/doc_lengths."""
+        num_docs = len(self.doc_lengths)
+        avg_length = (sum(self.doc_lengths) / num_docs) if num_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self._norms = [
+            self.k1 * (1 - self.b + self.b * (length / avg_length if avg_length else 0.0))
+            for length in self.doc_lengths
+        ]
+
+    def search(self, query: str, k: int = 3):
+        """Return up to ``k`` ``(score, chunk_index)`` pairs, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in docs:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norms[doc_id])
+        # Ties go to the earlier chunk
+        return heapq.nsmallest(k, ((-score, doc_id) for doc_id, score in scores.items()))
+
+    def top_chunks(self, query: str, k: int = 3):
+        """
+        Best ``k`` chunks for ``query``, padded with the leading chunks when
+        fewer than ``k`` share a term with it (the first ``k`` when none do).
+        """
+        chosen = [doc_id for _, doc_id in self.search(query, k)]
+        if len(chosen) < k:
+            picked = set(chosen)
+            chosen += islice((doc_id for doc_id in range(len(self.chunks)) if doc_id not in picked), k - len(chosen))
+        return [self.chunks[doc_id] for doc_id in chosen]
+
+
+def locate_chunks(text: str, chunks):
+    """
+    Character ``(start, end)`` spans of each chunk within the original text.
+
+    Chunkers normalize whitespace, so chunks are located by their leading and
+    trailing words rather than by exact substring search.
+    """
+    spans = []
+    cursor = 0
+    for chunk in chunks:
+        words = chunk.split()
+        start, end = cursor, min(len(text), cursor + len(chunk))
+        if words:
+            head = re.compile(r'\s+'.join(re.escape(word) for word in words[:8]))
+            match = head.search(text, cursor)
+            if match:
+                start = match.start()
+            tail = re.compile(r'\s+'.join(re.escape(word) for word in words[-8:]))
+            match = tail.search(text, start)
+            if match:
+                end = match.end()
+        spans.append((start, end))
+        cursor = end
+    return spans
+
+
+_index_cache = LRUCache(INDEX_CACHE_SIZE)
+# Index lookups are reused across messages for as long as they stay in the LRU
+_INDEX_TTL = 6 * 60 * 60
+
+
+def _digest(parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cached_index(key: str, build) -> ChunkIndex:
+    """Process-cached index under an arbitrary key, built with ``build()`` on a miss."""
+    index = _index_cache.get(key)
+    if index is None:
+        index = build()
+        _index_cache.set(key, index, _INDEX_TTL)
+    return index
+
+
+def get_chunk_index(chunks) -> ChunkIndex:
+    """Cached ChunkIndex for an exact list of chunks."""
+    return cached_index('chunks:' + _digest(chunks), lambda: ChunkIndex(chunks))
+
+
+def get_text_index(text: str, chunker) -> ChunkIndex:
+    """Cached ChunkIndex for raw text, chunked with ``chunker`` on a miss."""
+    key = 'text:' + _digest([getattr(chunker, '__name__', ''), text])
+    return cached_index(key, lambda: ChunkIndex(chunker(text)))
@@ -0,0 +1,118 @@
+"""
+Server-Sent Events helpers for streaming AI responses.
+
+A stream is a series of ``token`` events (``{"text": "..."}``) followed by
+either a ``done`` event or an ``error`` event (``{"error": ..., "type": ...}``).
+
+Quiz streams send a ``question`` event (``{"index": i, "question": {...}}``)
+per question instead of ``token`` events, as soon as the question's JSON is
+complete; their ``done`` event carries ``{"count": n, "truncated": bool}``.
+"""
+
+import json
+import logging
+
+from django.http import StreamingHttpResponse
+
+from .quiz_stream import QuestionScanner
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream(request) -> bool:
+    """True when the client opted into SSE via ``"stream": true`` or ``?stream=1``."""
+    flag = request.data.get('stream') if hasattr(request, 'data') else None
+    if flag is None:
+        flag = request.query_params.get('stream') if hasattr(request, 'query_params') else None
+    if isinstance(flag, str):
+        return flag.lower() in ('1', 'true', 'yes')
+    return bool(flag)
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_events(fragments, done_payload: dict = None):
+    """Wrap an iterator of text fragments as SSE ``token``/``done``/``error`` events."""
+    # An initial comment flushes headers through proxies right away
+    yield ": stream-open\n\n"
+    try:
+        for fragment in fragments:
+            yield sse_event('token', {'text': fragment})
+    except Exception as e:
+        logger.error("AI stream failed: %s", e, exc_info=True)
+        yield sse_event('error', {'error': str(e), 'type': type(e).__name__})
+        return
+    yield sse_event('done', done_payload or {})
+
+
+async def asse_events(fragments, done_payload: dict = None):
+    """``sse_events`` for an async iterator of fragments (ASGI views)."""
+    yield ": stream-open\n\n"
+    try:
+        async for fragment in fragments:
+            yield sse_event('token', {'text': fragment})
+    except Exception as e:
+        logger.error("AI stream failed: %s", e, exc_info=True)
+        yield sse_event('error', {'error': str(e), 'type': type(e).__name__})
+        return
+    yield sse_event('done', done_payload or {})
+
+
+def _quiz_done(scanner: QuestionScanner) -> dict:
+    # A reply cut off by max_tokens still delivers its complete questions
+    if not scanner.complete:
+        logger.info("Quiz stream ended early; delivered %d complete questions", scanner.count)
+    return {'count': scanner.count, 'truncated': not scanner.complete}
+
+
+def quiz_sse_events(fragments):
+    """SSE ``question``/``done``/``error`` events for a streamed quiz response."""
+    yield ": stream-open\n\n"
+    scanner = QuestionScanner()
+    try:
+        for fragment in fragments:
+            for question in scanner.feed(fragment):
+                yield sse_event('question', {'index': scanner.count - 1, 'question': question})
+    except Exception as e:
+        logger.error("AI quiz stream failed: %s", e, exc_info=True)
+        yield sse_event('error', {'error': str(e), 'type': type(e).__name__, 'count': scanner.count})
+        return
+    yield sse_event('done', _quiz_done(scanner))
+
+
+async def aquiz_sse_events(fragments):
+    """``quiz_sse_events`` for an async iterator of fragments (ASGI views)."""
+    yield ": stream-open\n\n"
+    scanner = QuestionScanner()
+    try:
+        async for fragment in fragments:
+            for question in scanner.feed(fragment):
+                yield sse_event('question', {'index': scanner.count - 1, 'question': question})
+    except Exception as e:
+        logger.error("AI quiz stream failed: %s", e, exc_info=True)
+        yield sse_event('error', {'error': str(e), 'type': type(e).__name__, 'count': scanner.count})
+        return
+    yield sse_event('done', _quiz_done(scanner))
+
+
+def _event_stream_response(events) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Disable buffering in nginx-style proxies so tokens are forwarded immediately
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def sse_response(fragments, done_payload: dict = None) -> StreamingHttpResponse:
+    if hasattr(fragments, '__aiter__'):
+        return _event_stream_response(asse_events(fragments, done_payload))
+    return _event_stream_response(sse_events(fragments, done_payload))
+
+
+def quiz_sse_response(fragments) -> StreamingHttpResponse:
+    """Stream a quiz response as one ``question`` event per completed question."""
+    if hasattr(fragments, '__aiter__'):
+        return _event_stream_response(aquiz_sse_events(fragments))
+    return _event_stream_response(quiz_sse_events(fragments))
@@ -0,0 +1,142 @@
+"""
+Incremental transcript summarization.
+
+Chunk summaries are stored as ChunkSummary rows under a hash of the chunk's
+normalized text, and the global summary under a hash of the chunk summaries
+it combines. Summarizing a transcript again only sends chunks whose text
+changed to the provider, and the global summary is only recomputed when one
+of its chunk summaries changed: an unchanged transcript costs no provider
+calls, a one-paragraph edit about two (its chunk plus the global summary).
+
+That only holds if an edit leaves the other chunks' text unchanged.
+``chunk_text_for_ai`` packs paragraphs greedily, so an edit that changes a
+chunk's length shifts every boundary after it. ``chunk_text_stable`` picks
+boundaries from the content instead (content-defined chunking): a chunk ends
+at a word whose hash meets a condition once the chunk has a minimum length,
+so boundaries after an edit fall back into place within a chunk or two.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import ChunkSummary
+
+logger = logging.getLogger(__name__)
+
+# Bump when chunk_summary_prompt or global_summary_prompt change
+SUMMARY_VERSION = 1
+
+DEFAULT_RETENTION_DAYS = 90
+PRUNE_INTERVAL = 60 * 60
+TOUCH_AFTER = timedelta(days=1)
+
+_last_prune = 0.0
+
+
+def summary_cache_enabled() -> bool:
+    return getattr(settings, 'AI_SUMMARY_CACHE_ENABLED', True)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def chunk_hash(chunk_text: str) -> str:
+    # Whitespace-only edits keep the cached summary
+    return _digest(ChunkSummary.Kind.CHUNK, SUMMARY_VERSION, ' '.join(chunk_text.split()))
+
+
+def global_hash(chunk_summaries) -> str:
+    return _digest(ChunkSummary.Kind.GLOBAL, SUMMARY_VERSION, *chunk_summaries)
+
+
+def cached_summaries(hashes) -> dict:
+    """``{hash: summary}`` for the given hashes that have a stored summary."""
+    hashes = set(hashes)
+    if not hashes or not summary_cache_enabled():
+        return {}
+    found = dict(ChunkSummary.objects.filter(content_hash__in=hashes).values_list('content_hash', 'summary'))
+    if found:
+        # Keep rows in use from being pruned (at most one write per row per day)
+        now = timezone.now()
+        ChunkSummary.objects.filter(content_hash__in=found, last_used_at__lt=now - TOUCH_AFTER).update(last_used_at=now)
+    return found
+
+
+def store_summaries(kind: str, summaries: dict):
+    """Store ``{hash: summary}`` entries of one kind; existing hashes are kept."""
+    if not summaries or not summary_cache_enabled():
+        return
+    try:
+        ChunkSummary.objects.bulk_create(
+            [ChunkSummary(content_hash=key, kind=kind, summary=summary) for key, summary in summaries.items()],
+            ignore_conflicts=True,
+        )
+    except IntegrityError as e:
+        logger.warning(f"Could not store {kind} summaries: {e}")
+    _prune()
+
+
+def _prune():
+    global _last_prune
+    if time.monotonic() - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = time.monotonic()
+    days = getattr(settings, 'AI_SUMMARY_CACHE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    ChunkSummary.objects.filter(last_used_at__lt=timezone.now() - timedelta(days=days)).delete()
+
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def _is_boundary(word: str, trailing: str, size: int, min_size: int) -> bool:
+    if size < min_size:
+        return False
+    if _PARAGRAPH_BREAK.search(trailing):
+        return True
+    h = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'big')
+    if word[-1] in '.!?':
+        # Prefer sentence ends: about one in 16 qualifies
+        return h % 16 == 0
+    # Unpunctuated text (auto-generated captions): about one word in 256
+    return h % 256 == 0
+
+
+def chunk_text_stable(text: str, max_chunk_size: int = 3500):
+    """
+    Split ``text`` into chunks of at most ``max_chunk_size`` characters whose
+    boundaries depend on the content, so a local edit changes only nearby chunks.
+
+    Chunks end at a paragraph break, a qualifying sentence end or a
+    qualifying word once they hold a fifth of ``max_chunk_size``. The minimum
+    is kept small because a boundary can only be missed after an edit when it
+    falls inside the minimum; most chunks are 1-3k characters.
+    """
+    if not text:
+        return []
+
+    min_size = max_chunk_size // 5
+    chunks = []
+    current = []
+    size = 0
+    for match in re.finditer(r'(\S+)(\s*)', text):
+        word, trailing = match.group(1), match.group(2)
+        if current and size + len(word) > max_chunk_size:
+            chunks.append(''.join(current).strip())
+            current, size = [], 0
+        current.append(word + trailing)
+        size += len(word) + len(trailing)
+        if _is_boundary(word, trailing, size, min_size):
+            chunks.append(''.join(current).strip())
+            current, size = [], 0
+
+    if current and ''.join(current).strip():
+        chunks.append(''.join(current).strip())
+    return chunks
@@ -0,0 +1,28 @@
+"""Background job handlers for the AI endpoints (see jobs.registry)."""
+
+from jobs.registry import register
+from .models import TutorSession
+from .tutor_sessions import fold_session
+from .views import call_ai, parse_quiz_response, quiz_prompt, summarize_chunk_list
+
+
+@register('generate_quiz')
+def generate_quiz(job):
+    payload = job.payload
+    prompt = quiz_prompt(payload['transcript'], payload.get('num_questions', 5), payload.get('difficulty', 'medium'))
+    response_text = call_ai(prompt, max_tokens=1000, endpoint='generate_quiz')
+    return parse_quiz_response(response_text), 200
+
+
+@register('summarize_chunks')
+def summarize_chunks(job):
+    return summarize_chunk_list(job.payload['chunks']), 200
+
+
+@register('fold_tutor_session')
+def fold_tutor_session(job):
+    """Roll a tutor session's older turns into its running summary (see ai_service.tutor_sessions)."""
+    session = TutorSession.objects.filter(pk=job.payload['session_id']).first()
+    if session is None:
+        return {'session_id': job.payload['session_id'], 'folded': 0}, 200
+    return {'session_id': session.id, 'folded': fold_session(session)}, 200
@@ -0,0 +1,293 @@
+"""
+Telemetry for AI provider calls.
+
+Every Gemini/OpenRouter call made by the call_ai chains (sync, async and
+streaming) runs inside ``provider_call``, which records:
+
+- latency, in a fixed-bucket histogram per provider and endpoint
+- prompt/completion tokens (as reported by the provider, else estimated
+  from characters)
+- the outcome and, for failures, an error class (quota, timeout, ...)
+- whether the call was a fallback after the primary provider failed or was
+  skipped, plus a fallback counter per endpoint and reason
+
+Counters live in this worker's memory and are rendered in the Prometheus
+text format by ``GET /api/ai/metrics/prometheus/``. Each call is also
+buffered as an AICallSample and bulk-inserted every AI_TELEMETRY_FLUSH_INTERVAL
+seconds, so ``manage.py ai_latency_report`` can compute percentiles across
+all workers.
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from services.periodic import PeriodicFlusher
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+DEFAULT_FLUSH_INTERVAL = 10  # seconds
+DEFAULT_RETENTION_DAYS = 14
+PRUNE_INTERVAL = 60 * 60
+
+CHARS_PER_TOKEN = 4  # rough average for English text
+
+_current_call = contextvars.ContextVar('ai_provider_call', default=None)
+
+
+def error_class(exc: BaseException) -> str:
+    """Coarse, low-cardinality class of a provider error."""
+    if isinstance(exc, (GeneratorExit, asyncio.CancelledError)):
+        return 'cancelled'
+    text = str(exc)
+    if 'RESOURCE_EXHAUSTED' in text or 'quota' in text.lower() or '429' in text:
+        return 'quota'
+    if isinstance(exc, requests.exceptions.Timeout) or 'timed out' in text.lower():
+        return 'timeout'
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return 'connection'
+    match = re.match(r'OpenRouter error: (\d{3})', text)
+    code = int(match.group(1)) if match else getattr(exc, 'code', None)
+    if isinstance(code, int) and code >= 500:
+        return 'server_error'
+    if isinstance(code, int) and code >= 400:
+        return 'client_error'
+    if 'not configured' in text:
+        return 'config'
+    return type(exc).__name__
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text or '') // CHARS_PER_TOKEN)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Telemetry:
+    """In-process AI call counters plus a buffer of samples for the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+        self._flusher = PeriodicFlusher(
+            'ai-telemetry-flush',
+            self.flush,
+            lambda: getattr(settings, 'AI_TELEMETRY_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+        )
+        self._last_prune = 0.0
+
+    def reset(self):
+        with self._lock:
+            self.calls = defaultdict(int)      # (provider, endpoint, mode, outcome)
+            self.latency = defaultdict(_Histogram)  # (provider, endpoint, mode)
+            self.tokens = defaultdict(int)     # (provider, endpoint, kind)
+            self.errors = defaultdict(int)     # (provider, endpoint, error_class)
+            self.fallbacks = defaultdict(int)  # (endpoint, from, to, reason)
+            self._samples = []
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, 'AI_TELEMETRY_ENABLED', True)
+
+    def record_call(self, call, exc: BaseException = None):
+        outcome = 'ok' if exc is None else 'error'
+        err = error_class(exc) if exc is not None else ''
+        prompt_tokens = call.prompt_tokens
+        completion_tokens = call.completion_tokens
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(call.prompt)
+        if completion_tokens is None:
+            completion_tokens = -(-call.completion_chars // CHARS_PER_TOKEN)
+
+        endpoint = call.endpoint or ''
+        with self._lock:
+            self.calls[(call.provider, endpoint, call.mode, outcome)] += 1
+            self.latency[(call.provider, endpoint, call.mode)].observe(call.latency)
+            self.tokens[(call.provider, endpoint, 'prompt')] += prompt_tokens
+            self.tokens[(call.provider, endpoint, 'completion')] += completion_tokens
+            if err:
+                self.errors[(call.provider, endpoint, err)] += 1
+            self._samples.append({
+                'created_at': timezone.now(),
+                'provider': call.provider,
+                'endpoint': endpoint[:50],
+                'mode': call.mode,
+                'outcome': outcome,
+                'error_class': err[:50],
+                'fallback': call.fallback,
+                'latency_ms': call.latency * 1000,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'tokens_estimated': estimated,
+            })
+        self._flusher.ensure_started()
+
+    def record_fallback(self, endpoint, from_provider: str, to_provider: str, reason: str):
+        with self._lock:
+            self.fallbacks[(endpoint or '', from_provider, to_provider, reason)] += 1
+
+    def flush(self):
+        """Bulk-insert buffered samples and prune old ones."""
+        from .models import AICallSample
+
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if samples:
+            AICallSample.objects.bulk_create([AICallSample(**sample) for sample in samples], batch_size=500)
+
+        if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = time.monotonic()
+            days = getattr(settings, 'AI_TELEMETRY_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+            AICallSample.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+        return len(samples)
+
+    def render_prometheus(self) -> str:
+        """This worker's counters in the Prometheus text exposition format."""
+        with self._lock:
+            calls = dict(self.calls)
+            latency = {key: (list(h.buckets), h.sum, h.count) for key, h in self.latency.items()}
+            tokens = dict(self.tokens)
+            errors = dict(self.errors)
+            fallbacks = dict(self.fallbacks)
+
+        def labels(**values):
+            return '{' + ','.join(
+                f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                for name, value in values.items()
+            ) + '}'
+
+        lines = [
+            '# HELP edureach_ai_provider_calls_total AI provider calls by outcome.',
+            '# TYPE edureach_ai_provider_calls_total counter',
+        ]
+        for (provider, endpoint, mode, outcome), n in sorted(calls.items()):
+            lines.append(f'edureach_ai_provider_calls_total{labels(provider=provider, endpoint=endpoint, mode=mode, outcome=outcome)} {n}')
+
+        lines += [
+            '# HELP edureach_ai_provider_latency_seconds AI provider call latency.',
+            '# TYPE edureach_ai_provider_latency_seconds histogram',
+        ]
+        for (provider, endpoint, mode), (buckets, total, count) in sorted(latency.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                cumulative += n
+                lines.append(
+                    f'edureach_ai_provider_latency_seconds_bucket'
+                    f'{labels(provider=provider, endpoint=endpoint, mode=mode, le=bound)} {cumulative}'
+                )
+            lines.append(
+                f'edureach_ai_provider_latency_seconds_bucket{labels(provider=provider, endpoint=endpoint, mode=mode, le="+Inf")} {count}'
+            )
+            lines.append(f'edureach_ai_provider_latency_seconds_sum{labels(provider=provider, endpoint=endpoint, mode=mode)} {total:.6f}')
+            lines.append(f'edureach_ai_provider_latency_seconds_count{labels(provider=provider, endpoint=endpoint, mode=mode)} {count}')
+
+        lines += [
+            '# HELP edureach_ai_tokens_total Prompt and completion tokens sent to / received from AI providers.',
+            '# TYPE edureach_ai_tokens_total counter',
+        ]
+        for (provider, endpoint, kind), n in sorted(tokens.items()):
+            lines.append(f'edureach_ai_tokens_total{labels(provider=provider, endpoint=endpoint, kind=kind)} {n}')
+
+        lines += [
+            '# HELP edureach_ai_provider_errors_total Failed AI provider calls by error class.',
+            '# TYPE edureach_ai_provider_errors_total counter',
+        ]
+        for (provider, endpoint, err), n in sorted(errors.items()):
+            lines.append(f'edureach_ai_provider_errors_total{labels(provider=provider, endpoint=endpoint, error=err)} {n}')
+
+        lines += [
+            '# HELP edureach_ai_fallbacks_total Requests routed past the primary AI provider.',
+            '# TYPE edureach_ai_fallbacks_total counter',
+        ]
+        for (endpoint, from_provider, to_provider, reason), n in sorted(fallbacks.items()):
+            lines.append(
+                f'edureach_ai_fallbacks_total{labels(endpoint=endpoint, from_provider=from_provider, to_provider=to_provider, reason=reason)} {n}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+telemetry = Telemetry()
+
+
+class provider_call:
+    """
+    Time one provider call and record it when the block exits::
+
+        with provider_call('openrouter', endpoint, prompt) as call:
+            text = ...
+            call.completed(text)
+
+    Providers report token usage with ``note_usage`` from inside the block.
+    An exception leaving the block is recorded with its error class and
+    re-raised.
+    """
+
+    def __init__(self, provider: str, endpoint, prompt: str, *, mode: str = 'call', fallback: bool = False):
+        self.provider = provider
+        self.endpoint = endpoint
+        self.prompt = prompt
+        self.mode = mode
+        self.fallback = fallback
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.completion_chars = 0
+        self.latency = 0.0
+
+    def completed(self, text: str):
+        self.completion_chars += len(text or '')
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._token = _current_call.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.latency = time.perf_counter() - self._started
+        try:
+            _current_call.reset(self._token)
+        except ValueError:
+            # Generator finalized from another context
+            pass
+        if telemetry.enabled:
+            try:
+                telemetry.record_call(self, exc)
+            except Exception:
+                logger.exception("Failed to record AI call telemetry")
+        return False
+
+
+def note_usage(prompt_tokens=None, completion_tokens=None):
+    """Attach provider-reported token counts to the current ``provider_call``."""
+    call = _current_call.get()
+    if call is None:
+        return
+    if prompt_tokens is not None:
+        call.prompt_tokens = int(prompt_tokens)
+    if completion_tokens is not None:
+        call.completion_tokens = int(completion_tokens)
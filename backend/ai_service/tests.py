@@ -0,0 +1,93 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from courses.models import Course, Lesson
+from services import http_client
+
+from . import async_views, views
+from .circuit_breaker import HALF_OPEN, CircuitBreaker, ProviderUnavailableError
+from .providers import FakeProvider, using_provider
+from .retrieval import ChunkIndex
+
+
+@override_settings(AI_CACHE_ENABLED=False, AI_TELEMETRY_ENABLED=False, AI_BREAKER_FAILURE_THRESHOLD=1)
+class CallAITests(TestCase):
+    def setUp(self):
+        # Breaker state and in-flight markers live in the shared cache
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_call_ai_answers_from_provider(self):
+        provider = FakeProvider(latency=0, tokens=5)
+        with using_provider(provider):
+            text = views.call_ai('Explain photosynthesis in plants', max_tokens=50)
+        self.assertTrue(text.strip())
+        self.assertEqual(provider.stats()['calls'], 1)
+
+    def test_call_ai_raises_unavailable_once_breaker_opens(self):
+        provider = FakeProvider(latency=0, error_rate=1.0)
+        with using_provider(provider):
+            with self.assertRaises(RuntimeError):
+                views.call_ai('Explain osmosis', max_tokens=50)
+            with self.assertRaises(ProviderUnavailableError):
+                views.call_ai('Explain osmosis', max_tokens=50)
+        self.assertEqual(provider.stats()['calls'], 1)
+
+    def test_acall_ai_answers_from_event_loop(self):
+        # The default shared cache is a database table; none of it may be called on the loop
+        provider = FakeProvider(latency=0, tokens=5)
+        with using_provider(provider):
+            text = async_to_sync(async_views.acall_ai)('Explain photosynthesis in plants', max_tokens=50)
+        self.assertTrue(text.strip())
+        self.assertEqual(provider.stats()['calls'], 1)
+
+    def test_openrouter_uses_http_session(self):
+        # Tutor sessions also export a get_session; it must not shadow the HTTP one
+        self.assertIs(views.get_session, http_client.get_session)
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.breaker = CircuitBreaker('test')
+        # Cooldown just expired: half-open
+        cache.set(self.breaker.key, {'failures': 3, 'window_started': 0.0, 'open_until': 1.0}, 60)
+
+    def test_half_open_admits_one_probe(self):
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_uncounted_probe_failure_releases_probe(self):
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure(None, ValueError('bad request'))
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_abandoned_probe_is_released(self):
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.release_probe()
+        self.assertTrue(self.breaker.allow_request())
+
+
+class ChatPromptTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='student')
+        course = Course.objects.create(title='Biology', description='Cells', owner=self.user)
+        self.lesson = Lesson.objects.create(course=course, title='Osmosis', order=1)
+
+    def test_lesson_without_transcript_uses_client_context(self):
+        prompt, _ = views.chat_prompt(self.user, 'What is osmosis?', 'Osmosis moves water across membranes.', self.lesson.id)
+        self.assertIn('Osmosis moves water across membranes.', prompt)
+
+
+class ChunkIndexTests(TestCase):
+    def test_top_chunks_pads_with_leading_chunks(self):
+        index = ChunkIndex(['Cells divide.', 'Water moves.', 'Osmosis moves water across membranes.', 'Proteins fold.'])
+        self.assertEqual(index.top_chunks('osmosis', 3), [
+            'Osmosis moves water across membranes.', 'Cells divide.', 'Water moves.',
+        ])
+        self.assertEqual(index.top_chunks('photosynthesis', 2), ['Cells divide.', 'Water moves.'])
@@ -0,0 +1,179 @@
+"""
+Server-side tutor conversations with bounded memory.
+
+``ai_tutor`` and ``chat`` take a ``session_id``; each exchange is stored as
+two TutorTurn rows. The prompt carries the session's running summary plus
+the last TUTOR_SESSION_RECENT_TURNS turns verbatim, so its size stays flat
+however long the conversation gets.
+
+Once more than TUTOR_SESSION_RECENT_TURNS + TUTOR_SESSION_FOLD_BATCH turns
+are outside the summary, a ``fold_tutor_session`` job rolls the older ones
+into it with one short AI call, off the request path. Until it runs, turns
+older than the recent window are simply left out of the prompt.
+
+Prompts keep the parts that don't change between messages (instructions,
+lesson, notes) first and the per-message parts (history, excerpts, question)
+last, so providers that cache prompt prefixes can reuse them.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import enqueue
+from .models import TutorSession, TutorTurn
+
+logger = logging.getLogger(__name__)
+
+FOLD_JOB = 'fold_tutor_session'
+DEFAULT_RECENT_TURNS = 6
+DEFAULT_FOLD_BATCH = 4
+DEFAULT_RETENTION_DAYS = 30
+TURN_MAX_CHARS = 1500
+SUMMARY_MAX_TOKENS = 250
+PRUNE_INTERVAL = 60 * 60
+
+_last_prune = 0.0
+
+
+def _recent_turns() -> int:
+    return getattr(settings, 'TUTOR_SESSION_RECENT_TURNS', DEFAULT_RECENT_TURNS)
+
+
+def _fold_batch() -> int:
+    return getattr(settings, 'TUTOR_SESSION_FOLD_BATCH', DEFAULT_FOLD_BATCH)
+
+
+def get_session(user, session_id=None, lesson=None) -> TutorSession:
+    """
+    The user's session ``session_id`` about ``lesson``, or a new one when it
+    is None. Raises TutorSession.DoesNotExist for another user's, another
+    lesson's or a deleted session.
+    """
+    if session_id in (None, ''):
+        return TutorSession.objects.create(user=user, lesson=lesson)
+    return TutorSession.objects.get(pk=session_id, user=user, lesson=lesson)
+
+
+def _clip(text: str) -> str:
+    if len(text) <= TURN_MAX_CHARS:
+        return text
+    return text[:TURN_MAX_CHARS].rsplit(' ', 1)[0] + ' ...'
+
+
+def _format_turns(turns) -> str:
+    return '\n'.join(f"{turn.get_role_display()}: {_clip(turn.content)}" for turn in turns)
+
+
+def recent_turns(session: TutorSession):
+    """The turns shown verbatim in the prompt, oldest first."""
+    shown = min(_recent_turns(), session.turns.count() - session.summarized_turns)
+    if shown <= 0:
+        return []
+    recent = list(session.turns.order_by('-id')[:shown])
+    recent.reverse()
+    return recent
+
+
+def history_block(session: TutorSession) -> str:
+    """The conversation so far for the prompt: running summary plus recent turns ('' for a new session)."""
+    parts = []
+    if session.summary:
+        parts.append(f"Conversation so far (summary):\n{session.summary}")
+    turns = recent_turns(session)
+    if turns:
+        parts.append(f"Recent messages:\n{_format_turns(turns)}")
+    return '\n\n'.join(parts)
+
+
+def last_student_message(session: TutorSession) -> str:
+    """The previous question, so follow-ups like "explain that again" still retrieve the right excerpts."""
+    turn = session.turns.filter(role=TutorTurn.Role.STUDENT).order_by('-id').first()
+    return turn.content if turn else ''
+
+
+def record_exchange(session: TutorSession, message: str, answer: str):
+    """Store one question and answer; schedules a fold once enough turns are outside the summary."""
+    TutorTurn.objects.bulk_create([
+        TutorTurn(session=session, role=TutorTurn.Role.STUDENT, content=message),
+        TutorTurn(session=session, role=TutorTurn.Role.TUTOR, content=answer),
+    ])
+    TutorSession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+
+    unsummarized = session.turns.count() - session.summarized_turns
+    if unsummarized > _recent_turns() + _fold_batch():
+        pending = Job.objects.filter(
+            kind=FOLD_JOB,
+            status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+            payload__session_id=session.pk,
+        ).exists()
+        if not pending:
+            enqueue(FOLD_JOB, {'session_id': session.pk})
+    _prune()
+
+
+def record_stream(session: TutorSession, message: str, fragments):
+    """Pass a streamed answer through, storing the exchange once it completes."""
+    parts = []
+    for fragment in fragments:
+        parts.append(fragment)
+        yield fragment
+    record_exchange(session, message, ''.join(parts))
+
+
+async def arecord_stream(session: TutorSession, message: str, fragments):
+    """``record_stream`` for an async iterator of fragments (ASGI views)."""
+    parts = []
+    async for fragment in fragments:
+        parts.append(fragment)
+        yield fragment
+    await sync_to_async(record_exchange)(session, message, ''.join(parts))
+
+
+def fold_prompt(summary: str, turns) -> str:
+    return f"""Update the running summary of a tutoring conversation with the new messages below.
+Keep what the student asked, what was explained, and anything they struggled with. At most 120 words.
+
+Current summary:
+{summary or '(none)'}
+
+New messages:
+{_format_turns(turns)}
+
+Updated summary:"""
+
+
+def fold_session(session: TutorSession) -> int:
+    """Roll the turns older than the recent window into the summary; returns how many were folded."""
+    from .views import call_ai
+
+    unsummarized = list(session.turns.all()[session.summarized_turns:])
+    fold = unsummarized[:max(0, len(unsummarized) - _recent_turns())]
+    if not fold:
+        return 0
+
+    summary = call_ai(fold_prompt(session.summary, fold), max_tokens=SUMMARY_MAX_TOKENS, endpoint='tutor_fold').strip()
+    # Conditional on summarized_turns, so a concurrent fold can't apply twice
+    updated = TutorSession.objects.filter(pk=session.pk, summarized_turns=session.summarized_turns).update(
+        summary=summary,
+        summarized_turns=F('summarized_turns') + len(fold),
+    )
+    if not updated:
+        return 0
+    logger.debug("Folded %d turns of tutor session %s into its summary", len(fold), session.pk)
+    return len(fold)
+
+
+def _prune():
+    global _last_prune
+    if time.monotonic() - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = time.monotonic()
+    days = getattr(settings, 'TUTOR_SESSION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    TutorSession.objects.filter(updated_at__lt=timezone.now() - timedelta(days=days)).delete()
@@ -1,14 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from .views import generate_study_plan, explain_concept, summarize_chunks, chat, generate_quiz
-from . import debug_views
+from . import debug_views, metrics_views
+
+# Under ASGI (ASYNC_VIEWS=True) the AI endpoints are served by native async views
+if settings.ASYNC_VIEWS:
+    from . import async_views as ai_views
+else:
+    from . import views as ai_views
 
 urlpatterns = [
     # Production AI endpoints (use unified call_ai with Gemini primary, OpenRouter fallback)
-    path('ai/generate-quiz/', generate_quiz, name='generate_quiz'),
-    path('ai/chat/', chat, name='chat'),
-    path('ai/study-plan/', generate_study_plan, name='generate_study_plan'),
-    path('ai/explain/', explain_concept, name='explain_concept'),
-    path('ai/summarize-chunks/', summarize_chunks, name='summarize_chunks'),
+    path('ai/generate-quiz/', ai_views.generate_quiz, name='generate_quiz'),
+    path('ai/chat/', ai_views.chat, name='chat'),
+    path('ai/study-plan/', ai_views.generate_study_plan, name='generate_study_plan'),
+    path('ai/explain/', ai_views.explain_concept, name='explain_concept'),
+    path('ai/summarize-chunks/', ai_views.summarize_chunks, name='summarize_chunks'),
+
+    # Operational metrics (admin only)
+    path('ai/metrics/', metrics_views.ai_metrics, name='ai_metrics'),
+    path('ai/metrics/prometheus/', metrics_views.prometheus_metrics, name='ai_metrics_prometheus'),
 
     # Debug endpoints (direct Gemini calls, for troubleshooting only)
     path('ai/debug/generate-quiz/', debug_views.generate_quiz, name='debug_generate_quiz'),
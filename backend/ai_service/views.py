@@ -9,8 +9,28 @@ import logging
 import re
 import requests
 
+from courses.segments import parse_timestamp
+from jobs.queue import accepted_payload, enqueue, wants_background
+from services.http_client import get_session
+from services.singleflight import SingleFlight
+from users.metering import ai_metered
+from .cache import response_cache
+from .circuit_breaker import QUOTA, SERVER, ProviderUnavailableError, breaker_for
+from .concurrency import map_concurrent, provider_limiter
+from .models import ChunkSummary, TutorSession
+from .providers import provider_chain
+from .quiz_stream import salvage_questions
+from .retrieval import get_chunk_index, get_text_index
+from .streaming import quiz_sse_response, sse_response, wants_stream
+from .summaries import cached_summaries, chunk_hash, chunk_text_stable, global_hash, store_summaries
+from .telemetry import error_class, note_usage, provider_call, telemetry
+from .tutor_sessions import get_session as get_tutor_session, history_block, record_exchange, record_stream
+
 logger = logging.getLogger(__name__)
 
+# Covers a Gemini attempt plus the OpenRouter fallback (60s read timeout)
+ai_flight = SingleFlight('ai', timeout=90)
+
 
 def _is_rate_limit_error(exc: Exception) -> bool:
     try:
@@ -22,6 +42,22 @@ def _is_rate_limit_error(exc: Exception) -> bool:
     return False
 
 
+def _breaker_failure_kind(exc: Exception):
+    """Classify a provider error for its circuit breaker; None if it should not count."""
+    if _is_rate_limit_error(exc):
+        return QUOTA
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return SERVER
+    # google.api_core errors carry the HTTP status as .code
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int) and code >= 500:
+        return SERVER
+    match = re.match(r'OpenRouter error: (\d{3})', str(exc))
+    if match and int(match.group(1)) >= 500:
+        return SERVER
+    return None
+
+
 def call_generate_content_with_handling(model, *args, **kwargs):
     try:
         return model.generate_content(*args, **kwargs)
@@ -56,15 +92,14 @@ def call_gemini(prompt: str, max_output_tokens: int = 400):
             'max_output_tokens': max_output_tokens,
         },
     )
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        note_usage(getattr(usage, 'prompt_token_count', None), getattr(usage, 'candidates_token_count', None))
     return response
 
 
-def call_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
-    """Simple OpenRouter invocation as a fallback provider.
-
-    Uses settings.OPENROUTER_API_KEY and optional settings.OPENROUTER_API_URL.
-    Returns an object with a .text attribute for compatibility with Gemini responses.
-    """
+def _openrouter_request(prompt: str, model_name: str = None, max_tokens: int = 400):
+    """Build the OpenRouter chat-completions URL, payload and headers."""
     api_key = getattr(settings, 'OPENROUTER_API_KEY', None)
     if not api_key:
         raise RuntimeError('OPENROUTER_API_KEY not configured')
@@ -90,7 +125,18 @@ def call_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
     if app_name:
         headers['X-Title'] = app_name
 
-    resp = requests.post(api_url, json=payload, headers=headers, timeout=60)
+    return api_url, payload, headers
+
+
+def call_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
+    """Simple OpenRouter invocation as a fallback provider.
+
+    Uses settings.OPENROUTER_API_KEY and optional settings.OPENROUTER_API_URL.
+    Returns an object with a .text attribute for compatibility with Gemini responses.
+    """
+    api_url, payload, headers = _openrouter_request(prompt, model_name, max_tokens)
+
+    resp = get_session().post(api_url, json=payload, headers=headers, timeout=60)
     if resp.status_code >= 400:
         logger.error(
             "OpenRouter error: %s %s", resp.status_code, resp.text
@@ -98,6 +144,19 @@ def call_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
         raise RuntimeError(f'OpenRouter error: {resp.status_code} {resp.text}')
 
     data = resp.json()
+    usage = data.get('usage') or {}
+    note_usage(usage.get('prompt_tokens'), usage.get('completion_tokens'))
+    text = _openrouter_text(data)
+
+    class _R:
+        def __init__(self, t):
+            self.text = t
+
+    return _R(text)
+
+
+def _openrouter_text(data: dict) -> str:
+    """Completion text from an OpenRouter response body."""
     # Try common response shapes
     text = None
     try:
@@ -112,51 +171,232 @@ def call_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
     if not text:
         # fallback to raw stringified body
         text = json.dumps(data)
+    return text
 
-    class _R:
-        def __init__(self, t):
-            self.text = t
 
-    return _R(text)
+def _provider_route(prefer_openrouter: bool) -> str:
+    """Describe the provider/model chain call_ai will use, e.g. for cache keys."""
+    return '>'.join(provider.route() for provider in provider_chain(prefer_openrouter))
 
 
-def call_ai(prompt: str, *, max_tokens: int = 400, prefer_openrouter: bool | None = None):
+def call_ai(
+    prompt: str,
+    *,
+    max_tokens: int = 400,
+    prefer_openrouter: bool | None = None,
+    endpoint: str | None = None,
+):
     """Unified AI entry point.
 
     - Uses Gemini as primary when GEMINI_API_KEY is configured and
       PREFER_OPENROUTER is False.
     - When Gemini quota is exceeded or a clear rate/429 error is detected,
       falls back to OpenRouter.
-    - If Gemini is not configured or prefer_openrouter is True, goes straight
-      to OpenRouter.
+    - If Gemini is not configured, prefer_openrouter is True or Gemini's
+      circuit breaker is open, goes straight to OpenRouter.
+    - settings.AI_PROVIDERS replaces that chain (see ``ai_service.providers``).
+    - When ``endpoint`` is given, identical prompts are answered from the
+      response cache for that endpoint's TTL (see ``ai_service.cache``).
+    - Concurrent identical prompts share a single provider call
+      (see ``services.singleflight``).
     """
     # Determine preference: explicit arg overrides settings, else use settings
     if prefer_openrouter is None:
         prefer_openrouter = getattr(settings, 'PREFER_OPENROUTER', False)
 
-    gemini_configured = bool(getattr(settings, 'GEMINI_API_KEY', None))
+    cache_key = response_cache.make_key(prompt, _provider_route(prefer_openrouter), max_tokens)
+    ttl = response_cache.ttl_for(endpoint) if response_cache.enabled else 0
+    if ttl > 0:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("AI response cache hit for %s", endpoint)
+            return cached
+
+    def compute():
+        text = _call_providers(prompt, max_tokens, prefer_openrouter, endpoint)
+        if ttl > 0:
+            response_cache.set(cache_key, text, ttl)
+        return text
+
+    # Identical prompts already in flight (here or in another worker) are awaited, not re-sent
+    return ai_flight.do(cache_key, compute)
+
 
-    # Try Gemini first when configured and not preferring OpenRouter
-    if gemini_configured and not prefer_openrouter:
+def _call_providers(prompt: str, max_tokens: int, prefer_openrouter: bool, endpoint: str | None = None) -> str:
+    """Run the provider fallback chain (Gemini -> OpenRouter by default) without caching.
+
+    Providers whose circuit breaker is open are skipped; ProviderUnavailableError
+    is raised when no provider is left to try. Each provider call is recorded
+    in ``ai_service.telemetry`` under ``endpoint``.
+    """
+    chain = provider_chain(prefer_openrouter)
+    error = None
+    previous, fallback_reason = None, None
+    for position, provider in enumerate(chain):
+        breaker = breaker_for(provider.name)
+        if fallback_reason:
+            telemetry.record_fallback(endpoint, previous, provider.name, fallback_reason)
+        previous = provider.name
+        if not breaker.allow_request():
+            logger.debug("%s circuit open, skipping", provider.name)
+            error, fallback_reason = None, 'circuit_open'
+            continue
         try:
-            resp = call_gemini(prompt, max_output_tokens=max_tokens)
-            return resp.text
-        except RuntimeError as e:
-            # Explicitly tagged quota/429 errors from call_generate_content_with_handling
-            if 'GEMINI_QUOTA_EXCEEDED' in str(e):
-                logger.warning("Gemini quota exceeded, falling back to OpenRouter: %s", e)
-            else:
-                # Other runtime errors bubble up; they usually indicate misconfig
-                logger.error("Gemini runtime error, falling back to OpenRouter: %s", e, exc_info=True)
-            # Fall through to OpenRouter
+            with provider_limiter.acquire(provider.name), \
+                    provider_call(provider.name, endpoint, prompt, fallback=position > 0) as call:
+                text = provider.complete(prompt, max_tokens)
+                call.completed(text)
         except Exception as e:
-            # Any non-quota error from Gemini: log and fall back
-            logger.error("Gemini call failed, falling back to OpenRouter: %s", e, exc_info=True)
+            breaker.record_failure(_breaker_failure_kind(e), e)
+            error, fallback_reason = e, error_class(e)
+            if position < len(chain) - 1:
+                # Explicitly tagged quota/429 errors from call_generate_content_with_handling
+                if 'GEMINI_QUOTA_EXCEEDED' in str(e):
+                    logger.warning("%s quota exceeded, falling back: %s", provider.name, e)
+                else:
+                    logger.error("%s call failed, falling back: %s", provider.name, e, exc_info=True)
+            continue
+        breaker.record_success()
+        return text
+
+    if error is not None:
+        raise error
+    raise ProviderUnavailableError('AI providers are temporarily unavailable, please retry shortly')
+
+
+def stream_gemini(prompt: str, max_output_tokens: int = 400):
+    """Yield text fragments from Gemini as they are generated.
+
+    Quota/rate-limit errors are normalized like call_gemini, whether they are
+    raised by the initial request or while iterating the stream.
+    """
+    configure_gemini()
 
-    # If Gemini is not available or failed, use OpenRouter
-    logger.debug("Calling OpenRouter as fallback (or primary if preferred)")
-    resp = call_openrouter(prompt, max_tokens=max_tokens)
-    return resp.text
+    model_name = getattr(settings, 'GEMINI_MODEL_NAME', 'gemini-2.5-flash')
+    if 'flash' not in model_name.lower():
+        model_name = 'gemini-2.5-flash'
+
+    model = genai.GenerativeModel(model_name)
+    logger.debug("Streaming from Gemini model %s", model_name)
+
+    response = call_generate_content_with_handling(
+        model,
+        prompt,
+        generation_config={
+            'max_output_tokens': max_output_tokens,
+        },
+        stream=True,
+    )
+    try:
+        for chunk in response:
+            text = getattr(chunk, 'text', '')
+            if text:
+                yield text
+    except Exception as e:
+        if _is_rate_limit_error(e):
+            raise RuntimeError('GEMINI_QUOTA_EXCEEDED: ' + str(e))
+        raise
+
+
+def stream_openrouter(prompt: str, model_name: str = None, max_tokens: int = 400):
+    """Yield text fragments from OpenRouter's server-sent event stream."""
+    api_url, payload, headers = _openrouter_request(prompt, model_name, max_tokens)
+    payload['stream'] = True
+
+    with get_session().post(api_url, json=payload, headers=headers, timeout=60, stream=True) as resp:
+        if resp.status_code >= 400:
+            logger.error("OpenRouter stream error: %s %s", resp.status_code, resp.text)
+            raise RuntimeError(f'OpenRouter error: {resp.status_code} {resp.text}')
+
+        for line in resp.iter_lines(decode_unicode=True):
+            done, delta = _openrouter_stream_event(line)
+            if done:
+                break
+            if delta:
+                yield delta
+
+
+def _openrouter_stream_event(line: str):
+    """Parse one line of an OpenRouter SSE stream into ``(done, text_delta)``."""
+    # Blank lines separate events; ':' lines are keep-alive comments
+    if not line or line.startswith(':') or not line.startswith('data:'):
+        return False, None
+    data = line[5:].strip()
+    if data == '[DONE]':
+        return True, None
+    try:
+        return False, json.loads(data)['choices'][0].get('delta', {}).get('content')
+    except (ValueError, KeyError, IndexError):
+        return False, None
+
+
+def call_ai_stream(
+    prompt: str,
+    *,
+    max_tokens: int = 400,
+    prefer_openrouter: bool | None = None,
+    endpoint: str | None = None,
+):
+    """Streaming counterpart of call_ai: yields text fragments.
+
+    Follows the same Gemini -> OpenRouter fallback as call_ai, but a provider
+    can only be swapped before its first fragment has been sent; a failure
+    after that is raised to the caller. Providers with an open circuit
+    breaker are skipped the same way. Completed streams are stored in the
+    response cache and a cache hit is replayed as a single fragment.
+    """
+    if prefer_openrouter is None:
+        prefer_openrouter = getattr(settings, 'PREFER_OPENROUTER', False)
+
+    ttl = response_cache.ttl_for(endpoint) if response_cache.enabled else 0
+    cache_key = None
+    if ttl > 0:
+        cache_key = response_cache.make_key(prompt, _provider_route(prefer_openrouter), max_tokens)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    chain = provider_chain(prefer_openrouter)
+    error = None
+    previous, fallback_reason = None, None
+    for position, provider in enumerate(chain):
+        breaker = breaker_for(provider.name)
+        if fallback_reason:
+            telemetry.record_fallback(endpoint, previous, provider.name, fallback_reason)
+        previous = provider.name
+        if not breaker.allow_request():
+            error, fallback_reason = None, 'circuit_open'
+            continue
+        try:
+            with provider_limiter.acquire(provider.name), \
+                    provider_call(provider.name, endpoint, prompt, mode='stream', fallback=position > 0) as call:
+                for fragment in provider.stream(prompt, max_tokens):
+                    parts.append(fragment)
+                    call.completed(fragment)
+                    yield fragment
+        except GeneratorExit:
+            # Client went away mid-stream; don't leave a half-open probe slot taken
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            breaker.record_failure(_breaker_failure_kind(e), e)
+            if parts:
+                raise
+            error, fallback_reason = e, error_class(e)
+            if position < len(chain) - 1:
+                logger.warning("%s stream failed before first token, falling back: %s", provider.name, e)
+            continue
+        breaker.record_success()
+        break
+    else:
+        if error is not None:
+            raise error
+        raise ProviderUnavailableError('AI providers are temporarily unavailable, please retry shortly')
+
+    if cache_key:
+        response_cache.set(cache_key, ''.join(parts), ttl)
 
 
 def chunk_text_for_ai(text: str, max_chunk_size: int = 3500):
@@ -192,32 +432,14 @@ def chunk_text_for_ai(text: str, max_chunk_size: int = 3500):
 
 
 def find_relevant_context_chunks(chunks, message: str, max_chunks: int = 3):
+    """Rank chunks against the message with BM25 (see ai_service.retrieval).
+
+    The inverted index for a given chunk list is built once and reused across
+    messages. Falls back to the first chunks when nothing matches.
+    """
     if not chunks:
         return []
-
-    keywords = [
-        word for word in re.split(r'\s+', message.lower())
-        if len(word) > 3 and word.isalpha()
-    ]
-    if not keywords:
-        return chunks[:max_chunks]
-
-    scored = []
-    for index, chunk in enumerate(chunks):
-        chunk_lower = chunk.lower()
-        score = 0
-        for keyword in keywords:
-            exact = len(re.findall(rf'\b{re.escape(keyword)}\b', chunk_lower))
-            score += exact * 3
-            partial = len(re.findall(re.escape(keyword), chunk_lower))
-            score += max(partial - exact, 0)
-        score += (len(chunks) - index) * 0.1
-        scored.append((score, chunk, index))
-
-    scored.sort(key=lambda item: (-item[0], item[2]))
-    relevant = [item[1] for item in scored[:max_chunks] if item[0] > 0]
-
-    return relevant or chunks[:max_chunks]
+    return get_chunk_index(chunks).top_chunks(message, max_chunks)
 
 def configure_gemini():
     """Configure Gemini API with the API key from settings."""
@@ -228,8 +450,51 @@ def configure_gemini():
     logger.info("Gemini API configured successfully")
 
 
+def quiz_prompt(transcript: str, num_questions, difficulty: str) -> str:
+    return f"""Generate {num_questions} {difficulty} difficulty quiz questions from this transcript:
+
+{transcript}
+
+Return ONLY valid JSON (no extra text):
+{{"questions": [{{"question": "?", "type": "mcq", "options": ["A", "B", "C", "D"], "correct_answer": "A", "explanation": "Why"}}]}}
+
+Be concise. Questions should test key concepts."""
+
+
+def parse_quiz_response(response_text: str) -> dict:
+    """
+    Quiz JSON from a model response.
+
+    A response that isn't valid JSON (usually one cut off by max_tokens)
+    keeps its complete questions, flagged ``'truncated': True``; only when
+    none can be recovered is it returned as ``{'raw_response': ...}``.
+    """
+    # Extract JSON from response
+    response_text = response_text.strip()
+
+    # Remove markdown code blocks if present
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]
+    if response_text.startswith('```'):
+        response_text = response_text[3:]
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]
+
+    response_text = response_text.strip()
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        questions = salvage_questions(response_text)
+        if questions:
+            logger.info(f"Salvaged {len(questions)} questions from an incomplete quiz response")
+            return {'questions': questions, 'truncated': True}
+        # If JSON parsing fails, return the raw response
+        return {'raw_response': response_text}
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@ai_metered
 def generate_quiz(request):
     """
     Generate a quiz from transcript using Gemini API.
@@ -238,7 +503,9 @@ def generate_quiz(request):
     {
         "transcript": "string",
         "num_questions": int (optional, default: 5),
-        "difficulty": "easy|medium|hard" (optional, default: "medium")
+        "difficulty": "easy|medium|hard" (optional, default: "medium"),
+        "background": bool (optional, returns a job id to poll at /api/jobs/{id}/),
+        "stream": bool (optional, sends each question as an SSE event once complete)
     }
     """
     try:
@@ -253,43 +520,28 @@ def generate_quiz(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Unified AI provider (Gemini primary, OpenRouter fallback)
-        prompt = f"""Generate {num_questions} {difficulty} difficulty quiz questions from this transcript:
-
-{transcript}
-
-Return ONLY valid JSON (no extra text):
-{{"questions": [{{"question": "?", "type": "mcq", "options": ["A", "B", "C", "D"], "correct_answer": "A", "explanation": "Why"}}]}}
-
-Be concise. Questions should test key concepts."""
+        if wants_background(request):
+            job = enqueue('generate_quiz', {
+                'transcript': transcript,
+                'num_questions': num_questions,
+                'difficulty': difficulty,
+            }, user=request.user)
+            payload, status_code = accepted_payload(job)
+            return Response(payload, status=status_code)
 
         # Call AI (Gemini first, OpenRouter fallback)
-        response_text = call_ai(prompt, max_tokens=1000)
+        prompt = quiz_prompt(transcript, num_questions, difficulty)
+        if wants_stream(request):
+            return quiz_sse_response(call_ai_stream(prompt, max_tokens=1000, endpoint='generate_quiz'))
+        response_text = call_ai(prompt, max_tokens=1000, endpoint='generate_quiz')
 
-        # Try to parse the response as JSON
-        try:
-            # Extract JSON from response
-            response_text = response_text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            
-            response_text = response_text.strip()
-            quiz_data = json.loads(response_text)
-
-            return Response(quiz_data, status=status.HTTP_200_OK)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw response
-            return Response(
-                {'raw_response': response_text},
-                status=status.HTTP_200_OK
-            )
+        return Response(parse_quiz_response(response_text), status=status.HTTP_200_OK)
     
+    except ProviderUnavailableError as e:
+        return Response(
+            {'error': str(e), 'type': type(e).__name__},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         logger.error(f"Error generating quiz: {str(e)}", exc_info=True)
         return Response(
@@ -298,8 +550,84 @@ Be concise. Questions should test key concepts."""
         )
 
 
+def _lesson_for(user, lesson_id):
+    """A lesson the user can see, or None."""
+    from django.db.models import Q
+    from courses.models import Lesson
+
+    return Lesson.objects.filter(
+        Q(course__is_public=True) | Q(course__owner=user),
+        pk=lesson_id,
+    ).select_related('video_transcript').first()
+
+
+def chat_prompt(user, message: str, context: str, lesson_id=None, session=None, playback_time=None):
+    """
+    Tutor prompt for a chat message and the max_tokens to answer it with.
+
+    ``playback_time`` (seconds) with a ``lesson_id`` puts what was said
+    around that point of the video first in the context.
+    """
+    from courses.indexing import get_lesson_index
+    from courses.transcripts import playback_context
+
+    # Check if user wants detailed response (from message)
+    wants_detailed = any(keyword in message.lower() for keyword in [
+        'explain more', 'tell me more', 'detailed', 'deep dive', 
+        'elaborate', 'in depth', 'expand', 'comprehensive'
+    ])
+    
+    # Construct the full prompt with context and system instructions
+    system_instruction = """You are Edu, a helpful and friendly AI educational tutor. Your responses should be:
+- Concise and direct (unless user asks for more detail)
+- Conversational and warm
+- Based strictly on the provided video context
+- Clear and easy to understand
+
+If the user asks about video content, answer based on the context provided.
+If they ask something off-topic, politely redirect them back to the learning material."""
+    
+    lesson = _lesson_for(user, lesson_id) if lesson_id else None
+    around = playback_context(lesson, playback_time) if lesson is not None and playback_time is not None else ''
+
+    lesson_index = get_lesson_index(lesson) if lesson is not None else None
+    num_chunks = (4 if wants_detailed else 2) - bool(around)
+
+    if lesson_index is not None:
+        # Server-side transcript: chunks and term index were precomputed
+        # when the transcript was stored, so only the query runs here
+        relevant_chunks = lesson_index.top_chunks(message, num_chunks)
+    elif context and len(context) > 3500:
+        # No stored transcript: chunking and indexing of the client's context
+        # are cached, so follow-up messages about it only run the BM25 query
+        relevant_chunks = get_text_index(context, chunk_text_for_ai).top_chunks(message, num_chunks)
+        logger.debug(
+            "Chat context reduced from %s chars to %s chars (chunks selected: %s)",
+            len(context),
+            sum(len(chunk) for chunk in relevant_chunks),
+            len(relevant_chunks)
+        )
+    else:
+        relevant_chunks = [context] if context else []
+    optimized_context = "\n\n---\n\n".join(([around] if around else []) + relevant_chunks)
+    
+    question = f"User Question: {message}"
+    history = history_block(session) if session is not None else ''
+    if history:
+        # Conversation so far, between the context and the new question
+        question = f"{history}\n\n{question}"
+
+    if optimized_context:
+        full_prompt = f"{system_instruction}\n\nVideo/Learning Context:\n{optimized_context}\n\n{question}"
+    else:
+        full_prompt = f"{system_instruction}\n\n{question}"
+
+    return full_prompt, (300 if wants_detailed else 150)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@ai_metered
 def chat(request):
     """
     Handle chat messages with Gemini API.
@@ -307,66 +635,64 @@ def chat(request):
     Expected request body:
     {
         "message": "string",
-        "context": "string" (optional, for providing additional context)
+        "context": "string" (optional, for providing additional context),
+        "lesson_id": int (optional, use the lesson's stored transcript index as context),
+        "playback_time": "12:40" (optional with lesson_id, seconds or m:ss; adds what was said there),
+        "session": bool (optional, start a server-side conversation; the reply has its session_id),
+        "session_id": int (optional, continue that conversation; earlier messages are remembered),
+        "stream": false (optional, stream tokens as text/event-stream)
     }
     """
     try:
         # Get request data
         message = request.data.get('message', '')
         context = request.data.get('context', '')
+        lesson_id = request.data.get('lesson_id')
         
         if not message:
             return Response(
                 {'error': 'Message is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Check if user wants detailed response (from message)
-        wants_detailed = any(keyword in message.lower() for keyword in [
-            'explain more', 'tell me more', 'detailed', 'deep dive', 
-            'elaborate', 'in depth', 'expand', 'comprehensive'
-        ])
-        
-        # Construct the full prompt with context and system instructions
-        system_instruction = """You are Edu, a helpful and friendly AI educational tutor. Your responses should be:
-- Concise and direct (unless user asks for more detail)
-- Conversational and warm
-- Based strictly on the provided video context
-- Clear and easy to understand
 
-If the user asks about video content, answer based on the context provided.
-If they ask something off-topic, politely redirect them back to the learning material."""
-        
-        optimized_context = context
-        if context and len(context) > 3500:
-            context_chunks = chunk_text_for_ai(context)
-            relevant_chunks = find_relevant_context_chunks(
-                context_chunks,
-                message,
-                max_chunks=4 if wants_detailed else 2
-            )
-            optimized_context = "\n\n---\n\n".join(relevant_chunks)
-            logger.debug(
-                "Chat context reduced from %s chars to %s chars (chunks selected: %s)",
-                len(context),
-                len(optimized_context),
-                len(relevant_chunks)
-            )
-        
-        if optimized_context:
-            full_prompt = f"{system_instruction}\n\nVideo/Learning Context:\n{optimized_context}\n\nUser Question: {message}"
-        else:
-            full_prompt = f"{system_instruction}\n\nUser Question: {message}"
+        playback_time = request.data.get('playback_time')
+        if playback_time is not None:
+            try:
+                playback_time = parse_timestamp(playback_time)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = None
+        if request.data.get('session') or request.data.get('session_id'):
+            try:
+                session = get_tutor_session(request.user, request.data.get('session_id'))
+            except (TutorSession.DoesNotExist, ValueError):
+                return Response({'error': 'Chat session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        full_prompt, max_tokens = chat_prompt(request.user, message, context, lesson_id, session, playback_time)
 
         # Generate content with appropriate token limits using Gemini first, then OpenRouter
-        max_tokens = 300 if wants_detailed else 150
-        response_text = call_ai(full_prompt, max_tokens=max_tokens)
+        if wants_stream(request):
+            if session is None:
+                return sse_response(call_ai_stream(full_prompt, max_tokens=max_tokens, endpoint='chat'))
+            return sse_response(
+                record_stream(session, message, call_ai_stream(full_prompt, max_tokens=max_tokens, endpoint='chat')),
+                done_payload={'session_id': session.id}
+            )
 
+        response_text = call_ai(full_prompt, max_tokens=max_tokens, endpoint='chat')
+
+        payload = {'response': response_text}
+        if session is not None:
+            record_exchange(session, message, response_text)
+            payload['session_id'] = session.id
+        return Response(payload, status=status.HTTP_200_OK)
+    
+    except ProviderUnavailableError as e:
         return Response(
-            {'response': response_text},
-            status=status.HTTP_200_OK
+            {'error': str(e), 'type': type(e).__name__},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
-    
     except requests.exceptions.RequestException as e:
         logger.error(f"OpenRouter connectivity error in chat: {str(e)}", exc_info=True)
         return Response(
@@ -381,8 +707,24 @@ If they ask something off-topic, politely redirect them back to the learning mat
         )
 
 
+def study_plan_prompt(topic: str, duration_weeks, skill_level: str, goals: str) -> str:
+    # Construct a concise prompt
+    return f"""Create a {duration_weeks}-week study plan for {topic} ({skill_level} level).
+{f"Goal: {goals}" if goals else ""}
+
+Format as:
+Week 1-2: [topics] | Time: [hours/week]
+Week 3-4: [topics] | Time: [hours/week]
+...
+Key resources: [3-4 links]
+Milestones: [checkpoints]
+
+Keep it concise and actionable."""
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@ai_metered
 def generate_study_plan(request):
     """
     Generate a personalized study plan using Gemini API.
@@ -408,27 +750,20 @@ def generate_study_plan(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Construct a concise prompt
-        prompt = f"""Create a {duration_weeks}-week study plan for {topic} ({skill_level} level).
-{f"Goal: {goals}" if goals else ""}
-
-Format as:
-Week 1-2: [topics] | Time: [hours/week]
-Week 3-4: [topics] | Time: [hours/week]
-...
-Key resources: [3-4 links]
-Milestones: [checkpoints]
-
-Keep it concise and actionable."""
-
         # Generate content with moderate output using Gemini first, then OpenRouter
-        response_text = call_ai(prompt, max_tokens=600)
+        prompt = study_plan_prompt(topic, duration_weeks, skill_level, goals)
+        response_text = call_ai(prompt, max_tokens=600, endpoint='study_plan')
 
         return Response(
             {'study_plan': response_text},
             status=status.HTTP_200_OK
         )
     
+    except ProviderUnavailableError as e:
+        return Response(
+            {'error': str(e), 'type': type(e).__name__},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         logger.error(f"Error generating study plan: {str(e)}", exc_info=True)
         return Response(
@@ -437,8 +772,85 @@ Keep it concise and actionable."""
         )
 
 
+def chunk_summary_prompt(chunk_text: str) -> str:
+    # No chunk position in the prompt: the same text gets the same summary
+    # wherever it ends up in the transcript (see ai_service.summaries)
+    return f"""Summarize the following video transcript chunk in 2-3 concise sentences, then provide 3 bullet point key takeaways. Keep language simple and factual.
+
+Transcript chunk:
+{chunk_text}
+
+Output:
+Summary:\n- <one line summary>\nTakeaways:\n- item1\n- item2\n- item3
+"""
+
+
+def global_summary_prompt(chunk_summaries) -> str:
+    return "Combine the following chunk summaries into a cohesive 3-4 sentence global summary and provide 5 concise key takeaways. Keep it factual and do not invent new information.\n\n" + "\n\n---\n\n".join([cs['summary'] for cs in chunk_summaries])
+
+
+def summarize_chunk_list(chunks, raise_errors: bool = False) -> dict:
+    """
+    Per-chunk summaries plus a global summary (the summarize_chunks response body).
+
+    Summaries are reused from ai_service.summaries when the chunk text (or, for
+    the global summary, every chunk summary) is unchanged. Failed summaries are
+    reported in the body, or raised when ``raise_errors`` is set.
+    """
+    hashes = [chunk_hash(chunk_text) for chunk_text in chunks]
+    known = cached_summaries(hashes)
+    # Identical chunks are summarized once
+    missing = {key: chunk_text for key, chunk_text in zip(hashes, chunks) if key not in known}
+
+    def summarize_chunk(item):
+        key, chunk_text = item
+        # Use unified AI provider (Gemini first, OpenRouter fallback)
+        return call_ai(chunk_summary_prompt(chunk_text), max_tokens=200, endpoint='summarize_chunk').strip()
+
+    # Chunks are independent: fan out on a bounded pool (per-provider limits
+    # still apply inside call_ai). Outcomes come back in input order.
+    errors = {}
+    fresh = {}
+    for (key, _), outcome in zip(missing.items(), map_concurrent(summarize_chunk, missing.items())):
+        if outcome.error is not None:
+            if raise_errors:
+                raise outcome.error
+            errors[key] = outcome.error
+        else:
+            fresh[key] = outcome.value
+    store_summaries(ChunkSummary.Kind.CHUNK, fresh)
+    known.update(fresh)
+
+    chunk_summaries = [
+        {'index': idx, 'summary': known[key] if key in known else f'Error generating summary: {str(errors[key])}'}
+        for idx, key in enumerate(hashes)
+    ]
+
+    # Combine chunk summaries into a global summary, unless none of them changed
+    summary_key = global_hash([item['summary'] for item in chunk_summaries])
+    global_summary = None if errors else cached_summaries([summary_key]).get(summary_key)
+    global_reused = global_summary is not None
+    if not global_reused:
+        try:
+            global_summary = call_ai(global_summary_prompt(chunk_summaries), max_tokens=400, endpoint='summarize_global').strip()
+            if not errors:
+                store_summaries(ChunkSummary.Kind.GLOBAL, {summary_key: global_summary})
+        except Exception as e:
+            if raise_errors:
+                raise
+            global_summary = f'Error generating global summary: {str(e)}'
+
+    return {
+        'success': True,
+        'chunk_summaries': chunk_summaries,
+        'global_summary': global_summary,
+        'reused': {'chunks': len(chunks) - len(missing), 'global': global_reused},
+    }
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@ai_metered
 def summarize_chunks(request):
     """
     Summarize an array of transcript chunks and return per-chunk summaries plus a global summary.
@@ -447,7 +859,8 @@ def summarize_chunks(request):
     {
         "chunks": ["text chunk 1", "text chunk 2", ...]
         -- OR --
-        "transcript": "full transcript string"
+        "transcript": "full transcript string",
+        "background": bool (optional, returns a job id to poll at /api/jobs/{id}/)
     }
     """
     try:
@@ -457,56 +870,39 @@ def summarize_chunks(request):
         if not chunks and not transcript:
             return Response({'error': 'Either "chunks" or "transcript" is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # If transcript provided, chunk it using the same chunking as other endpoints
+        # If transcript provided, chunk it so that edits keep the other chunks
+        # (and their stored summaries) unchanged
         if not chunks and transcript:
-            chunks = chunk_text_for_ai(transcript)
+            chunks = chunk_text_stable(transcript)
 
         if not isinstance(chunks, list) or len(chunks) == 0:
             return Response({'error': 'No valid chunks to summarize'}, status=status.HTTP_400_BAD_REQUEST)
 
-        chunk_summaries = []
-        for idx, chunk_text in enumerate(chunks):
-            try:
-                prompt = f"""Summarize the following video transcript chunk in 2-3 concise sentences, then provide 3 bullet point key takeaways. Keep language simple and factual.
-
-Chunk {idx+1} of {len(chunks)}:
-{chunk_text}
-
-Output:
-Summary:\n- <one line summary>\nTakeaways:\n- item1\n- item2\n- item3
-"""
-
-                # Use unified AI provider (Gemini first, OpenRouter fallback)
-                summary_text = call_ai(prompt, max_tokens=200)
-
-                chunk_summaries.append({
-                    'index': idx,
-                    'summary': summary_text.strip()
-                })
-            except Exception as e:
-                chunk_summaries.append({'index': idx, 'summary': f'Error generating summary: {str(e)}'})
+        if wants_background(request):
+            job = enqueue('summarize_chunks', {'chunks': chunks}, user=request.user)
+            payload, status_code = accepted_payload(job)
+            return Response(payload, status=status_code)
 
-        # Combine chunk summaries into a global summary
-        try:
-            combined_prompt = "Combine the following chunk summaries into a cohesive 3-4 sentence global summary and provide 5 concise key takeaways. Keep it factual and do not invent new information.\n\n" + "\n\n---\n\n".join([cs['summary'] for cs in chunk_summaries])
-
-            global_summary = call_ai(combined_prompt, max_tokens=400).strip()
-        except Exception as e:
-            global_summary = f'Error generating global summary: {str(e)}'
-
-        return Response({
-            'success': True,
-            'chunk_summaries': chunk_summaries,
-            'global_summary': global_summary
-        }, status=status.HTTP_200_OK)
+        return Response(summarize_chunk_list(chunks), status=status.HTTP_200_OK)
 
     except Exception as e:
         logger.error(f"Error in summarize_chunks: {str(e)}", exc_info=True)
         return Response({'error': f'Failed to summarize chunks: {str(e)}', 'type': type(e).__name__}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def explain_prompt(concept: str, detail_level: str) -> str:
+    # Construct a concise prompt based on detail level
+    level_prompts = {
+        'simple': f'Explain "{concept}" in 2-3 sentences using simple language and a real-world example.',
+        'detailed': f'Explain "{concept}" with definition, 2-3 examples, and key points (under 200 words).',
+        'technical': f'Give a technical explanation of "{concept}" with precise definitions and advanced details (under 200 words).'
+    }
+    return level_prompts.get(detail_level, level_prompts['detailed'])
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@ai_metered
 def explain_concept(request):
     """
     Get a detailed explanation of a concept using Gemini API.
@@ -528,23 +924,20 @@ def explain_concept(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Construct a concise prompt based on detail level
-        level_prompts = {
-            'simple': f'Explain "{concept}" in 2-3 sentences using simple language and a real-world example.',
-            'detailed': f'Explain "{concept}" with definition, 2-3 examples, and key points (under 200 words).',
-            'technical': f'Give a technical explanation of "{concept}" with precise definitions and advanced details (under 200 words).'
-        }
-        
-        prompt = level_prompts.get(detail_level, level_prompts['detailed'])
-
         # Generate content with concise output using Gemini first, then OpenRouter
-        response_text = call_ai(prompt, max_tokens=300)
+        prompt = explain_prompt(concept, detail_level)
+        response_text = call_ai(prompt, max_tokens=300, endpoint='explain_concept')
 
         return Response(
             {'explanation': response_text},
             status=status.HTTP_200_OK
         )
     
+    except ProviderUnavailableError as e:
+        return Response(
+            {'error': str(e), 'type': type(e).__name__},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         logger.error(f"Error explaining concept: {str(e)}", exc_info=True)
         return Response(
@@ -0,0 +1,65 @@
+"""
+Async (ASGI) variants of the YouTube API views.
+
+Transcript extraction relies on blocking libraries (youtube-transcript-api,
+yt-dlp), so the work runs on the shared blocking-work pool
+(``services.async_api.run_blocking``) instead of holding a request worker;
+saving the result runs through ``sync_to_async``. Responses match the views
+in ``youtube_views``.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+
+from services.async_api import async_api_view, run_blocking
+from .youtube_views import known_failure_response, store_extraction_result, transcript_extraction, video_info
+
+
+@async_api_view(['POST'])
+async def extract_youtube_transcript(request):
+    """POST /api/youtube/extract-transcript/ (see youtube_views.extract_youtube_transcript)"""
+    try:
+        url = request.data.get('url')
+        language = request.data.get('language', 'en')
+
+        if not url:
+            return JsonResponse({
+                'error': 'YouTube URL is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        known = await sync_to_async(known_failure_response)(url, language, bool(request.data.get('force_refresh', False)))
+        if known is not None:
+            payload, status_code = known
+            return JsonResponse(payload, status=status_code)
+
+        payload, status_code = await run_blocking(transcript_extraction, url, language)
+        await sync_to_async(store_extraction_result)(payload, language)
+        return JsonResponse(payload, status=status_code)
+
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@async_api_view(['GET'])
+async def get_video_info(request):
+    """GET /api/youtube/video-info/?url=VIDEO_URL (see youtube_views.get_video_info)"""
+    try:
+        url = request.GET.get('url')
+
+        if not url:
+            return JsonResponse({
+                'error': 'YouTube URL is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        payload, status_code = await run_blocking(video_info, url)
+        return JsonResponse(payload, status=status_code)
+
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
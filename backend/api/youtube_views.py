@@ -13,6 +13,142 @@ import hashlib
 import json
 
 from services.youtube_service import YouTubeTranscriptService
+from courses.transcripts import record_failure, recorded_failure, save_video_transcript
+
+def known_failure_response(url: str, language: str, force_refresh: bool = False):
+    """
+    The fail-fast response for a video that recently failed extraction
+    (courses.transcripts.record_failure), or None. Reads the database.
+    """
+    if force_refresh:
+        return None
+    video_id = YouTubeTranscriptService().extract_video_id(url)
+    failure = recorded_failure(video_id, language)
+    if failure is None:
+        return None
+    return {
+        'success': False,
+        'cached': True,
+        'error': failure.error or 'Could not extract transcript from this video',
+        'url': url,
+        'video_id': video_id,
+        'transcript': {'transcript': '', 'segments': []},
+        'fallbacks': failure.fallbacks,
+        'retry_after': failure.expires_at.isoformat()
+    }, status.HTTP_200_OK
+
+
+def transcript_extraction(url: str, language: str):
+    """
+    Cached transcript extraction shared by the sync and async views.
+
+    Returns ``(payload, status_code)``. Makes blocking YouTube requests, so
+    async callers run it in a worker thread. The database side runs around
+    it: ``known_failure_response`` before, ``store_extraction_result`` after.
+    """
+    # Check cache first
+    cache_key = f"youtube_transcript:{hashlib.md5(f'{url}:{language}'.encode()).hexdigest()}"
+    cached_result = cache.get(cache_key)
+    
+    if cached_result:
+        return {
+            'success': True,
+            'cached': True,
+            **cached_result
+        }, status.HTTP_200_OK
+    
+    # Extract transcript
+    service = YouTubeTranscriptService()
+    result = service.extract_complete_video_data(url, language)
+    
+    if result['success']:
+        # Cache successful results for 1 hour
+        cache_data = {
+            'video_id': result['video_id'],
+            'metadata': result['metadata'],
+            'transcript': result['transcript'],
+            'available_languages': result['available_languages'],
+            'chapters': result['chapters'],
+            'fallbacks': result.get('transcript', {}).get('fallbacks', [])
+        }
+        cache.set(cache_key, cache_data, 3600)  # 1 hour
+        
+        return {
+            'success': True,
+            'cached': False,
+            **cache_data
+        }, status.HTTP_200_OK
+    else:
+        # Transcript extraction failed, but return 200 OK so frontend can handle gracefully
+        # (user can still start session without transcript or provide it manually)
+        failure_payload = {
+            'success': False,
+            'error': result.get('error', 'Could not extract transcript from this video'),
+            'url': url,
+            'video_id': result.get('video_id'),
+            'transcript': {'transcript': '', 'segments': []},
+            'fallbacks': result.get('transcript', {}).get('fallbacks', [])
+        }
+        # Include any server-side debug snapshot from YouTube fetches
+        if result.get('server_debug'):
+            failure_payload['_server'] = result.get('server_debug')
+
+        # Return 200 OK instead of 422 - let frontend decide how to handle it
+        return failure_payload, status.HTTP_200_OK
+
+
+def store_extraction_result(payload: dict, language: str):
+    """Save a fresh extraction: the transcript in the shared store, or the failure."""
+    if payload.get('cached'):
+        return
+    if payload.get('success'):
+        # Lessons later created for this video link to the stored copy
+        save_video_transcript(payload['video_id'], payload['transcript'], language)
+    elif payload.get('video_id'):
+        record_failure(payload['video_id'], language, payload)
+
+
+def video_info(url: str):
+    """Cached video metadata lookup shared by the sync and async views; ``(payload, status_code)``."""
+    service = YouTubeTranscriptService()
+    video_id = service.extract_video_id(url)
+    
+    if not video_id:
+        return {
+            'error': 'Invalid YouTube URL'
+        }, status.HTTP_400_BAD_REQUEST
+    
+    # Check cache
+    cache_key = f"youtube_info:{video_id}"
+    cached_info = cache.get(cache_key)
+    
+    if cached_info:
+        return {
+            'success': True,
+            'cached': True,
+            **cached_info
+        }, status.HTTP_200_OK
+    
+    # Get video metadata
+    metadata = service.get_video_metadata(video_id)
+    available_languages = service.get_available_transcripts(video_id)
+    
+    result = {
+        'video_id': video_id,
+        'metadata': metadata,
+        'available_languages': available_languages,
+        'has_transcript': len(available_languages) > 0
+    }
+    
+    # Cache for 6 hours
+    cache.set(cache_key, result, 21600)
+    
+    return {
+        'success': True,
+        'cached': False,
+        **result
+    }, status.HTTP_200_OK
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -23,7 +159,8 @@ def extract_youtube_transcript(request):
     POST /api/youtube/extract-transcript/
     {
         "url": "https://www.youtube.com/watch?v=VIDEO_ID",
-        "language": "en" (optional)
+        "language": "en" (optional),
+        "force_refresh": false (optional, retry a video that recently failed)
     }
     """
     try:
@@ -35,55 +172,14 @@ def extract_youtube_transcript(request):
                 'error': 'YouTube URL is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check cache first
-        cache_key = f"youtube_transcript:{hashlib.md5(f'{url}:{language}'.encode()).hexdigest()}"
-        cached_result = cache.get(cache_key)
+        known = known_failure_response(url, language, bool(request.data.get('force_refresh', False)))
+        if known is not None:
+            payload, status_code = known
+            return Response(payload, status=status_code)
         
-        if cached_result:
-            return Response({
-                'success': True,
-                'cached': True,
-                **cached_result
-            })
-        
-        # Extract transcript
-        service = YouTubeTranscriptService()
-        result = service.extract_complete_video_data(url, language)
-        
-        if result['success']:
-            # Cache successful results for 1 hour
-            cache_data = {
-                'video_id': result['video_id'],
-                'metadata': result['metadata'],
-                'transcript': result['transcript'],
-                'available_languages': result['available_languages'],
-                'chapters': result['chapters'],
-                'fallbacks': result.get('transcript', {}).get('fallbacks', [])
-            }
-            cache.set(cache_key, cache_data, 3600)  # 1 hour
-            
-            return Response({
-                'success': True,
-                'cached': False,
-                **cache_data
-            })
-        else:
-            # Transcript extraction failed, but return 200 OK so frontend can handle gracefully
-            # (user can still start session without transcript or provide it manually)
-            failure_payload = {
-                'success': False,
-                'error': result.get('error', 'Could not extract transcript from this video'),
-                'url': url,
-                'video_id': result.get('video_id'),
-                'transcript': {'transcript': '', 'segments': []},
-                'fallbacks': result.get('transcript', {}).get('fallbacks', [])
-            }
-            # Include any server-side debug snapshot from YouTube fetches
-            if result.get('server_debug'):
-                failure_payload['_server'] = result.get('server_debug')
-
-            # Return 200 OK instead of 422 - let frontend decide how to handle it
-            return Response(failure_payload, status=status.HTTP_200_OK)
+        payload, status_code = transcript_extraction(url, language)
+        store_extraction_result(payload, language)
+        return Response(payload, status=status_code)
             
     except Exception as e:
         return Response({
@@ -107,44 +203,8 @@ def get_video_info(request):
                 'error': 'YouTube URL is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        service = YouTubeTranscriptService()
-        video_id = service.extract_video_id(url)
-        
-        if not video_id:
-            return Response({
-                'error': 'Invalid YouTube URL'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check cache
-        cache_key = f"youtube_info:{video_id}"
-        cached_info = cache.get(cache_key)
-        
-        if cached_info:
-            return Response({
-                'success': True,
-                'cached': True,
-                **cached_info
-            })
-        
-        # Get video metadata
-        metadata = service.get_video_metadata(video_id)
-        available_languages = service.get_available_transcripts(video_id)
-        
-        result = {
-            'video_id': video_id,
-            'metadata': metadata,
-            'available_languages': available_languages,
-            'has_transcript': len(available_languages) > 0
-        }
-        
-        # Cache for 6 hours
-        cache.set(cache_key, result, 21600)
-        
-        return Response({
-            'success': True,
-            'cached': False,
-            **result
-        })
+        payload, status_code = video_info(url)
+        return Response(payload, status=status_code)
         
     except Exception as e:
         return Response({
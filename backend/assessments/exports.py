@@ -0,0 +1,64 @@
+"""
+Assessment attempt exports, shared by AssessmentViewSet.export_attempts_pdf
+and its background job.
+"""
+
+from .models import UserAttempt
+
+
+def attempts_pdf_filename(assessment) -> str:
+    return f'assessment_{assessment.id}_attempts.pdf'
+
+
+def build_attempts_pdf(assessment) -> bytes:
+    """Render the assessment's attempts as a PDF table."""
+    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from io import BytesIO
+
+    attempts = UserAttempt.objects.filter(assessment=assessment).select_related('user')
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1  # center
+    )
+    elements.append(Paragraph(f"Assessment: {assessment.title}", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Table headers
+    data = [['User', 'Score', 'Percentage', 'Status', 'Submitted At']]
+    for attempt in attempts:
+        data.append([
+            attempt.user.username,
+            attempt.score or '-',
+            f"{attempt.percentage}%" if attempt.percentage is not None else '-',
+            attempt.status,
+            attempt.submitted_at.strftime('%Y-%m-%d %H:%M') if attempt.submitted_at else '-'
+        ])
+
+    table = Table(data, colWidths=[2*inch, 1*inch, 1*inch, 1*inch, 1.5*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(table)
+
+    doc.build(elements)
+    return buffer.getvalue()
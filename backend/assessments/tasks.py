@@ -0,0 +1,19 @@
+"""Background job handlers for assessments (see jobs.registry)."""
+
+from django.core.files.base import ContentFile
+
+from jobs.registry import PermanentJobError, register
+from .exports import attempts_pdf_filename, build_attempts_pdf
+from .models import Assessment
+
+
+@register('export_attempts_pdf')
+def export_attempts_pdf(job):
+    """AssessmentViewSet.export_attempts_pdf, run by the worker; the PDF is the job's result file."""
+    assessment = Assessment.objects.filter(pk=job.payload['assessment_id']).first()
+    if assessment is None:
+        raise PermanentJobError(f"Assessment {job.payload['assessment_id']} no longer exists")
+
+    filename = attempts_pdf_filename(assessment)
+    job.result_file.save(filename, ContentFile(build_attempts_pdf(assessment)), save=False)
+    return {'filename': filename, 'content_type': 'application/pdf'}, 200
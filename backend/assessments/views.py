@@ -11,6 +11,8 @@ from .serializers import (
     AssessmentAnswerImageSerializer, ManualGradeSerializer
 )
 from courses.permissions import IsOwnerOrReadOnly
+from jobs.queue import accepted_payload, enqueue, wants_background
+from .exports import attempts_pdf_filename, build_attempts_pdf
 
 
 class AssessmentViewSet(viewsets.ModelViewSet):
@@ -177,59 +179,16 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         if assessment.creator != request.user and share_token != str(assessment.share_token):
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        from django.http import HttpResponse
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib import colors
-        from reportlab.lib.units import inch
-        from io import BytesIO
+        # The PDF is built in the job worker for "?background=1" (signed-in users)
+        if wants_background(request) and request.user.is_authenticated:
+            job = enqueue('export_attempts_pdf', {'assessment_id': assessment.id}, user=request.user)
+            payload, status_code = accepted_payload(job)
+            return Response(payload, status=status_code)
 
-        attempts = UserAttempt.objects.filter(assessment=assessment).select_related('user')
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1  # center
-        )
-        elements.append(Paragraph(f"Assessment: {assessment.title}", title_style))
-        elements.append(Spacer(1, 12))
-
-        # Table headers
-        data = [['User', 'Score', 'Percentage', 'Status', 'Submitted At']]
-        for attempt in attempts:
-            data.append([
-                attempt.user.username,
-                attempt.score or '-',
-                f"{attempt.percentage}%" if attempt.percentage is not None else '-',
-                attempt.status,
-                attempt.submitted_at.strftime('%Y-%m-%d %H:%M') if attempt.submitted_at else '-'
-            ])
+        from django.http import HttpResponse
 
-        table = Table(data, colWidths=[2*inch, 1*inch, 1*inch, 1*inch, 1.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(table)
-
-        doc.build(elements)
-        buffer.seek(0)
-        response = HttpResponse(buffer.read(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename=assessment_{assessment.id}_attempts.pdf'
+        response = HttpResponse(build_attempts_pdf(assessment), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename={attempts_pdf_filename(assessment)}'
         return response
 
     @action(detail=True, methods=['post'], url_path='join-challenge')
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Course, Lesson, UserProgress, CoursePricing, ContentPurchase, CreatorTip, CreatorEarnings
+from .models import (
+    Course, Lesson, UserProgress, CoursePricing, ContentPurchase, CreatorTip, CreatorEarnings,
+    CourseBatch, CourseBatchItem, LessonQuestion, TranscriptFailure, VideoTranscript,
+)
 
 
 class LessonInline(admin.TabularInline):
@@ -21,6 +24,30 @@ class LessonAdmin(admin.ModelAdmin):
     list_filter = ['course']
     search_fields = ['title', 'course__title']
     ordering = ['course', 'order']
+    raw_id_fields = ['video_transcript']
+
+
+@admin.register(VideoTranscript)
+class VideoTranscriptAdmin(admin.ModelAdmin):
+    list_display = ['video_id', 'language', 'method', 'fetched_at']
+    list_filter = ['language', 'method']
+    search_fields = ['video_id']
+    readonly_fields = ['content_hash', 'fetched_at']
+
+
+@admin.register(TranscriptFailure)
+class TranscriptFailureAdmin(admin.ModelAdmin):
+    list_display = ['video_id', 'language', 'reason', 'failed_at', 'expires_at']
+    list_filter = ['reason', 'language']
+    search_fields = ['video_id']
+
+
+@admin.register(LessonQuestion)
+class LessonQuestionAdmin(admin.ModelAdmin):
+    list_display = ['transcript_hash', 'difficulty', 'served_count', 'created_at']
+    list_filter = ['difficulty', 'created_at']
+    search_fields = ['transcript_hash']
+    readonly_fields = ['transcript_hash', 'served_count', 'created_at']
 
 
 @admin.register(UserProgress)
@@ -56,3 +83,18 @@ class CreatorEarningsAdmin(admin.ModelAdmin):
     list_display = ['creator', 'month', 'gross_revenue', 'platform_fee', 'net_revenue', 'courses_sold']
     list_filter = ['month']
     search_fields = ['creator__username']
+
+
+class CourseBatchItemInline(admin.TabularInline):
+    model = CourseBatchItem
+    extra = 0
+    readonly_fields = ['lesson', 'status', 'assessment', 'error', 'attempts', 'updated_at']
+
+
+@admin.register(CourseBatch)
+class CourseBatchAdmin(admin.ModelAdmin):
+    list_display = ['course', 'creator', 'status', 'generate_quiz', 'generate_summary', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['course__title', 'creator__username']
+    readonly_fields = ['job', 'created_at', 'updated_at', 'finished_at']
+    inlines = [CourseBatchItemInline]
@@ -0,0 +1,55 @@
+"""
+Async (ASGI) variant of LessonViewSet.fetch_transcript.
+
+The YouTube extraction runs on the blocking-work pool while the
+lesson lookup and save use Django's thread-sensitive executor, so a slow
+extraction does not hold a request worker. Responses match the sync action.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+
+from jobs.queue import accepted_payload, enqueue, wants_background
+from services.async_api import async_api_view, run_blocking
+from .models import Lesson
+from .transcripts import (
+    cached_transcript_response,
+    fetch_error_response,
+    fetch_video_data,
+    lesson_video_url,
+    store_fetch_result,
+)
+
+
+@async_api_view(['POST'])
+async def fetch_transcript(request, pk):
+    """POST /api/lessons/{id}/fetch_transcript/ (see LessonViewSet.fetch_transcript)"""
+    lesson = await Lesson.objects.filter(pk=pk).afirst()
+    if lesson is None:
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    language = request.data.get('language', 'en')
+    force_refresh = request.data.get('force_refresh', False)
+
+    cached = await sync_to_async(cached_transcript_response)(lesson, force_refresh, language)
+    if cached is not None:
+        payload, status_code = cached
+        return JsonResponse(payload, status=status_code)
+
+    if wants_background(request):
+        job = await sync_to_async(enqueue)('fetch_transcript', {
+            'lesson_id': lesson.id,
+            'language': language,
+            'force_refresh': force_refresh,
+        }, user=request.user)
+        payload, status_code = accepted_payload(job)
+        return JsonResponse(payload, status=status_code)
+
+    try:
+        video_url = lesson_video_url(lesson)
+        result = await run_blocking(fetch_video_data, video_url, language)
+        payload, status_code = await sync_to_async(store_fetch_result)(lesson, result, language, video_url)
+    except Exception as e:
+        payload, status_code = fetch_error_response(lesson, e)
+    return JsonResponse(payload, status=status_code)
@@ -0,0 +1,148 @@
+"""
+Course-wide quiz and summary generation (CourseViewSet.batch_generate).
+
+A CourseBatch has one item per lesson with a transcript. The ``course_batch``
+job processes unfinished items concurrently on the AI fan-out pool (provider
+limits and circuit breakers apply inside call_ai) and saves each lesson as
+soon as it finishes, so progress is visible while the batch runs. Finished
+steps are kept, so a retried or resumed batch only redoes what is missing.
+"""
+
+import json
+import logging
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from ai_service.concurrency import map_concurrent
+from ai_service.summaries import chunk_text_stable
+from ai_service.views import summarize_chunk_list
+from jobs.queue import enqueue
+from .models import CourseBatch, CourseBatchItem
+from .quizzes import build_lesson_quiz, save_quiz_assessment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    'num_questions': 5,
+    'difficulty': 'medium',
+    'mode': 'full',
+    'time_limit_minutes': 30,
+    'is_public': True,
+}
+
+
+def create_course_batch(course, creator, generate_quiz=True, generate_summary=False, options=None):
+    """A batch over every lesson of ``course`` that has a transcript, or None if there are none."""
+    lesson_ids = list(
+        course.lessons.filter(
+            models.Q(transcript__gt='') | models.Q(manual_transcript__gt='') | models.Q(video_transcript__isnull=False)
+        ).values_list('id', flat=True)
+    )
+    if not lesson_ids:
+        return None
+
+    with transaction.atomic():
+        batch = CourseBatch.objects.create(
+            course=course,
+            creator=creator,
+            generate_quiz=generate_quiz,
+            generate_summary=generate_summary,
+            options={**DEFAULT_OPTIONS, **(options or {})},
+        )
+        CourseBatchItem.objects.bulk_create([
+            CourseBatchItem(batch=batch, lesson_id=lesson_id) for lesson_id in lesson_ids
+        ])
+    return batch
+
+
+def start_course_batch(batch):
+    """Queue the job that processes the batch's unfinished lessons."""
+    job = enqueue('course_batch', {'batch_id': batch.id}, user=batch.creator)
+    batch.job = job
+    batch.status = CourseBatch.Status.QUEUED
+    batch.finished_at = None
+    batch.save(update_fields=['job', 'status', 'finished_at', 'updated_at'])
+    return job
+
+
+def batch_progress(batch) -> dict:
+    counts = dict(batch.items.values_list('status').annotate(n=models.Count('id')).order_by())
+    total = sum(counts.values())
+    done = counts.get(CourseBatchItem.Status.DONE, 0)
+    return {
+        'total': total,
+        'done': done,
+        'failed': counts.get(CourseBatchItem.Status.FAILED, 0),
+        'pending': counts.get(CourseBatchItem.Status.PENDING, 0),
+        'percent': round(100 * done / total) if total else 100,
+    }
+
+
+def _lesson_summary(transcript: str) -> str:
+    # Reuses stored chunk summaries, so a retried or re-run batch only pays for changed chunks
+    return summarize_chunk_list(chunk_text_stable(transcript), raise_errors=True)['global_summary']
+
+
+def _process_item(batch, item):
+    """Run the batch's missing steps for one lesson, saving each as it completes."""
+    lesson = item.lesson
+    transcript = lesson.get_transcript()
+    options = batch.options
+    item.attempts += 1
+    try:
+        if batch.generate_quiz and item.assessment_id is None:
+            quiz_data = build_lesson_quiz(
+                transcript, options['num_questions'], options['difficulty'], options.get('mode', 'full')
+            )
+            if not quiz_data.get('questions'):
+                raise ValueError('AI response contained no questions')
+            with transaction.atomic():
+                item.assessment, _ = save_quiz_assessment(
+                    lesson, batch.creator, f"{lesson.title} Quiz", quiz_data,
+                    time_limit_minutes=options['time_limit_minutes'],
+                    is_public=options['is_public']
+                )
+                item.save(update_fields=['assessment', 'attempts', 'updated_at'])
+
+        if batch.generate_summary and not item.summary:
+            item.summary = _lesson_summary(transcript)
+            item.save(update_fields=['summary', 'attempts', 'updated_at'])
+    except Exception as e:
+        item.status = CourseBatchItem.Status.FAILED
+        item.error = 'Failed to parse AI response' if isinstance(e, json.JSONDecodeError) else str(e)
+        item.save(update_fields=['status', 'error', 'attempts', 'updated_at'])
+        raise
+
+    item.status = CourseBatchItem.Status.DONE
+    item.error = ''
+    item.save(update_fields=['status', 'error', 'attempts', 'updated_at'])
+
+
+def run_course_batch(batch, is_last_attempt: bool = True) -> dict:
+    """
+    Process every unfinished lesson of ``batch``.
+
+    Raises when lessons failed and another attempt is left, so the job
+    retries them after its backoff; otherwise returns the final progress.
+    """
+    batch.status = CourseBatch.Status.RUNNING
+    batch.save(update_fields=['status', 'updated_at'])
+
+    items = list(
+        batch.items.exclude(status=CourseBatchItem.Status.DONE).select_related('lesson')
+    )
+    outcomes = map_concurrent(lambda item: _process_item(batch, item), items)
+    failed = sum(1 for outcome in outcomes if outcome.error is not None)
+
+    if failed and not is_last_attempt:
+        batch.status = CourseBatch.Status.QUEUED
+        batch.save(update_fields=['status', 'updated_at'])
+        raise RuntimeError(f'{failed} of {len(items)} lessons failed; retrying them')
+
+    progress = batch_progress(batch)
+    batch.status = CourseBatch.Status.FAILED if progress['done'] == 0 else CourseBatch.Status.COMPLETED
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=['status', 'finished_at', 'updated_at'])
+    logger.info(f"Course batch {batch.pk}: {progress['done']}/{progress['total']} lessons done, {progress['failed']} failed")
+    return progress
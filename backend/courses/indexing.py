@@ -0,0 +1,82 @@
+"""
+Persisted retrieval index for lesson transcripts.
+
+When a lesson's transcript changes, its chunks (with character offsets) and
+BM25 term index are stored in ``LessonTranscriptIndex`` keyed by the
+transcript hash. AI endpoints load the index by lesson instead of
+re-chunking transcript text on every request.
+"""
+
+import hashlib
+import logging
+
+from ai_service.retrieval import ChunkIndex, cached_index, locate_chunks
+from ai_service.views import chunk_text_for_ai
+from .models import LessonTranscriptIndex
+
+logger = logging.getLogger(__name__)
+
+
+def transcript_hash(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def build_transcript_index(lesson, transcript: str = None):
+    """(Re)build and store the index for ``lesson``; removes it when there is no transcript."""
+    if transcript is None:
+        transcript = lesson.get_transcript()
+    if not transcript:
+        LessonTranscriptIndex.objects.filter(lesson=lesson).delete()
+        return None
+
+    chunks = chunk_text_for_ai(transcript)
+    index = ChunkIndex(chunks)
+    record, _ = LessonTranscriptIndex.objects.update_or_create(
+        lesson=lesson,
+        defaults={
+            'transcript_hash': transcript_hash(transcript),
+            'chunks': [
+                {'text': text, 'start': start, 'end': end}
+                for text, (start, end) in zip(chunks, locate_chunks(transcript, chunks))
+            ],
+            'term_index': index.to_dict(),
+        }
+    )
+    logger.debug("Indexed lesson %s transcript: %s chunks", lesson.pk, len(chunks))
+    return record
+
+
+def sync_transcript_index(lesson) -> bool:
+    """Rebuild the stored index if the lesson's transcript no longer matches it; True if it did."""
+    transcript = lesson.get_transcript()
+    current = LessonTranscriptIndex.objects.filter(lesson=lesson).values_list('transcript_hash', flat=True).first()
+    if not transcript:
+        if current is not None:
+            build_transcript_index(lesson, transcript)
+            return True
+        return False
+    if current != transcript_hash(transcript):
+        build_transcript_index(lesson, transcript)
+        return True
+    return False
+
+
+def get_lesson_index(lesson):
+    """
+    ChunkIndex for the lesson's current transcript, or None without one.
+
+    Served from the process cache when possible, then from the stored index;
+    a missing or stale stored index is rebuilt on the spot.
+    """
+    transcript = lesson.get_transcript()
+    if not transcript:
+        return None
+    digest = transcript_hash(transcript)
+
+    def load():
+        record = LessonTranscriptIndex.objects.filter(lesson=lesson).first()
+        if record is None or record.transcript_hash != digest:
+            record = build_transcript_index(lesson, transcript)
+        return ChunkIndex.from_dict([chunk['text'] for chunk in record.chunks], record.term_index)
+
+    return cached_index(f'lesson:{lesson.pk}:{digest}', load)
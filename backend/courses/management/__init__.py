@@ -0,0 +1 @@
+# Courses management package
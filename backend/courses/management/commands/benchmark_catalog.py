@@ -0,0 +1,103 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from courses.models import Course, Lesson
+from courses.serializers import CourseListSerializer, LessonSerializer
+from courses.views import CourseViewSet
+
+
+class LegacyCourseListSerializer(CourseListSerializer):
+    """Catalog shape before lesson summaries: full lessons, per-course counts."""
+    lessons = LessonSerializer(many=True, read_only=True)
+
+    def get_lesson_count(self, obj):
+        return obj.lessons.count()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic catalog inside a rolled-back transaction and compares "
+        "payload size / query time of the legacy and transcript-free course lists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=1000, help='Courses to seed (default: 1000)')
+        parser.add_argument('--lessons', type=int, default=30, help='Lessons per course (default: 30)')
+        parser.add_argument(
+            '--transcript-chars',
+            type=int,
+            default=5000,
+            help='Characters of transcript stored per lesson (default: 5000)',
+        )
+        parser.add_argument('--page-size', type=int, default=20, help='Courses per catalog page (default: 20)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant (default: 5)')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._seed(options['courses'], options['lessons'], options['transcript_chars'])
+
+            page_size = options['page_size']
+            base = Course.objects.filter(is_public=True)
+            variants = [
+                ('legacy', LegacyCourseListSerializer, lambda: base[:page_size]),
+                ('catalog', CourseListSerializer, lambda: CourseViewSet.catalog_queryset(base)[:page_size]),
+            ]
+
+            self.stdout.write(
+                f"Catalog: {options['courses']} courses x {options['lessons']} lessons, "
+                f"page of {page_size}, {options['repeat']} runs each"
+            )
+            for name, serializer_class, build in variants:
+                payload, queries, timings = self._measure(serializer_class, build, options['repeat'])
+                self.stdout.write(
+                    f"  {name:<8} payload={payload / 1024:9.1f} KiB  queries={queries:4d}  "
+                    f"best={min(timings) * 1000:8.1f} ms  mean={sum(timings) / len(timings) * 1000:8.1f} ms"
+                )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def _seed(self, num_courses, lessons_per_course, transcript_chars):
+        User = get_user_model()
+        owner, _ = User.objects.get_or_create(username='catalog-benchmark')
+        sentence = 'In this part of the lecture we walk through the key idea step by step. '
+        transcript = (sentence * (transcript_chars // len(sentence) + 1))[:transcript_chars]
+
+        started = time.perf_counter()
+        courses = Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', description='Seeded by benchmark_catalog', owner=owner)
+            for i in range(num_courses)
+        ])
+        lessons = [
+            Lesson(
+                course=course,
+                title=f'Lesson {order}',
+                video_id=f'vid{course.pk}x{order}',
+                order=order,
+                transcript=transcript,
+            )
+            for course in courses
+            for order in range(lessons_per_course)
+        ]
+        Lesson.objects.bulk_create(lessons, batch_size=2000)
+        self.stdout.write(f"Seeded {len(lessons)} lessons in {time.perf_counter() - started:.1f}s")
+
+    def _measure(self, serializer_class, build_queryset, repeat):
+        renderer = JSONRenderer()
+        timings = []
+        payload = queries = 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                data = serializer_class(build_queryset(), many=True).data
+                body = renderer.render(data)
+                timings.append(time.perf_counter() - started)
+            payload = len(body)
+            queries = len(captured.captured_queries)
+        return payload, queries, timings
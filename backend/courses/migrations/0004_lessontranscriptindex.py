@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_coursepricing_creatortip_contentpurchase_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonTranscriptIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcript_hash', models.CharField(help_text='SHA-256 of the indexed transcript', max_length=64)),
+                ('chunks', models.JSONField(default=list, help_text='[{"text", "start", "end"}] in transcript order')),
+                ('term_index', models.JSONField(default=dict, help_text='BM25 postings and chunk lengths')),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_index', to='courses.lesson')),
+            ],
+        ),
+    ]
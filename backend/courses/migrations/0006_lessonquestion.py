@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_coursebatch_coursebatchitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcript_hash', models.CharField(help_text='SHA-256 of the transcript the question was generated from', max_length=64)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium', max_length=10)),
+                ('question', models.JSONField(help_text='{"question", "type", "options", "correct_answer", "explanation"}')),
+                ('served_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_pool', to='courses.lesson')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lesson', 'difficulty', 'transcript_hash', 'served_count'], name='courses_les_lesson__831f02_idx')],
+            },
+        ),
+    ]
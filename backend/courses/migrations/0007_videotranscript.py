@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:13
+
+import hashlib
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def share_fetched_transcripts(apps, schema_editor):
+    """Move auto-fetched lesson transcripts into one VideoTranscript per video and language."""
+    Lesson = apps.get_model('courses', 'Lesson')
+    VideoTranscript = apps.get_model('courses', 'VideoTranscript')
+    fetched = Lesson.objects.exclude(transcript='').exclude(transcript_fetched_at=None).order_by('-transcript_fetched_at')
+    shared = {}
+    for lesson in fetched.iterator():
+        key = (lesson.video_id, lesson.transcript_language or 'en')
+        digest = hashlib.sha256(lesson.transcript.encode('utf-8')).hexdigest()
+        if key not in shared:
+            # The most recent fetch wins
+            shared[key] = VideoTranscript.objects.create(
+                video_id=key[0],
+                language=key[1],
+                transcript=lesson.transcript,
+                content_hash=digest,
+                fetched_at=lesson.transcript_fetched_at,
+            )
+        if shared[key].content_hash == digest:
+            Lesson.objects.filter(pk=lesson.pk).update(transcript='', video_transcript=shared[key])
+
+
+def copy_back_transcripts(apps, schema_editor):
+    Lesson = apps.get_model('courses', 'Lesson')
+    for lesson in Lesson.objects.filter(transcript='').exclude(video_transcript=None).select_related('video_transcript'):
+        Lesson.objects.filter(pk=lesson.pk).update(transcript=lesson.video_transcript.transcript)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_lessonquestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(help_text='YouTube Video ID', max_length=50)),
+                ('language', models.CharField(default='en', max_length=10)),
+                ('transcript', models.TextField()),
+                ('segments', models.JSONField(blank=True, default=list, help_text='[{"start", "duration", "text"}] timed captions')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the transcript text', max_length=64)),
+                ('method', models.CharField(blank=True, help_text='Extraction method that produced it', max_length=30)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('video_id', 'language')},
+            },
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='video_transcript',
+            field=models.ForeignKey(blank=True, help_text='Shared auto-fetched transcript; used when the lesson has no transcript text of its own', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lessons', to='courses.videotranscript'),
+        ),
+        migrations.RunPython(share_fetched_transcripts, copy_back_transcripts),
+    ]
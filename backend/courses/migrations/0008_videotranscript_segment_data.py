@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+from courses.segments import TimedSegments, pack_segments
+
+
+def pack_stored_segments(apps, schema_editor):
+    VideoTranscript = apps.get_model('courses', 'VideoTranscript')
+    for shared in VideoTranscript.objects.exclude(segments=[]).iterator():
+        shared.segment_data = pack_segments(shared.segments)
+        shared.save(update_fields=['segment_data'])
+
+
+def unpack_stored_segments(apps, schema_editor):
+    VideoTranscript = apps.get_model('courses', 'VideoTranscript')
+    for shared in VideoTranscript.objects.exclude(segment_data=b'').iterator():
+        shared.segments = TimedSegments(shared.segment_data).to_list()
+        shared.save(update_fields=['segments'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_videotranscript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videotranscript',
+            name='segment_data',
+            field=models.BinaryField(blank=True, default=b'', help_text='Timed captions, packed by courses.segments'),
+        ),
+        migrations.RunPython(pack_stored_segments, unpack_stored_segments),
+        migrations.RemoveField(
+            model_name='videotranscript',
+            name='segments',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_videotranscript_segment_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(help_text='YouTube Video ID', max_length=50)),
+                ('language', models.CharField(default='en', max_length=10)),
+                ('reason', models.CharField(choices=[('no_captions', 'No captions found'), ('error', 'Extraction errors')], max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('fallbacks', models.JSONField(blank=True, default=list, help_text='Methods tried and their outcome')),
+                ('failed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('video_id', 'language')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_transcriptfailure'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lessonquestion',
+            name='courses_les_lesson__831f02_idx',
+        ),
+        migrations.RemoveField(
+            model_name='lessonquestion',
+            name='lesson',
+        ),
+        migrations.AddIndex(
+            model_name='lessonquestion',
+            index=models.Index(fields=['transcript_hash', 'difficulty', 'served_count'], name='courses_les_transcr_5b52e5_idx'),
+        ),
+    ]
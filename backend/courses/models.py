@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from django.utils.functional import cached_property
 from decimal import Decimal
 
 from payments.models import Payment
+from .segments import TimedSegments
 
 
 class Course(models.Model):
@@ -31,6 +33,90 @@ class Course(models.Model):
         ordering = ['-created_at']
 
 
+class VideoTranscript(models.Model):
+    """
+    A YouTube video's transcript in one language, fetched once and shared
+    by every lesson on that video (courses.transcripts).
+    """
+    video_id = models.CharField(max_length=50, help_text='YouTube Video ID')
+    language = models.CharField(max_length=10, default='en')
+    transcript = models.TextField()
+    segment_data = models.BinaryField(default=b'', blank=True, help_text='Timed captions, packed by courses.segments')
+    content_hash = models.CharField(max_length=64, help_text='SHA-256 of the transcript text')
+    method = models.CharField(max_length=30, blank=True, help_text='Extraction method that produced it')
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ['video_id', 'language']
+
+    def __str__(self):
+        return f"{self.video_id} ({self.language})"
+
+    @cached_property
+    def timed_segments(self):
+        """The timed captions as a TimedSegments view (empty when extraction had no timing)."""
+        return TimedSegments(self.segment_data)
+
+
+class TranscriptFailure(models.Model):
+    """
+    A failed transcript extraction for a video and language, remembered
+    until ``expires_at`` so repeat requests skip the slow fallback chain.
+
+    Kept next to VideoTranscript rather than in the shared cache so the
+    methods tried stay visible in the admin and aren't lost to cache
+    eviction or a Redis flush.
+    """
+    class Reason(models.TextChoices):
+        NO_CAPTIONS = 'no_captions', 'No captions found'
+        ERROR = 'error', 'Extraction errors'
+
+    video_id = models.CharField(max_length=50, help_text='YouTube Video ID')
+    language = models.CharField(max_length=10, default='en')
+    reason = models.CharField(max_length=20, choices=Reason.choices)
+    error = models.TextField(blank=True)
+    fallbacks = models.JSONField(default=list, blank=True, help_text='Methods tried and their outcome')
+    failed_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['video_id', 'language']
+
+    def __str__(self):
+        return f"{self.video_id} ({self.language}): {self.reason}"
+
+
+class LessonQuerySet(models.QuerySet):
+    """Query helpers for lessons."""
+
+    def summaries(self):
+        """
+        Lessons without the heavy transcript columns.
+
+        The transcript text is deferred at the SQL level; availability is
+        computed in the database as ``transcript_available`` so serializers
+        can report it without loading the text.
+        """
+        return self.defer('transcript', 'manual_transcript').annotate(
+            transcript_available=models.Case(
+                models.When(
+                    models.Q(transcript='') & models.Q(manual_transcript='') & models.Q(video_transcript__isnull=True),
+                    then=models.Value(False),
+                ),
+                default=models.Value(True),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def with_transcripts(self):
+        """
+        Lessons with their shared VideoTranscript joined in, for serializers
+        that output the transcript text (LessonSerializer). The packed timed
+        captions aren't needed there and stay deferred.
+        """
+        return self.select_related('video_transcript').defer('video_transcript__segment_data')
+
+
 class Lesson(models.Model):
     """Model for lessons within courses."""
     course = models.ForeignKey(
@@ -50,16 +136,40 @@ class Lesson(models.Model):
     transcript_language = models.CharField(max_length=10, default='en', help_text='Transcript language code')
     manual_transcript = models.TextField(blank=True, help_text='Manually pasted transcript as fallback')
     transcript_fetched_at = models.DateTimeField(null=True, blank=True, help_text='When transcript was last fetched')
+    video_transcript = models.ForeignKey(
+        VideoTranscript,
+        related_name='lessons',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text='Shared auto-fetched transcript; used when the lesson has no transcript text of its own'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LessonQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.course.title} - {self.title}"
     
+    @property
+    def auto_transcript(self):
+        """The auto-fetched transcript: the lesson's own text, else the shared video transcript."""
+        if self.transcript:
+            return self.transcript
+        return self.video_transcript.transcript if self.video_transcript_id else ''
+
+    @property
+    def timed_segments(self):
+        """Timed captions of the shared transcript, or None (manual and pasted transcripts have no timing)."""
+        if self.transcript or not self.video_transcript_id or not self.video_transcript.segment_data:
+            return None
+        return self.video_transcript.timed_segments
+
     def get_transcript(self):
         """Get transcript, preferring auto-fetched over manual."""
-        return self.transcript or self.manual_transcript
+        return self.auto_transcript or self.manual_transcript
     
     def get_all_related_assessments(self):
         """Get all assessments related to this lesson (generated + tagged)."""
@@ -75,6 +185,49 @@ class Lesson(models.Model):
         unique_together = ['course', 'order']
 
 
+class LessonTranscriptIndex(models.Model):
+    """Precomputed chunks and BM25 term index for a lesson's transcript."""
+
+    lesson = models.OneToOneField(
+        Lesson,
+        related_name='transcript_index',
+        on_delete=models.CASCADE
+    )
+    transcript_hash = models.CharField(max_length=64, help_text='SHA-256 of the indexed transcript')
+    chunks = models.JSONField(default=list, help_text='[{"text", "start", "end"}] in transcript order')
+    term_index = models.JSONField(default=dict, help_text='BM25 postings and chunk lengths')
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Transcript index for {self.lesson_id}"
+
+
+class LessonQuestion(models.Model):
+    """
+    A pre-generated quiz question, served by generate_quiz without an AI call.
+
+    Questions are pooled per transcript text rather than per lesson, so every
+    lesson on the same video (one shared VideoTranscript) draws on one pool.
+    """
+
+    class Difficulty(models.TextChoices):
+        EASY = 'easy', 'Easy'
+        MEDIUM = 'medium', 'Medium'
+        HARD = 'hard', 'Hard'
+
+    transcript_hash = models.CharField(max_length=64, help_text='SHA-256 of the transcript the question was generated from')
+    difficulty = models.CharField(max_length=10, choices=Difficulty.choices, default=Difficulty.MEDIUM)
+    question = models.JSONField(help_text='{"question", "type", "options", "correct_answer", "explanation"}')
+    served_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['transcript_hash', 'difficulty', 'served_count'])]
+
+    def __str__(self):
+        return f"{self.transcript_hash[:12]} ({self.difficulty}): {self.question.get('question', '')[:60]}"
+
+
 class UserProgress(models.Model):
     """Model for tracking user progress in courses."""
     user = models.ForeignKey(
@@ -208,3 +361,83 @@ class CreatorEarnings(models.Model):
     def month_start(dt=None):
         dt = dt or timezone.now()
         return timezone.datetime(dt.year, dt.month, 1, tzinfo=dt.tzinfo or timezone.utc)
+
+
+class CourseBatch(models.Model):
+    """A course-wide quiz/summary generation run, processed by the job worker."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='batches'
+    )
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='course_batches'
+    )
+    generate_quiz = models.BooleanField(default=True)
+    generate_summary = models.BooleanField(default=False)
+    options = models.JSONField(default=dict, blank=True, help_text='num_questions, difficulty, time_limit_minutes, is_public')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Batch #{self.pk} for {self.course.title} ({self.status})"
+
+
+class CourseBatchItem(models.Model):
+    """One lesson of a CourseBatch; finished steps are kept so a rerun resumes."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    batch = models.ForeignKey(
+        CourseBatch,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='batch_items'
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    assessment = models.ForeignKey(
+        'assessments.Assessment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    summary = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['batch', 'lesson']
+        ordering = ['lesson__order']
+
+    def __str__(self):
+        return f"{self.lesson.title} ({self.status})"
@@ -0,0 +1,188 @@
+"""
+Pre-generated quiz question pools, shared per transcript.
+
+Lessons with the same transcript text (every lesson linked to one
+VideoTranscript, in particular) share a pool of LessonQuestion rows per
+difficulty, keyed by the transcript's hash. A pool is generated in the
+background (the ``fill_question_pool`` job) when a transcript is first
+stored; further lessons on the same video find it filled and queue nothing.
+LessonViewSet.generate_quiz samples from the pool, preferring the
+least-served questions, so a quiz takes one query instead of an AI call.
+
+A question is retired once it has been served QUESTION_POOL_MAX_SERVES
+times, so students repeating a quiz keep seeing new questions. When fewer
+than half of QUESTION_POOL_SIZE questions remain available, a fill job tops
+the pool up; pools of transcripts no lesson uses any more are dropped by
+the next fill.
+"""
+
+import logging
+import random
+
+from django.conf import settings
+from django.db.models import Count, F
+
+from ai_service.quiz import drop_duplicates, generate_quiz_map_reduce
+from jobs.models import Job
+from jobs.queue import enqueue
+from .indexing import transcript_hash
+from .models import Lesson, LessonQuestion, LessonTranscriptIndex
+
+logger = logging.getLogger(__name__)
+
+FILL_JOB = 'fill_question_pool'
+DEFAULT_POOL_SIZE = 24
+DEFAULT_MAX_SERVES = 50
+
+
+def pool_enabled() -> bool:
+    return getattr(settings, 'QUESTION_POOL_ENABLED', True)
+
+
+def pool_size() -> int:
+    return getattr(settings, 'QUESTION_POOL_SIZE', DEFAULT_POOL_SIZE)
+
+
+def _max_serves() -> int:
+    return getattr(settings, 'QUESTION_POOL_MAX_SERVES', DEFAULT_MAX_SERVES)
+
+
+def pool_difficulties():
+    return getattr(settings, 'QUESTION_POOL_DIFFICULTIES', LessonQuestion.Difficulty.values)
+
+
+def _available(digest: str, difficulty: str):
+    return LessonQuestion.objects.filter(
+        transcript_hash=digest,
+        difficulty=difficulty,
+        served_count__lt=_max_serves(),
+    )
+
+
+def _schedule_fill(digest: str, difficulties):
+    """Queue fill jobs for the transcript's pools that are running low and have none queued or running."""
+    counts = dict(
+        LessonQuestion.objects.filter(transcript_hash=digest, difficulty__in=difficulties, served_count__lt=_max_serves())
+        .values_list('difficulty')
+        .annotate(Count('id'))
+    )
+    for difficulty in difficulties:
+        # Same low-water mark as the top-up in sample_questions
+        if counts.get(difficulty, 0) >= pool_size() // 2:
+            continue
+        pending = Job.objects.filter(
+            kind=FILL_JOB,
+            status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+            payload__transcript_hash=digest,
+            payload__difficulty=difficulty,
+        ).exists()
+        if not pending:
+            enqueue(FILL_JOB, {'transcript_hash': digest, 'difficulty': difficulty})
+
+
+def schedule_pool_fill(lesson, difficulties=None):
+    """Queue fills for the pools of the lesson's transcript (none when another lesson already filled them)."""
+    if not pool_enabled():
+        return
+    transcript = lesson.get_transcript()
+    if transcript:
+        _schedule_fill(transcript_hash(transcript), list(difficulties or pool_difficulties()))
+
+
+def sample_questions(lesson, num_questions, difficulty: str, transcript: str = None):
+    """
+    ``num_questions`` questions from the pool for the lesson's transcript, or
+    None when the pool can't supply them (the caller generates live; a fill
+    is scheduled).
+
+    Least-served questions are picked first, ties broken at random, and
+    their served counts incremented. A top-up is scheduled when the pool
+    runs low.
+    """
+    if not pool_enabled() or difficulty not in pool_difficulties():
+        return None
+    try:
+        num_questions = max(1, int(num_questions))
+    except (TypeError, ValueError):
+        return None
+    if transcript is None:
+        transcript = lesson.get_transcript()
+    if not transcript:
+        return None
+
+    digest = transcript_hash(transcript)
+    available = list(_available(digest, difficulty).values_list('id', 'served_count', 'question'))
+    if len(available) < num_questions:
+        _schedule_fill(digest, [difficulty])
+        return None
+
+    random.shuffle(available)
+    available.sort(key=lambda row: row[1])
+    picked = available[:num_questions]
+    LessonQuestion.objects.filter(id__in=[row[0] for row in picked]).update(served_count=F('served_count') + 1)
+
+    retired = sum(1 for _, served, _ in picked if served + 1 >= _max_serves())
+    if len(available) - retired < pool_size() // 2:
+        _schedule_fill(digest, [difficulty])
+    return [question for _, _, question in picked]
+
+
+def add_to_pool(lesson, difficulty: str, questions, transcript: str = None) -> int:
+    """Add live-generated questions to the transcript's pool, up to its size; returns how many were added."""
+    if not pool_enabled() or difficulty not in pool_difficulties():
+        return 0
+    if transcript is None:
+        transcript = lesson.get_transcript()
+    if not transcript or not questions:
+        return 0
+    digest = transcript_hash(transcript)
+    existing = list(_available(digest, difficulty).values_list('question', flat=True))
+    new = drop_duplicates(questions, existing)[:max(0, pool_size() - len(existing))]
+    LessonQuestion.objects.bulk_create([
+        LessonQuestion(transcript_hash=digest, difficulty=difficulty, question=question)
+        for question in new
+    ])
+    return len(new)
+
+
+def _transcript_for(digest: str):
+    """The text of the transcript with hash ``digest``, from any lesson using it; None if none does."""
+    lesson = (
+        Lesson.objects.select_related('video_transcript')
+        .filter(transcript_index__transcript_hash=digest)
+        .first()
+    )
+    transcript = lesson.get_transcript() if lesson is not None else ''
+    return transcript if transcript and transcript_hash(transcript) == digest else None
+
+
+def fill_question_pool(digest: str, difficulty: str) -> int:
+    """
+    Top the pool of the transcript with hash ``digest`` up to
+    QUESTION_POOL_SIZE with questions covering the whole transcript; returns
+    how many were added. Retired questions are removed, as are the pools of
+    transcripts no lesson is indexed with any more.
+    """
+    LessonQuestion.objects.exclude(
+        transcript_hash__in=LessonTranscriptIndex.objects.values('transcript_hash')
+    ).delete()
+    transcript = _transcript_for(digest)
+    if transcript is None:
+        return 0
+    LessonQuestion.objects.filter(
+        transcript_hash=digest, difficulty=difficulty, served_count__gte=_max_serves()
+    ).delete()
+
+    existing = list(_available(digest, difficulty).values_list('question', flat=True))
+    needed = pool_size() - len(existing)
+    if needed <= 0:
+        return 0
+
+    generated = generate_quiz_map_reduce(transcript, needed, difficulty, endpoint='quiz_pool')['questions']
+    new = drop_duplicates(generated, existing)[:needed]
+    LessonQuestion.objects.bulk_create([
+        LessonQuestion(transcript_hash=digest, difficulty=difficulty, question=question)
+        for question in new
+    ])
+    logger.info("Question pool %s (%s): added %d, now %d", digest[:12], difficulty, len(new), len(existing) + len(new))
+    return len(new)
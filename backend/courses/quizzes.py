@@ -0,0 +1,110 @@
+"""
+Lesson quiz generation and saving, shared by LessonViewSet and the
+course-wide batch pipeline (courses.batch).
+"""
+
+import json
+
+from django.db import transaction
+
+from ai_service.quiz import generate_quiz_map_reduce
+from ai_service.quiz_stream import salvage_questions
+from ai_service.views import call_ai
+
+QUIZ_MODES = ('full', 'quick')
+
+
+def lesson_quiz_prompt(transcript: str, num_questions, difficulty: str) -> str:
+    return f"""
+            Based on the following video transcript, generate {num_questions} {difficulty} difficulty quiz questions.
+
+            Transcript:
+            {transcript[:3000]}
+
+            Please generate questions in the following JSON format:
+            {{
+                "questions": [
+                    {{
+                        "question": "Question text here?",
+                        "type": "mcq",
+                        "options": ["Option A", "Option B", "Option C", "Option D"],
+                        "correct_answer": "Option A",
+                        "explanation": "Brief explanation of why this is correct"
+                    }}
+                ]
+            }}
+
+            Ensure the questions are relevant to the transcript content and test understanding of key concepts.
+            """
+
+
+def generate_lesson_quiz(transcript: str, num_questions, difficulty: str) -> str:
+    """The model's quiz for a transcript, with code fences stripped (parse with json.loads)."""
+    # Use shared AI call helper (handles Gemini vs OpenRouter and rate limits)
+    response_text = call_ai(
+        lesson_quiz_prompt(transcript, num_questions, difficulty),
+        max_tokens=1000,
+        endpoint='lesson_generate_quiz'
+    )
+
+    # Normalize and parse JSON
+    response_text = response_text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]
+    if response_text.startswith('```'):
+        response_text = response_text[3:]
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]
+    return response_text.strip()
+
+
+def build_lesson_quiz(transcript: str, num_questions, difficulty: str, mode: str = 'full') -> dict:
+    """
+    Quiz data (``{'questions': [...]}``) for a lesson transcript.
+
+    ``full`` covers the whole transcript with parallel per-section calls
+    (ai_service.quiz); ``quick`` is a single call on the transcript's start.
+    A quick response cut off mid-way keeps its complete questions (with
+    ``'truncated': True``); json.JSONDecodeError is raised when it holds none.
+    """
+    if mode == 'quick':
+        response_text = generate_lesson_quiz(transcript, num_questions, difficulty)
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError:
+            questions = salvage_questions(response_text)
+            if not questions:
+                raise
+            return {'questions': questions, 'truncated': True}
+    return generate_quiz_map_reduce(transcript, num_questions, difficulty)
+
+
+def save_quiz_assessment(lesson, creator, title: str, quiz_data: dict, time_limit_minutes=30, is_public=True):
+    """Create an assessment linked to ``lesson`` with the quiz's questions in one insert."""
+    from assessments.models import Assessment, Question
+
+    questions = quiz_data.get('questions', [])
+    with transaction.atomic():
+        assessment = Assessment.objects.create(
+            title=title,
+            topic=lesson.title,
+            description=f"Quiz generated from: {lesson.title}",
+            creator=creator,
+            time_limit_minutes=time_limit_minutes,
+            is_public=is_public,
+            source_lesson=lesson  # Link to source lesson
+        )
+        Question.objects.bulk_create([
+            Question(
+                assessment=assessment,
+                question_text=q.get('question', ''),
+                question_type=q.get('type', 'mcq'),
+                options=q.get('options', []),
+                correct_answer=q.get('correct_answer', ''),
+                explanation=q.get('explanation', ''),
+                points=1,
+                order=idx
+            )
+            for idx, q in enumerate(questions)
+        ])
+    return assessment, len(questions)
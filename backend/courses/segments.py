@@ -0,0 +1,169 @@
+"""
+Compact storage for timed transcript segments.
+
+Extraction returns segments as ``[{"start", "duration", "text"}, ...]``;
+as JSON that is ~60 bytes of keys and number formatting per caption line
+before the text itself. VideoTranscript stores them instead as one blob::
+
+    header      b'SEG1', segment count (uint32)
+    starts      float32 * n   seconds, ascending
+    durations   float32 * n
+    offsets     uint32 * (n + 1)   byte offsets into the text buffer
+    text        UTF-8 caption text, concatenated
+
+A 3-hour lecture (~3,000 caption lines) takes 12 bytes per line plus its
+text. ``TimedSegments`` reads the arrays as memoryview casts of the blob,
+so loading copies nothing, and finds the segment playing at a given time
+(or the segments in a time range) with ``bisect`` over the start times.
+"""
+
+import bisect
+import math
+import struct
+import sys
+from array import array
+
+MAGIC = b'SEG1'
+HEADER = struct.Struct('<4sI')
+
+
+def parse_timestamp(value) -> float:
+    """Seconds from ``760``, ``"760.5"``, ``"12:40"`` or ``"1:02:03"``; ValueError otherwise."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        parts = [float(value)]
+    elif isinstance(value, str) and value.strip():
+        try:
+            parts = [float(part) for part in value.strip().split(':')]
+        except ValueError:
+            raise ValueError(f'Invalid timestamp: {value!r}') from None
+    else:
+        raise ValueError(f'Invalid timestamp: {value!r}')
+    # Rejects inf/nan (not JSON-serializable in responses) and "1:-5"
+    if not all(math.isfinite(part) and part >= 0 for part in parts):
+        raise ValueError(f'Invalid timestamp: {value!r}')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    if not math.isfinite(seconds):
+        raise ValueError(f'Invalid timestamp: {value!r}')
+    return seconds
+
+
+def format_timestamp(seconds: float) -> str:
+    """``12:40`` / ``1:02:03``, as shown on the YouTube player."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def pack_segments(segments) -> bytes:
+    """The blob for extractor segments (sorted by start; empty text dropped); b'' for none."""
+    rows = sorted(
+        (
+            (float(segment.get('start') or 0), float(segment.get('duration') or 0), (segment.get('text') or '').strip())
+            for segment in segments or ()
+        ),
+        key=lambda row: row[0],
+    )
+    rows = [row for row in rows if row[2]]
+    if not rows:
+        return b''
+
+    starts = array('f', (row[0] for row in rows))
+    durations = array('f', (row[1] for row in rows))
+    offsets = array('I', [0])
+    text = bytearray()
+    for _, _, line in rows:
+        text += line.encode('utf-8')
+        offsets.append(len(text))
+    if sys.byteorder != 'little':
+        for values in (starts, durations, offsets):
+            values.byteswap()
+    return HEADER.pack(MAGIC, len(rows)) + starts.tobytes() + durations.tobytes() + offsets.tobytes() + bytes(text)
+
+
+class TimedSegments:
+    """
+    Read-only view of a packed segment blob.
+
+    Supports ``len``, indexing and iteration (each segment as a
+    ``{"start", "duration", "text"}`` dict) plus lookups by time.
+    """
+
+    def __init__(self, data=b''):
+        buffer = memoryview(data or b'')
+        if not buffer.nbytes:
+            self.starts = self.durations = self._offsets = ()
+            self._text = buffer
+            return
+        magic, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError('Not a packed segment blob')
+
+        position = HEADER.size
+        arrays = []
+        for typecode, length in (('f', count), ('f', count), ('I', count + 1)):
+            end = position + 4 * length
+            arrays.append(self._cast(buffer[position:end], typecode))
+            position = end
+        self.starts, self.durations, self._offsets = arrays
+        self._text = buffer[position:]
+
+    @staticmethod
+    def _cast(buffer, typecode):
+        if sys.byteorder == 'little':
+            return buffer.cast(typecode)
+        values = array(typecode, buffer.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('segment index out of range')
+        # float32 keeps lecture-length times to about a millisecond; round off the noise
+        return {'start': round(self.starts[i], 3), 'duration': round(self.durations[i], 3), 'text': self.text(i)}
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def text(self, i: int) -> str:
+        return bytes(self._text[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def end(self, i: int) -> float:
+        return self.starts[i] + self.durations[i]
+
+    def index_at(self, seconds: float) -> int:
+        """Index of the last segment starting at or before ``seconds`` (-1 before the first)."""
+        return bisect.bisect_right(self.starts, seconds) - 1
+
+    def segment_at(self, seconds: float):
+        """The segment being spoken at ``seconds``, or None."""
+        i = self.index_at(seconds)
+        if i < 0 or seconds > self.end(i):
+            return None
+        return self[i]
+
+    def span(self, start: float, end: float) -> range:
+        """Indices of the segments overlapping ``[start, end]`` seconds."""
+        first = self.index_at(start)
+        if first < 0:
+            first = 0
+        elif self.end(first) < start:
+            first += 1
+        return range(first, max(first, bisect.bisect_right(self.starts, end)))
+
+    def between(self, start: float, end: float) -> list:
+        """The segments overlapping ``[start, end]`` seconds."""
+        return [self[i] for i in self.span(start, end)]
+
+    def text_between(self, start: float, end: float) -> str:
+        """Caption text spoken between ``start`` and ``end`` seconds."""
+        return ' '.join(self.text(i) for i in self.span(start, end))
+
+    def to_list(self) -> list:
+        return list(self)
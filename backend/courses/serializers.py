@@ -6,6 +6,8 @@ from .models import (
     CoursePricing,
     ContentPurchase,
     CreatorTip,
+    CourseBatch,
+    CourseBatchItem,
 )
 from users.serializers import UserSerializer
 
@@ -27,7 +29,42 @@ class LessonSerializer(serializers.ModelSerializer):
     
     def get_has_transcript(self, obj):
         """Check if lesson has any transcript available."""
-        return bool(obj.transcript or obj.manual_transcript)
+        return bool(obj.get_transcript())
+
+    def get_videoId(self, obj):
+        return obj.video_id
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'transcript' in data:
+            # Auto-fetched text may live on the shared VideoTranscript
+            data['transcript'] = instance.auto_transcript
+        return data
+
+
+class LessonSummarySerializer(serializers.ModelSerializer):
+    """Transcript-free lesson representation for course catalogs.
+
+    Pair with ``Lesson.objects.summaries()`` so the transcript columns are
+    never loaded; the full text is served by ``LessonViewSet.get_transcript``.
+    """
+    has_transcript = serializers.SerializerMethodField()
+    videoId = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Lesson
+        fields = [
+            'id', 'course', 'title', 'video_id', 'videoId', 'video_url', 'duration',
+            'order', 'description', 'transcript_language', 'transcript_fetched_at',
+            'has_transcript', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_has_transcript(self, obj):
+        available = getattr(obj, 'transcript_available', None)
+        if available is not None:
+            return available
+        return bool(obj.get_transcript())
 
     def get_videoId(self, obj):
         return obj.video_id
@@ -76,10 +113,15 @@ class CourseSerializer(serializers.ModelSerializer):
 
 
 class CourseListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for course lists - now includes lessons."""
+    """Lightweight serializer for course lists - includes lesson summaries only.
+
+    Expects the queryset from ``CourseViewSet.catalog_queryset`` (annotated
+    ``lesson_total`` and prefetched summary lessons); plain querysets still
+    work but fall back to per-course queries.
+    """
     owner_username = serializers.CharField(source='owner.username', read_only=True)
     lesson_count = serializers.SerializerMethodField()
-    lessons = LessonSerializer(many=True, read_only=True)
+    lessons = LessonSummarySerializer(many=True, read_only=True)
     
     class Meta:
         model = Course
@@ -89,6 +131,9 @@ class CourseListSerializer(serializers.ModelSerializer):
         ]
 
     def get_lesson_count(self, obj):
+        total = getattr(obj, 'lesson_total', None)
+        if total is not None:
+            return total
         return obj.lessons.count()
 
 
@@ -138,3 +183,31 @@ class CreatorTipSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'from_user', 'from_username', 'course_title', 'created_at']
+
+
+class CourseBatchItemSerializer(serializers.ModelSerializer):
+    lesson_title = serializers.CharField(source='lesson.title', read_only=True)
+
+    class Meta:
+        model = CourseBatchItem
+        fields = ['id', 'lesson', 'lesson_title', 'status', 'assessment', 'summary', 'error', 'attempts', 'updated_at']
+        read_only_fields = fields
+
+
+class CourseBatchSerializer(serializers.ModelSerializer):
+    """Serializer for a course batch with per-lesson progress."""
+    course_title = serializers.CharField(source='course.title', read_only=True)
+    progress = serializers.SerializerMethodField()
+    items = CourseBatchItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = CourseBatch
+        fields = [
+            'id', 'course', 'course_title', 'generate_quiz', 'generate_summary', 'options',
+            'status', 'job', 'progress', 'items', 'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        from .batch import batch_progress
+        return batch_progress(obj)
@@ -1,7 +1,8 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from .models import Course
+from .models import Course, Lesson
 
 
 @receiver(post_save, sender=Course)
@@ -12,3 +13,15 @@ def create_course_channel(sender, instance, created, **kwargs):
         from community.models import CourseChannel
 
         CourseChannel.objects.get_or_create(course=instance)
+
+
+@receiver(post_save, sender=Lesson)
+def refresh_transcript_index(sender, instance, raw=False, **kwargs):
+    """Keep the persisted chunk/term index and question pool in step with the lesson transcript."""
+    if raw:
+        return
+    from .indexing import sync_transcript_index
+    from .question_pool import schedule_pool_fill
+
+    if sync_transcript_index(instance) and instance.get_transcript():
+        transaction.on_commit(lambda: schedule_pool_fill(instance))
@@ -0,0 +1,72 @@
+"""Background job handlers for lessons (see jobs.registry)."""
+
+from django.utils import timezone
+
+from jobs.registry import PermanentJobError, register
+from .models import CourseBatch, Lesson, LessonQuestion
+from .transcripts import (
+    cached_transcript_response,
+    fetch_error_response,
+    fetch_video_data,
+    lesson_video_url,
+    store_fetch_result,
+)
+
+
+@register('fetch_transcript')
+def fetch_transcript(job):
+    """LessonViewSet.fetch_transcript, run by the worker."""
+    lesson = Lesson.objects.filter(pk=job.payload['lesson_id']).first()
+    if lesson is None:
+        raise PermanentJobError(f"Lesson {job.payload['lesson_id']} no longer exists")
+
+    language = job.payload.get('language', 'en')
+    cached = cached_transcript_response(lesson, job.payload.get('force_refresh', False), language)
+    if cached is not None:
+        return cached
+
+    video_url = lesson_video_url(lesson)
+    try:
+        result = fetch_video_data(video_url, language)
+    except Exception as e:
+        # Retry transient failures; the last attempt falls back like the view does
+        if not job.is_last_attempt:
+            raise
+        return fetch_error_response(lesson, e)
+    return store_fetch_result(lesson, result, language, video_url)
+
+
+@register('fill_question_pool')
+def fill_question_pool(job):
+    """Generate or top up a transcript's shared question pool (see courses.question_pool)."""
+    from .question_pool import fill_question_pool as fill
+
+    digest = job.payload['transcript_hash']
+    difficulty = job.payload.get('difficulty', 'medium')
+    added = fill(digest, difficulty)
+    return {
+        'transcript_hash': digest,
+        'difficulty': difficulty,
+        'added': added,
+        'pool_size': LessonQuestion.objects.filter(transcript_hash=digest, difficulty=difficulty).count(),
+    }, 200
+
+
+@register('course_batch')
+def course_batch(job):
+    """Course-wide quiz/summary generation (see courses.batch)."""
+    from .batch import run_course_batch
+
+    batch = CourseBatch.objects.select_related('creator').filter(pk=job.payload['batch_id']).first()
+    if batch is None:
+        raise PermanentJobError(f"Course batch {job.payload['batch_id']} no longer exists")
+
+    try:
+        progress = run_course_batch(batch, is_last_attempt=job.is_last_attempt)
+    except Exception:
+        if job.is_last_attempt:
+            CourseBatch.objects.filter(pk=batch.pk).update(
+                status=CourseBatch.Status.FAILED, finished_at=timezone.now()
+            )
+        raise
+    return {'batch_id': batch.id, 'status': batch.status, 'progress': progress}, 200
@@ -0,0 +1,271 @@
+"""
+Lesson transcript fetching, shared by LessonViewSet.fetch_transcript and its
+async (ASGI) variant.
+
+The work is split so the async view can run the network part in a worker
+thread and the database part on Django's thread-sensitive executor:
+
+- ``cached_transcript_response`` answers without fetching when possible
+- ``fetch_video_data`` talks to YouTube only (no database access)
+- ``store_fetch_result`` / ``fetch_error_response`` save and shape the reply
+- ``transcript_range`` / ``playback_context`` slice the timed captions by time
+
+Auto-fetched transcripts are stored once per video and language in
+VideoTranscript and linked from each lesson, so a second lesson (or course)
+on the same video is answered from the database instead of YouTube.
+
+Failed extractions are remembered too (TranscriptFailure): walking every
+extraction method for a video without captions takes tens of seconds, so
+until the failure expires requests go straight to the manual transcript
+fallback. They live in the database with the transcripts, not the shared
+cache, so they survive cache eviction and can be inspected in the admin.
+``force_refresh`` tries YouTube again.
+
+Each response helper returns ``(payload, status_code)``.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+
+from services.youtube_service import YouTubeTranscriptService
+from .indexing import transcript_hash
+from .models import TranscriptFailure, VideoTranscript
+from .segments import format_timestamp, pack_segments
+
+DEFAULT_WINDOW_SECONDS = 30
+DEFAULT_FAILURE_TTL = 6 * 60 * 60
+DEFAULT_FAILURE_ERROR_TTL = 10 * 60
+
+
+def lesson_video_url(lesson) -> str:
+    return lesson.video_url or f"https://www.youtube.com/watch?v={lesson.video_id}"
+
+
+def shared_transcript(video_id: str, language: str = 'en'):
+    """The stored VideoTranscript for a video and language, or None."""
+    if not video_id:
+        return None
+    return VideoTranscript.objects.filter(video_id=video_id, language=language).first()
+
+
+def save_video_transcript(video_id: str, transcript_data: dict, language: str = 'en') -> VideoTranscript:
+    """Store (or replace) a video's extracted transcript; ``transcript_data`` is the extractor's result."""
+    text = transcript_data.get('transcript', '')
+    TranscriptFailure.objects.filter(video_id=video_id, language__in={language, transcript_data.get('language') or language}).delete()
+    shared, _ = VideoTranscript.objects.update_or_create(
+        video_id=video_id,
+        language=transcript_data.get('language') or language,
+        defaults={
+            'transcript': text,
+            'segment_data': pack_segments(transcript_data.get('segments')),
+            'content_hash': transcript_hash(text),
+            'method': transcript_data.get('method', ''),
+            'fetched_at': timezone.now(),
+        },
+    )
+    return shared
+
+
+def recorded_failure(video_id: str, language: str = 'en'):
+    """The unexpired TranscriptFailure for a video and language, or None."""
+    if not video_id:
+        return None
+    return TranscriptFailure.objects.filter(video_id=video_id, language=language, expires_at__gt=timezone.now()).first()
+
+
+def record_failure(video_id: str, language: str, transcript_data: dict) -> TranscriptFailure:
+    """
+    Remember a failed extraction. A video where every method ran and found
+    no captions is skipped for TRANSCRIPT_FAILURE_TTL; when a method raised
+    (possibly a network problem or rate limit) only for
+    TRANSCRIPT_FAILURE_ERROR_TTL.
+    """
+    fallbacks = transcript_data.get('fallbacks') or []
+    if any('error' in attempt for attempt in fallbacks):
+        reason = TranscriptFailure.Reason.ERROR
+        ttl = getattr(settings, 'TRANSCRIPT_FAILURE_ERROR_TTL', DEFAULT_FAILURE_ERROR_TTL)
+    else:
+        reason = TranscriptFailure.Reason.NO_CAPTIONS
+        ttl = getattr(settings, 'TRANSCRIPT_FAILURE_TTL', DEFAULT_FAILURE_TTL)
+    now = timezone.now()
+    TranscriptFailure.objects.filter(expires_at__lte=now).delete()
+    failure, _ = TranscriptFailure.objects.update_or_create(
+        video_id=video_id,
+        language=language,
+        defaults={
+            'reason': reason,
+            'error': transcript_data.get('error', ''),
+            'fallbacks': fallbacks,
+            'failed_at': now,
+            'expires_at': now + timedelta(seconds=ttl),
+        },
+    )
+    return failure
+
+
+def link_shared_transcript(lesson, shared: VideoTranscript):
+    """Point the lesson at the shared transcript instead of a copy of its text."""
+    lesson.video_transcript = shared
+    lesson.transcript = ''
+    lesson.transcript_language = shared.language
+    lesson.transcript_fetched_at = shared.fetched_at
+    lesson.save()
+
+
+def cached_transcript_response(lesson, force_refresh: bool, language: str = 'en'):
+    """The stored transcript response, or None when it must be fetched."""
+    if force_refresh:
+        return None
+    # Check if transcript already exists
+    if lesson.auto_transcript:
+        return {
+            'success': True,
+            'message': 'Transcript already exists',
+            'transcript': lesson.auto_transcript,
+            'source': 'cached',
+            'has_manual_fallback': bool(lesson.manual_transcript)
+        }, status.HTTP_200_OK
+
+    # Another lesson already fetched this video
+    shared = shared_transcript(lesson.video_id, language)
+    if shared is not None:
+        link_shared_transcript(lesson, shared)
+        return {
+            'success': True,
+            'message': 'Transcript already fetched for this video',
+            'transcript': shared.transcript,
+            'source': 'shared',
+            'has_manual_fallback': bool(lesson.manual_transcript)
+        }, status.HTTP_200_OK
+
+    # Failed recently; don't walk the extraction methods again
+    failure = recorded_failure(lesson.video_id, language)
+    if failure is not None:
+        return failed_fetch_response(lesson, failure.error or 'Could not extract transcript from this video', {
+            'cached_failure': True,
+            'retry_after': failure.expires_at.isoformat(),
+        })
+    return None
+
+
+def fetch_video_data(video_url: str, language: str) -> dict:
+    """Extract transcript and metadata from YouTube (blocking network I/O)."""
+    service = YouTubeTranscriptService()
+    return service.extract_complete_video_data(video_url, language)
+
+
+def store_fetch_result(lesson, result: dict, language: str, video_url: str):
+    """Save a successful extraction for the video and the lesson, or fall back to the manual transcript."""
+    if result.get('success'):
+        # Store once per video; the lesson links to it
+        transcript_data = result.get('transcript', {})
+        shared = save_video_transcript(result.get('video_id') or lesson.video_id, transcript_data, language)
+        lesson.video_transcript = shared
+        lesson.transcript = ''
+        lesson.transcript_language = shared.language
+        lesson.transcript_fetched_at = shared.fetched_at
+
+        # Also update video metadata if missing
+        metadata = result.get('metadata', {})
+        if not lesson.video_url:
+            lesson.video_url = video_url
+        if lesson.duration == 'N/A' and metadata.get('duration'):
+            lesson.duration = str(metadata.get('duration'))
+
+        lesson.save()
+
+        return {
+            'success': True,
+            'message': 'Transcript fetched successfully',
+            'transcript': shared.transcript,
+            'source': 'youtube',
+            'metadata': metadata,
+            'available_languages': result.get('available_languages', [])
+        }, status.HTTP_200_OK
+
+    # Auto-fetch failed
+    error_message = result.get('error', 'Failed to fetch transcript')
+    if result.get('video_id'):
+        record_failure(result['video_id'], language, result.get('transcript') or {})
+    return failed_fetch_response(lesson, error_message)
+
+
+def failed_fetch_response(lesson, error_message: str, extra: dict = None):
+    """The manual transcript when there is one, otherwise a 422 asking for it."""
+    # Check if manual transcript exists
+    if lesson.manual_transcript:
+        return {
+            'success': True,
+            'message': 'Auto-fetch failed, using manual transcript',
+            'transcript': lesson.manual_transcript,
+            'source': 'manual',
+            'auto_fetch_error': error_message,
+            **(extra or {})
+        }, status.HTTP_200_OK
+    return {
+        'success': False,
+        'error': error_message,
+        'message': 'Please provide a manual transcript as fallback',
+        'can_paste_manual': True,
+        **(extra or {})
+    }, status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def fetch_error_response(lesson, error: Exception):
+    """Response for an exception raised while fetching."""
+    if lesson.manual_transcript:
+        return {
+            'success': True,
+            'message': 'Auto-fetch error, using manual transcript',
+            'transcript': lesson.manual_transcript,
+            'source': 'manual',
+            'auto_fetch_error': str(error)
+        }, status.HTTP_200_OK
+    return {
+        'success': False,
+        'error': f'Error fetching transcript: {str(error)}',
+        'message': 'Please provide a manual transcript as fallback',
+        'can_paste_manual': True
+    }, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def window_seconds() -> float:
+    return getattr(settings, 'TRANSCRIPT_WINDOW_SECONDS', DEFAULT_WINDOW_SECONDS)
+
+
+def transcript_range(lesson, start: float, end: float):
+    """
+    ``{'start', 'end', 'text', 'segments'}`` for the captions between
+    ``start`` and ``end`` seconds, or None when the lesson's transcript has
+    no timing (manual, pasted, or scraped without timestamps).
+    """
+    timed = lesson.timed_segments
+    if not timed:
+        return None
+    segments = timed.between(start, end)
+    return {
+        'start': start,
+        'end': end,
+        'text': ' '.join(segment['text'] for segment in segments),
+        'segments': segments,
+    }
+
+
+def playback_context(lesson, at: float, window: float = None) -> str:
+    """
+    The transcript around playback position ``at`` (``window`` seconds
+    either side) for AI prompts, labelled with the player time; '' when the
+    lesson has no timed captions or nothing was said there.
+    """
+    timed = lesson.timed_segments
+    if not timed:
+        return ''
+    window = window_seconds() if window is None else window
+    start, end = max(0.0, at - window), at + window
+    text = timed.text_between(start, end)
+    if not text:
+        return ''
+    return f"[{format_timestamp(start)} - {format_timestamp(end)}, student is at {format_timestamp(at)}]\n{text}"
@@ -1,12 +1,25 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, LessonViewSet, UserProgressViewSet
+from .views import CourseViewSet, LessonViewSet, UserProgressViewSet, CourseBatchViewSet
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet)
 router.register(r'lessons', LessonViewSet)
 router.register(r'progress', UserProgressViewSet, basename='progress')
+router.register(r'course-batches', CourseBatchViewSet, basename='course-batch')
 
-urlpatterns = [
+urlpatterns = []
+
+# Under ASGI (ASYNC_VIEWS=True) transcript fetching is served by an async view,
+# matched ahead of the router's LessonViewSet.fetch_transcript action
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    urlpatterns.append(
+        path('lessons/<int:pk>/fetch_transcript/', async_views.fetch_transcript, name='lesson-fetch-transcript-async'),
+    )
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
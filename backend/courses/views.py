@@ -6,7 +6,13 @@ from django.utils import timezone
 from decimal import Decimal, InvalidOperation
 from datetime import timedelta
 import re
-from ai_service.views import call_ai
+from ai_service.circuit_breaker import ProviderUnavailableError
+from ai_service.views import call_ai, call_ai_stream
+from ai_service.models import TutorSession
+from ai_service.streaming import quiz_sse_response, sse_response, wants_stream
+from ai_service.tutor_sessions import get_session, history_block, last_student_message, record_exchange, record_stream
+from jobs.queue import accepted_payload, enqueue, wants_background
+from users.metering import ai_limits_enabled, ai_metered, quota_exceeded_payload, reserve_ai_queries
 from .models import (
     Course,
     Lesson,
@@ -14,6 +20,8 @@ from .models import (
     CoursePricing,
     ContentPurchase,
     CreatorTip,
+    CourseBatch,
+    CourseBatchItem,
 )
 from .serializers import (
     CourseSerializer,
@@ -23,9 +31,25 @@ from .serializers import (
     CoursePricingSerializer,
     ContentPurchaseSerializer,
     CreatorTipSerializer,
+    CourseBatchSerializer,
+)
+from .batch import create_course_batch, start_course_batch
+from .indexing import get_lesson_index, transcript_hash
+from .transcripts import (
+    cached_transcript_response,
+    fetch_error_response,
+    fetch_video_data,
+    lesson_video_url,
+    playback_context,
+    shared_transcript,
+    store_fetch_result,
+    transcript_range,
+    window_seconds,
 )
 from .permissions import IsOwnerOrReadOnly
-from services.youtube_service import YouTubeTranscriptService
+from .question_pool import add_to_pool, sample_questions
+from .segments import parse_timestamp
+from .quizzes import QUIZ_MODES, build_lesson_quiz, lesson_quiz_prompt, save_quiz_assessment
 from payments.models import Payment
 
 
@@ -40,13 +64,36 @@ class CourseViewSet(viewsets.ModelViewSet):
             return CourseListSerializer
         return CourseSerializer
 
+    @staticmethod
+    def catalog_queryset(queryset):
+        """
+        Shape a course queryset for catalog listings.
+
+        Lessons are prefetched as transcript-free summaries and the lesson
+        count is annotated on the course query itself.
+        """
+        return queryset.select_related('owner').annotate(
+            lesson_total=models.Count('lessons')
+        ).prefetch_related(
+            models.Prefetch('lessons', queryset=Lesson.objects.summaries())
+        )
+
     def get_queryset(self):
         """Filter courses based on user permissions."""
         if self.request.user.is_authenticated:
-            return Course.objects.filter(
+            queryset = Course.objects.filter(
                 models.Q(is_public=True) | models.Q(owner=self.request.user)
             )
-        return Course.objects.filter(is_public=True)
+        else:
+            queryset = Course.objects.filter(is_public=True)
+        if self.action == 'list':
+            queryset = self.catalog_queryset(queryset)
+        elif self.action == 'retrieve':
+            # CourseSerializer nests full lessons, shared transcripts included
+            queryset = queryset.prefetch_related(
+                models.Prefetch('lessons', queryset=Lesson.objects.with_transcripts())
+            )
+        return queryset
 
     def perform_create(self, serializer):
         """Set the owner to the current user."""
@@ -56,17 +103,74 @@ class CourseViewSet(viewsets.ModelViewSet):
     def lessons(self, request, pk=None):
         """Get all lessons for a course."""
         course = self.get_object()
-        lessons = course.lessons.all()
+        lessons = course.lessons.with_transcripts()
         serializer = LessonSerializer(lessons, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def my_courses(self, request):
         """Get courses owned by the current user."""
-        courses = Course.objects.filter(owner=request.user)
+        courses = self.catalog_queryset(Course.objects.filter(owner=request.user))
         serializer = CourseListSerializer(courses, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'])
+    def batch_generate(self, request, pk=None):
+        """
+        Generate quizzes (saved as assessments) and/or summaries for every
+        lesson with a transcript, in the job worker.
+
+        POST /api/courses/{id}/batch_generate/
+        {
+            "quiz": true (optional),
+            "summary": false (optional),
+            "num_questions": 5 (optional),
+            "difficulty": "medium" (optional),
+            "mode": "full" (optional, see LessonViewSet.generate_quiz),
+            "time_limit_minutes": 30 (optional),
+            "is_public": true (optional)
+        }
+
+        Progress: GET /api/course-batches/{batch_id}/
+        """
+        course = self.get_object()
+        if course.owner != request.user:
+            return Response(
+                {'error': "You don't have permission to modify this course."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        generate_quiz = bool(request.data.get('quiz', True))
+        generate_summary = bool(request.data.get('summary', False))
+        if not generate_quiz and not generate_summary:
+            return Response({'error': 'Nothing to generate: set "quiz" and/or "summary"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        options = {
+            key: request.data[key]
+            for key in ('num_questions', 'difficulty', 'mode', 'time_limit_minutes', 'is_public')
+            if key in request.data
+        }
+        if options.get('mode', 'full') not in QUIZ_MODES:
+            return Response({'error': f"mode must be one of: {', '.join(QUIZ_MODES)}"}, status=status.HTTP_400_BAD_REQUEST)
+        batch = create_course_batch(course, request.user, generate_quiz, generate_summary, options)
+        if batch is None:
+            return Response({
+                'error': 'No lessons in this course have a transcript. Please fetch or add transcripts first.',
+                'can_fetch': True
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # One AI query per lesson, reserved up front
+        if ai_limits_enabled():
+            allowed, used, limit = reserve_ai_queries(request.user, batch.items.count())
+            if not allowed:
+                batch.delete()
+                return Response(quota_exceeded_payload(used, limit), status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        job = start_course_batch(batch)
+        payload, status_code = accepted_payload(job)
+        payload['batch'] = CourseBatchSerializer(batch).data
+        return Response(payload, status=status_code)
+
     def _extract_video_id(self, video_id: str = None, video_url: str = None):
         """Extract YouTube video ID from ID or URL."""
         if video_id:
@@ -353,6 +457,11 @@ class CourseViewSet(viewsets.ModelViewSet):
             existing_lesson = course.lessons.order_by('-order').first()
             next_order = (existing_lesson.order + 1) if existing_lesson else 0
             
+            # Reuse the video's stored transcript rather than keeping another copy
+            shared = shared_transcript(video_id, transcript_language)
+            if shared is not None and transcript and transcript_hash(transcript) != shared.content_hash:
+                shared = None
+            
             lesson = Lesson.objects.create(
                 course=course,
                 title=title,
@@ -361,8 +470,10 @@ class CourseViewSet(viewsets.ModelViewSet):
                 duration=duration,
                 order=next_order,
                 description=description,
-                transcript=transcript,
-                transcript_language=transcript_language
+                transcript='' if shared else transcript,
+                transcript_language=transcript_language,
+                video_transcript=shared,
+                transcript_fetched_at=shared.fetched_at if shared else None
             )
             
             serializer = LessonSerializer(lesson)
@@ -387,7 +498,7 @@ class CourseViewSet(viewsets.ModelViewSet):
 
 class LessonViewSet(viewsets.ModelViewSet):
     """ViewSet for managing lessons."""
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.select_related('video_transcript')
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
@@ -426,95 +537,38 @@ class LessonViewSet(viewsets.ModelViewSet):
         POST /api/lessons/{id}/fetch_transcript/
         {
             "language": "en" (optional),
-            "force_refresh": false (optional)
+            "force_refresh": false (optional),
+            "background": false (optional, returns a job id)
         }
         """
         lesson = self.get_object()
         language = request.data.get('language', 'en')
         force_refresh = request.data.get('force_refresh', False)
         
-        # Check if transcript already exists and not forcing refresh
-        if lesson.transcript and not force_refresh:
-            return Response({
-                'success': True,
-                'message': 'Transcript already exists',
-                'transcript': lesson.transcript,
-                'source': 'cached',
-                'has_manual_fallback': bool(lesson.manual_transcript)
-            })
+        cached = cached_transcript_response(lesson, force_refresh, language)
+        if cached is not None:
+            payload, status_code = cached
+            return Response(payload, status=status_code)
+        
+        # "background": true fetches in the job worker and returns a job id
+        if wants_background(request):
+            job = enqueue('fetch_transcript', {
+                'lesson_id': lesson.id,
+                'language': language,
+                'force_refresh': force_refresh,
+            }, user=request.user)
+            payload, status_code = accepted_payload(job)
+            return Response(payload, status=status_code)
         
         # Try to fetch transcript from YouTube
         try:
-            service = YouTubeTranscriptService()
-            
-            # Get video URL or construct from video_id
-            video_url = lesson.video_url or f"https://www.youtube.com/watch?v={lesson.video_id}"
-            
-            # Extract transcript
-            result = service.extract_complete_video_data(video_url, language)
-            
-            if result.get('success'):
-                # Save transcript to lesson
-                transcript_data = result.get('transcript', {})
-                lesson.transcript = transcript_data.get('transcript', '')
-                lesson.transcript_language = language
-                lesson.transcript_fetched_at = timezone.now()
-                
-                # Also update video metadata if missing
-                metadata = result.get('metadata', {})
-                if not lesson.video_url:
-                    lesson.video_url = video_url
-                if lesson.duration == 'N/A' and metadata.get('duration'):
-                    lesson.duration = str(metadata.get('duration'))
-                
-                lesson.save()
-                
-                return Response({
-                    'success': True,
-                    'message': 'Transcript fetched successfully',
-                    'transcript': lesson.transcript,
-                    'source': 'youtube',
-                    'metadata': metadata,
-                    'available_languages': result.get('available_languages', [])
-                })
-            else:
-                # Auto-fetch failed
-                error_message = result.get('error', 'Failed to fetch transcript')
-                
-                # Check if manual transcript exists
-                if lesson.manual_transcript:
-                    return Response({
-                        'success': True,
-                        'message': 'Auto-fetch failed, using manual transcript',
-                        'transcript': lesson.manual_transcript,
-                        'source': 'manual',
-                        'auto_fetch_error': error_message
-                    })
-                else:
-                    return Response({
-                        'success': False,
-                        'error': error_message,
-                        'message': 'Please provide a manual transcript as fallback',
-                        'can_paste_manual': True
-                    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-                    
+            video_url = lesson_video_url(lesson)
+            result = fetch_video_data(video_url, language)
+            payload, status_code = store_fetch_result(lesson, result, language, video_url)
         except Exception as e:
             # Exception during fetch
-            if lesson.manual_transcript:
-                return Response({
-                    'success': True,
-                    'message': 'Auto-fetch error, using manual transcript',
-                    'transcript': lesson.manual_transcript,
-                    'source': 'manual',
-                    'auto_fetch_error': str(e)
-                })
-            else:
-                return Response({
-                    'success': False,
-                    'error': f'Error fetching transcript: {str(e)}',
-                    'message': 'Please provide a manual transcript as fallback',
-                    'can_paste_manual': True
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            payload, status_code = fetch_error_response(lesson, e)
+        return Response(payload, status=status_code)
     
     @action(detail=True, methods=['post'])
     def update_manual_transcript(self, request, pk=None):
@@ -548,7 +602,7 @@ class LessonViewSet(viewsets.ModelViewSet):
             'success': True,
             'message': 'Manual transcript updated successfully',
             'manual_transcript': lesson.manual_transcript,
-            'has_auto_transcript': bool(lesson.transcript)
+            'has_auto_transcript': bool(lesson.auto_transcript)
         })
     
     @action(detail=True, methods=['post'])
@@ -559,7 +613,14 @@ class LessonViewSet(viewsets.ModelViewSet):
         POST /api/lessons/{id}/generate_quiz/
         {
             "num_questions": 5 (optional),
-            "difficulty": "medium" (optional)
+            "difficulty": "medium" (optional),
+            "mode": "full" (optional; "full" covers the whole transcript,
+                    "quick" uses a single call on its first part),
+            "stream": true (optional, "quick" mode only; sends each question
+                    as an SSE event once complete),
+            "fresh": true (optional; generate new questions instead of
+                    sampling the transcript's question pool; pooled
+                    quizzes don't count against the AI query limit)
         }
         """
         lesson = self.get_object()
@@ -576,62 +637,68 @@ class LessonViewSet(viewsets.ModelViewSet):
         # Get quiz parameters
         num_questions = request.data.get('num_questions', 5)
         difficulty = request.data.get('difficulty', 'medium')
-        
+        mode = request.data.get('mode', 'full')
+        if mode not in QUIZ_MODES:
+            return Response({
+                'error': f"mode must be one of: {', '.join(QUIZ_MODES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Served from the transcript's pre-generated pool when it has enough
+        # questions; no AI call, so not metered against the user's quota
+        streaming = mode == 'quick' and wants_stream(request)
+        if not streaming and not request.data.get('fresh', False):
+            pooled = sample_questions(lesson, num_questions, difficulty, transcript)
+            if pooled is not None:
+                return Response({
+                    'success': True,
+                    'lesson_id': lesson.id,
+                    'lesson_title': lesson.title,
+                    'quiz': {'questions': pooled},
+                    'source': 'pool',
+                    'transcript_source': 'auto' if lesson.auto_transcript else 'manual'
+                })
+
+        return self._generate_live_quiz(request, lesson, transcript, num_questions, difficulty, mode)
+
+    @ai_metered
+    def _generate_live_quiz(self, request, lesson, transcript, num_questions, difficulty, mode):
+        """generate_quiz with an AI call, metered as one query."""
+        if mode == 'quick' and wants_stream(request):
+            return quiz_sse_response(call_ai_stream(
+                lesson_quiz_prompt(transcript, num_questions, difficulty),
+                max_tokens=1000,
+                endpoint='lesson_generate_quiz'
+            ))
+
         # Call AI service to generate quiz using unified provider (Gemini primary, OpenRouter fallback)
         try:
             import json
 
-            prompt = f"""
-            Based on the following video transcript, generate {num_questions} {difficulty} difficulty quiz questions.
-
-            Transcript:
-            {transcript[:3000]}
-
-            Please generate questions in the following JSON format:
-            {{
-                "questions": [
-                    {{
-                        "question": "Question text here?",
-                        "type": "mcq",
-                        "options": ["Option A", "Option B", "Option C", "Option D"],
-                        "correct_answer": "Option A",
-                        "explanation": "Brief explanation of why this is correct"
-                    }}
-                ]
-            }}
-
-            Ensure the questions are relevant to the transcript content and test understanding of key concepts.
-            """
-
-            # Use shared AI call helper (handles Gemini vs OpenRouter and rate limits)
-            response_text = call_ai(prompt, max_tokens=1000)
-
-            # Normalize and parse JSON
-            response_text = response_text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-
-            quiz_data = json.loads(response_text)
+            quiz_data = build_lesson_quiz(transcript, num_questions, difficulty, mode)
+            if mode == 'full':
+                add_to_pool(lesson, difficulty, quiz_data.get('questions', []), transcript)
 
             return Response({
                 'success': True,
                 'lesson_id': lesson.id,
                 'lesson_title': lesson.title,
                 'quiz': quiz_data,
-                'transcript_source': 'auto' if lesson.transcript else 'manual'
+                'source': 'live',
+                'transcript_source': 'auto' if lesson.auto_transcript else 'manual'
             })
 
-        except json.JSONDecodeError:
+        except json.JSONDecodeError as e:
             return Response({
                 'success': False,
                 'error': 'Failed to parse AI response',
-                'raw_response': response_text
+                'raw_response': e.doc
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except ProviderUnavailableError as e:
+            return Response({
+                'success': False,
+                'error': str(e),
+                'type': type(e).__name__
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({
                 'success': False,
@@ -651,8 +718,6 @@ class LessonViewSet(viewsets.ModelViewSet):
             "is_public": true (optional)
         }
         """
-        from assessments.models import Assessment, Question
-        
         lesson = self.get_object()
         
         title = request.data.get('title')
@@ -666,37 +731,18 @@ class LessonViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Create assessment
-            assessment = Assessment.objects.create(
-                title=title,
-                topic=lesson.title,
-                description=f"Quiz generated from: {lesson.title}",
-                creator=request.user,
+            assessment, questions_count = save_quiz_assessment(
+                lesson, request.user, title, quiz_data,
                 time_limit_minutes=time_limit,
-                is_public=is_public,
-                source_lesson=lesson  # Link to source lesson
+                is_public=is_public
             )
             
-            # Create questions
-            questions = quiz_data.get('questions', [])
-            for idx, q in enumerate(questions):
-                Question.objects.create(
-                    assessment=assessment,
-                    question_text=q.get('question', ''),
-                    question_type=q.get('type', 'mcq'),
-                    options=q.get('options', []),
-                    correct_answer=q.get('correct_answer', ''),
-                    explanation=q.get('explanation', ''),
-                    points=1,
-                    order=idx
-                )
-            
             return Response({
                 'success': True,
                 'message': 'Quiz saved as assessment',
                 'assessment_id': assessment.id,
                 'assessment_title': assessment.title,
-                'questions_count': len(questions)
+                'questions_count': questions_count
             })
             
         except Exception as e:
@@ -711,6 +757,7 @@ class LessonViewSet(viewsets.ModelViewSet):
         Get the transcript for a lesson (auto or manual).
         
         GET /api/lessons/{id}/get_transcript/
+        GET /api/lessons/{id}/get_transcript/?segments=1 (adds timed segments when stored)
         """
         lesson = self.get_object()
         
@@ -724,14 +771,61 @@ class LessonViewSet(viewsets.ModelViewSet):
                 'can_paste_manual': True
             }, status=status.HTTP_404_NOT_FOUND)
         
-        return Response({
+        timed = lesson.timed_segments
+        payload = {
             'success': True,
             'lesson_id': lesson.id,
             'lesson_title': lesson.title,
             'transcript': transcript,
-            'source': 'auto' if lesson.transcript else 'manual',
+            'source': 'auto' if lesson.auto_transcript else 'manual',
             'language': lesson.transcript_language,
-            'fetched_at': lesson.transcript_fetched_at
+            'fetched_at': lesson.transcript_fetched_at,
+            'has_segments': bool(timed)
+        }
+        if request.query_params.get('segments') in ('1', 'true') and timed:
+            payload['segments'] = timed.to_list()
+        return Response(payload)
+    
+    @action(detail=True, methods=['get'])
+    def transcript_range(self, request, pk=None):
+        """
+        Transcript text for a time range, or for a window around a timestamp.
+        
+        GET /api/lessons/{id}/transcript_range/?start=750&end=790
+        GET /api/lessons/{id}/transcript_range/?at=12:40&window=30
+        
+        Times are seconds or m:ss / h:mm:ss; window defaults to
+        TRANSCRIPT_WINDOW_SECONDS either side of "at".
+        """
+        lesson = self.get_object()
+        params = request.query_params
+        try:
+            if 'at' in params:
+                at = parse_timestamp(params['at'])
+                window = parse_timestamp(params['window']) if 'window' in params else window_seconds()
+                start, end = max(0.0, at - window), at + window
+            else:
+                start = parse_timestamp(params.get('start', 0))
+                end = parse_timestamp(params['end']) if 'end' in params else float('inf')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({'error': 'end must not be before start'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = transcript_range(lesson, start, end)
+        if result is None:
+            return Response({
+                'success': False,
+                'message': 'No timed transcript available for this lesson',
+                'has_segments': False
+            }, status=status.HTTP_404_NOT_FOUND)
+        if result['end'] == float('inf'):
+            result['end'] = None
+        
+        return Response({
+            'success': True,
+            'lesson_id': lesson.id,
+            **result
         })
     
     @action(detail=True, methods=['post'])
@@ -798,18 +892,20 @@ class LessonViewSet(viewsets.ModelViewSet):
             })
     
     @action(detail=True, methods=['post'])
+    @ai_metered
     def ai_tutor(self, request, pk=None):
         """
         AI tutor that has access to lesson transcript and user notes.
         
         POST /api/lessons/{id}/ai_tutor/
         {
-            "message": "Can you explain variables in more detail?"
+            "message": "Can you explain variables in more detail?",
+            "session_id": 12 (optional, continue a conversation; omit to start one),
+            "playback_time": "12:40" (optional, seconds or m:ss; focuses on what was said there),
+            "stream": false (optional, stream tokens as text/event-stream)
         }
         """
         from assessments.models import VideoNotes
-        from django.conf import settings
-        import google.generativeai as genai
         
         lesson = self.get_object()
         user_message = request.data.get('message', '')
@@ -819,6 +915,20 @@ class LessonViewSet(viewsets.ModelViewSet):
                 'error': 'Message is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        playback_time = request.data.get('playback_time')
+        if playback_time is not None:
+            try:
+                playback_time = parse_timestamp(playback_time)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session = get_session(request.user, request.data.get('session_id'), lesson)
+        except (TutorSession.DoesNotExist, ValueError):
+            return Response({
+                'error': 'Tutor session not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
         # Get transcript
         transcript = lesson.get_transcript()
         
@@ -830,44 +940,78 @@ class LessonViewSet(viewsets.ModelViewSet):
         except VideoNotes.DoesNotExist:
             pass
         
-        # Build context for AI
+        # Build context for AI: the parts that stay the same between messages
+        # come first, so providers can reuse the cached prompt prefix
         context = f"""
 You are an AI tutor helping a student understand a video lesson.
 
 Lesson: {lesson.title}
 Course: {lesson.course.title}
 
-"""
-        
-        if transcript:
-            context += f"""Video Transcript:
-{transcript[:4000]}
-
 """
         
         if user_notes:
             context += f"""Student's Notes:
 {user_notes}
 
+"""
+
+        history = history_block(session)
+        if history:
+            context += f"""{history}
+
 """
         
-        context += f"""Based on the video content and the student's notes above, please answer this question:
+        # What was said around the student's playback position, when timed
+        # captions are stored; it replaces one of the retrieved excerpts
+        around = playback_context(lesson, playback_time) if playback_time is not None else ''
+        if around:
+            context += f"""Video Transcript (around the student's position):
+{around}
+
+"""
+        
+        if transcript:
+            # Most relevant transcript chunks from the lesson's stored index;
+            # the previous question helps with follow-ups ("explain that again")
+            lesson_index = get_lesson_index(lesson)
+            query = f"{last_student_message(session)} {user_message}".strip()
+            excerpts = "\n\n---\n\n".join(lesson_index.top_chunks(query, 1 if around else 2))
+            context += f"""Video Transcript (relevant excerpts):
+{excerpts}
+
+"""
+        
+        context += f"""Based on the video content, the student's notes and the conversation above, please answer this question:
 
 Student Question: {user_message}
 
 Provide a clear, educational response that references specific parts of the video when relevant."""
         
+        if wants_stream(request):
+            return sse_response(
+                record_stream(session, user_message, call_ai_stream(context, max_tokens=800, endpoint='ai_tutor')),
+                done_payload={'has_transcript': bool(transcript), 'has_notes': bool(user_notes), 'session_id': session.id}
+            )
+
         try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(context)
+            # Unified provider (Gemini primary, OpenRouter fallback)
+            response_text = call_ai(context, max_tokens=800, endpoint='ai_tutor')
+            record_exchange(session, user_message, response_text)
             
             return Response({
                 'success': True,
-                'response': response.text,
+                'response': response_text,
+                'session_id': session.id,
                 'has_transcript': bool(transcript),
                 'has_notes': bool(user_notes)
             })
+        except ProviderUnavailableError as e:
+            return Response({
+                'success': False,
+                'error': str(e),
+                'type': type(e).__name__
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({
                 'success': False,
@@ -875,6 +1019,37 @@ Provide a clear, educational response that references specific parts of the vide
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class CourseBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Progress of course-wide generation batches started by the current user.
+
+    GET  /api/course-batches/?course={id}
+    GET  /api/course-batches/{id}/
+    POST /api/course-batches/{id}/resume/   retry failed lessons / continue an interrupted batch
+    """
+    serializer_class = CourseBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = CourseBatch.objects.filter(creator=self.request.user).select_related('course').prefetch_related('items__lesson')
+        course_id = self.request.query_params.get('course')
+        if course_id:
+            queryset = queryset.filter(course_id=course_id)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        batch = self.get_object()
+        if batch.job_id and batch.job and not batch.job.is_finished:
+            return Response({'error': 'Batch is already queued or running'}, status=status.HTTP_409_CONFLICT)
+
+        batch.items.filter(status=CourseBatchItem.Status.FAILED).update(status=CourseBatchItem.Status.PENDING)
+        job = start_course_batch(batch)
+        payload, status_code = accepted_payload(job)
+        payload['batch'] = CourseBatchSerializer(batch).data
+        return Response(payload, status=status_code)
+
+
 class UserProgressViewSet(viewsets.ModelViewSet):
     """ViewSet for managing user progress."""
     serializer_class = UserProgressSerializer
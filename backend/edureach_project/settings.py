@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     'notes.apps.NotesConfig',
     'payments.apps.PaymentsConfig',
     'study_groups.apps.StudyGroupsConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
@@ -142,6 +143,30 @@ else:
             RuntimeWarning
         )
 
+# Shared cache. Circuit breakers (ai_service.circuit_breaker), single-flight
+# locks (services.singleflight) and AI usage counters (users.metering) must be
+# seen by every worker, so the per-process local-memory default won't do.
+# Redis when REDIS_URL is set, otherwise a database table created by
+# `python manage.py createcachetable` (run by start.sh). The table works under
+# WSGI and ASGI (async views reach it through sync_to_async) but every lookup
+# is a query, a few per AI call, so production should set REDIS_URL.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'edureach',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'edureach_cache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -352,6 +377,123 @@ if not OPENROUTER_API_KEY:
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', None)
 GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-2.5-flash')
 
+# AI response cache: identical prompts (same provider route and max_tokens)
+# are reused for a per-endpoint TTL. AI_CACHE_TTLS overrides the defaults in
+# ai_service.cache.DEFAULT_TTLS, e.g. {'chat': 0} disables caching for chat.
+AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'True') == 'True'
+AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', '512'))
+AI_CACHE_TTLS = {}
+
+# Maximum in-flight requests per AI provider in each worker process, and the
+# pool size used when an endpoint fans out independent AI calls.
+AI_PROVIDER_CONCURRENCY = {
+    'gemini': int(os.environ.get('GEMINI_MAX_CONCURRENCY', '4')),
+    'openrouter': int(os.environ.get('OPENROUTER_MAX_CONCURRENCY', '8')),
+}
+AI_FANOUT_MAX_WORKERS = int(os.environ.get('AI_FANOUT_MAX_WORKERS', '8'))
+
+# AI provider chain (ai_service.providers). Empty: Gemini (if configured) then
+# OpenRouter. AI_PROVIDERS=fake answers every AI call locally with the
+# deterministic fake provider, configured by AI_FAKE_PROVIDER, for offline
+# development and load tests.
+AI_PROVIDERS = [name.strip() for name in os.environ.get('AI_PROVIDERS', '').split(',') if name.strip()]
+AI_FAKE_PROVIDER = {
+    'latency': float(os.environ.get('AI_FAKE_LATENCY', '0.2')),
+    'error_rate': float(os.environ.get('AI_FAKE_ERROR_RATE', '0')),
+}
+
+# AI provider circuit breakers (ai_service.circuit_breaker). Quota errors open a
+# provider's circuit at once; 5xx/connection errors after the threshold within
+# the window. An open provider is skipped until its cooldown has passed.
+AI_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('AI_BREAKER_FAILURE_THRESHOLD', '3'))
+AI_BREAKER_FAILURE_WINDOW = int(os.environ.get('AI_BREAKER_FAILURE_WINDOW', '60'))
+AI_BREAKER_COOLDOWNS = {
+    'quota': int(os.environ.get('AI_BREAKER_QUOTA_COOLDOWN', '300')),
+    'server': int(os.environ.get('AI_BREAKER_SERVER_COOLDOWN', '30')),
+}
+
+# Outbound HTTP (services.http_client): one keep-alive session per worker with
+# a connection pool per host. Size pools at least to the worker's thread count.
+HTTP_DEFAULT_POOL_SIZE = int(os.environ.get('HTTP_DEFAULT_POOL_SIZE', '10'))
+HTTP_POOL_SIZES = {
+    'openrouter.ai': int(os.environ.get('OPENROUTER_POOL_SIZE', '20')),
+    'www.youtube.com': int(os.environ.get('YOUTUBE_POOL_SIZE', '10')),
+}
+HTTP_DEFAULT_TIMEOUT = (5, 60)  # (connect, read) seconds when a call sets none
+# Threads per worker running the independent steps of YouTube extractions
+# (oEmbed metadata and captions alongside the watch page fetch)
+YOUTUBE_EXTRACTION_WORKERS = int(os.environ.get('YOUTUBE_EXTRACTION_WORKERS', '8'))
+# Seconds of transcript either side of the student's playback position that
+# ai_tutor and chat send as context when given a playback_time
+TRANSCRIPT_WINDOW_SECONDS = float(os.environ.get('TRANSCRIPT_WINDOW_SECONDS', '30'))
+# Failed transcript extractions are remembered per video and language, so
+# repeat requests skip the slow fallback chain: for TRANSCRIPT_FAILURE_TTL
+# seconds when no captions were found, TRANSCRIPT_FAILURE_ERROR_TTL when an
+# extraction method errored (possibly transient)
+TRANSCRIPT_FAILURE_TTL = int(os.environ.get('TRANSCRIPT_FAILURE_TTL', str(6 * 60 * 60)))
+TRANSCRIPT_FAILURE_ERROR_TTL = int(os.environ.get('TRANSCRIPT_FAILURE_ERROR_TTL', str(10 * 60)))
+
+# Serve the AI, YouTube extraction and lesson fetch_transcript endpoints with
+# native async views. Enable only when running under ASGI (start.sh
+# SERVER_MODE=asgi); the async views share one httpx pool per worker and run
+# blocking work (YouTube extraction, Gemini SDK) on ASYNC_BLOCKING_THREADS threads.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+HTTP_ASYNC_MAX_CONNECTIONS = int(os.environ.get('HTTP_ASYNC_MAX_CONNECTIONS', '200'))
+ASYNC_BLOCKING_THREADS = int(os.environ.get('ASYNC_BLOCKING_THREADS', '32'))
+
+# AI usage metering (users.metering): AI endpoints enforce the monthly
+# ai_queries limit of the user's tier (0 on the free tier, so free users get
+# 429 from every metered AI endpoint). With REDIS_URL set, counts live in the
+# shared cache and are flushed to MonthlyUsage every AI_USAGE_FLUSH_INTERVAL
+# seconds per worker. Without it each AI request is admitted by a conditional
+# UPDATE on MonthlyUsage, one write per request with no batching.
+AI_USAGE_LIMITS_ENABLED = os.environ.get('AI_USAGE_LIMITS_ENABLED', 'True') == 'True'
+AI_USAGE_FLUSH_INTERVAL = int(os.environ.get('AI_USAGE_FLUSH_INTERVAL', '10'))
+
+# Transcript summaries (ai_service.summaries) are stored by content hash, so
+# summarizing an edited transcript only re-summarizes the chunks that changed.
+AI_SUMMARY_CACHE_ENABLED = os.environ.get('AI_SUMMARY_CACHE_ENABLED', 'True') == 'True'
+AI_SUMMARY_CACHE_RETENTION_DAYS = int(os.environ.get('AI_SUMMARY_CACHE_RETENTION_DAYS', '90'))
+
+# AI call telemetry (ai_service.telemetry): per-provider latency, token and
+# fallback counters served at /api/ai/metrics/prometheus/ (admins, or a
+# scraper sending `Authorization: Bearer $METRICS_TOKEN`). Samples are written
+# to AICallSample for `manage.py ai_latency_report`.
+AI_TELEMETRY_ENABLED = os.environ.get('AI_TELEMETRY_ENABLED', 'True') == 'True'
+AI_TELEMETRY_FLUSH_INTERVAL = int(os.environ.get('AI_TELEMETRY_FLUSH_INTERVAL', '10'))
+AI_TELEMETRY_RETENTION_DAYS = int(os.environ.get('AI_TELEMETRY_RETENTION_DAYS', '14'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Tutor sessions (ai_service.tutor_sessions): ai_tutor/chat prompts carry a
+# running summary plus the last TUTOR_SESSION_RECENT_TURNS turns; older turns
+# are folded into the summary by a background job.
+TUTOR_SESSION_RECENT_TURNS = int(os.environ.get('TUTOR_SESSION_RECENT_TURNS', '6'))
+TUTOR_SESSION_FOLD_BATCH = int(os.environ.get('TUTOR_SESSION_FOLD_BATCH', '4'))
+TUTOR_SESSION_RETENTION_DAYS = int(os.environ.get('TUTOR_SESSION_RETENTION_DAYS', '30'))
+
+# Lesson question pools (courses.question_pool): QUESTION_POOL_SIZE questions
+# per difficulty are generated in the background when a transcript is stored,
+# and lesson quizzes are sampled from them without using the AI query quota.
+# Lessons with the same transcript (one video) share a pool. A question is
+# retired after QUESTION_POOL_MAX_SERVES serves and the pool topped up when it
+# runs low.
+QUESTION_POOL_ENABLED = os.environ.get('QUESTION_POOL_ENABLED', 'True') == 'True'
+QUESTION_POOL_SIZE = int(os.environ.get('QUESTION_POOL_SIZE', '24'))
+QUESTION_POOL_MAX_SERVES = int(os.environ.get('QUESTION_POOL_MAX_SERVES', '50'))
+QUESTION_POOL_DIFFICULTIES = [
+    name.strip() for name in os.environ.get('QUESTION_POOL_DIFFICULTIES', 'easy,medium,hard').split(',') if name.strip()
+]
+
+# Background jobs (jobs app): DB-backed queue run by `manage.py run_jobs`.
+# Failed attempts are retried after JOBS_RETRY_BACKOFF seconds, doubling up to
+# JOBS_RETRY_BACKOFF_MAX; finished jobs are kept for JOBS_RESULT_RETENTION.
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', '3'))
+JOBS_RETRY_BACKOFF = int(os.environ.get('JOBS_RETRY_BACKOFF', '10'))
+JOBS_RETRY_BACKOFF_MAX = int(os.environ.get('JOBS_RETRY_BACKOFF_MAX', '600'))
+JOBS_RESULT_RETENTION = int(os.environ.get('JOBS_RESULT_RETENTION', str(24 * 60 * 60)))
+JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', '300'))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', '1.0'))
+
 # Security settings for production
 if not DEBUG:
     # Railway handles SSL, don't redirect
@@ -18,6 +18,7 @@ urlpatterns = [
     path('api/study-groups/', include('study_groups.urls')),
     path('api/', include('ai_service.urls')),
     path('api/', include('notes.urls')),
+    path('api/', include('jobs.urls')),
     path('api/payments/', include('payments.urls')),
     path('api/', include('api.urls')),  # YouTube and other API endpoints
     path('api/youtube/extract-transcript/', extract_transcript),
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'user', 'attempts', 'max_attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['kind', 'user__username', 'error']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'locked_by', 'locked_at']
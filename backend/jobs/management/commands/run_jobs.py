@@ -0,0 +1,83 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import claim_jobs, heartbeat, purge_expired, requeue_stale, run_job
+from jobs.registry import registered_kinds
+
+MAINTENANCE_INTERVAL = 60  # seconds between stale-lock recovery / purge passes
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs (quiz generation, summarization, transcript "
+        "fetching, PDF exports) with a pool of worker threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=int(os.environ.get('JOBS_CONCURRENCY', '4')),
+            help='Jobs run at once by this worker (default: JOBS_CONCURRENCY or 4)',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=getattr(settings, 'JOBS_POLL_INTERVAL', 1.0),
+            help='Seconds to wait for new jobs when the queue is empty (default: JOBS_POLL_INTERVAL)',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no jobs are due instead of polling')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping after running jobs finish...')
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(
+            f"Worker {worker_id}: concurrency={concurrency}, kinds={', '.join(registered_kinds())}"
+        )
+
+        def execute(job):
+            try:
+                status = run_job(job, worker_id)
+                self.stdout.write(f"Job {job.pk} ({job.kind}) attempt {job.attempts}: {status}")
+            finally:
+                # Each pool thread has its own DB connection; don't leak them
+                connections.close_all()
+
+        running = set()
+        last_maintenance = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+            while not stopping.is_set():
+                if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                    requeue_stale()
+                    purge_expired()
+                    last_maintenance = time.monotonic()
+
+                running = {future for future in running if not future.done()}
+                jobs = claim_jobs(worker_id, concurrency - len(running))
+                for job in jobs:
+                    running.add(pool.submit(execute, job))
+
+                if options['once'] and not jobs and not running:
+                    break
+                if not jobs:
+                    heartbeat(worker_id)
+                    # Wake early when a slot frees up
+                    if running:
+                        wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    else:
+                        stopping.wait(poll_interval)
@@ -0,0 +1,198 @@
+"""
+Database-backed job queue (no broker).
+
+Views enqueue a Job and answer 202 with its id; the ``run_jobs`` worker
+claims queued jobs, runs their registered handler and stores the result for
+the poll/result endpoints.
+
+- Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+  supports it, plus a conditional status update, so concurrent workers never
+  run the same job (SQLite has no row locks; the update alone guards it there).
+- A failed attempt is retried with exponential backoff until max_attempts.
+- Workers heartbeat their locks; jobs held by a worker that died are
+  requeued once the lock is older than JOBS_LOCK_TIMEOUT.
+- Finished jobs (and their result files) are purged after JOBS_RESULT_RETENTION.
+"""
+
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Job
+from .registry import PermanentJobError, get_handler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 10  # seconds before the first retry, doubled per attempt
+DEFAULT_RETRY_BACKOFF_MAX = 600
+DEFAULT_RESULT_RETENTION = 24 * 60 * 60
+DEFAULT_LOCK_TIMEOUT = 5 * 60  # workers refresh locks every poll
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def wants_background(request) -> bool:
+    """True when the client asked for a job via ``"background": true`` or ``?background=1``."""
+    flag = request.data.get('background') if hasattr(request, 'data') else None
+    if flag is None:
+        flag = request.query_params.get('background') if hasattr(request, 'query_params') else None
+    if isinstance(flag, str):
+        return flag.lower() in ('1', 'true', 'yes')
+    return bool(flag)
+
+
+def enqueue(kind: str, payload: dict = None, user=None, max_attempts: int = None, delay: float = 0) -> Job:
+    """Queue a job for the registered ``kind`` handler."""
+    get_handler(kind)  # fail fast on typos
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        user=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def accepted_payload(job: Job):
+    """The 202 response for an enqueued job: ``(payload, status_code)``."""
+    return {
+        'success': True,
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'status_url': reverse('job-detail', args=[job.id]),
+        'result_url': reverse('job-result', args=[job.id]),
+    }, 202
+
+
+def _expires_at(finished_at):
+    return finished_at + timedelta(seconds=_setting('JOBS_RESULT_RETENTION', DEFAULT_RESULT_RETENTION))
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying after ``attempts`` failed attempts."""
+    base = _setting('JOBS_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF)
+    cap = _setting('JOBS_RETRY_BACKOFF_MAX', DEFAULT_RETRY_BACKOFF_MAX)
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    # Jitter spreads retries of jobs that failed together (e.g. a provider outage)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_jobs(worker_id: str, limit: int):
+    """Mark up to ``limit`` due jobs as running for this worker and return them."""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    queryset = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    claimed = []
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        for pk in queryset.values_list('pk', flat=True)[:limit]:
+            updated = Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                started_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'id'))
+
+
+def _finish(job: Job, worker_id: str, **fields) -> bool:
+    # Only the worker still holding the job may record its outcome
+    return bool(Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=worker_id).update(
+        locked_by='', locked_at=None, **fields
+    ))
+
+
+def run_job(job: Job, worker_id: str) -> str:
+    """Run one claimed job and record its outcome; returns the new status."""
+    try:
+        handler = get_handler(job.kind)
+        payload, status_code = handler(job)
+    except Exception as exc:
+        permanent = isinstance(exc, PermanentJobError) or job.is_last_attempt
+        error = f'{type(exc).__name__}: {exc}'
+        if permanent:
+            logger.error(f"Job {job.pk} ({job.kind}) failed after {job.attempts} attempt(s): {error}", exc_info=True)
+            finished_at = timezone.now()
+            _finish(
+                job, worker_id,
+                status=Job.Status.FAILED,
+                error=error,
+                result={'error': str(exc), 'type': type(exc).__name__},
+                result_status=500,
+                finished_at=finished_at,
+                expires_at=_expires_at(finished_at),
+            )
+            return Job.Status.FAILED
+        delay = retry_delay(job.attempts)
+        logger.warning(f"Job {job.pk} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+        _finish(job, worker_id, status=Job.Status.QUEUED, error=error, run_after=timezone.now() + timedelta(seconds=delay))
+        return Job.Status.QUEUED
+
+    finished_at = timezone.now()
+    _finish(
+        job, worker_id,
+        status=Job.Status.SUCCEEDED,
+        result=payload,
+        result_status=status_code,
+        result_file=job.result_file.name or '',
+        error='',
+        finished_at=finished_at,
+        expires_at=_expires_at(finished_at),
+    )
+    return Job.Status.SUCCEEDED
+
+
+def heartbeat(worker_id: str) -> int:
+    """Refresh the lock on every job this worker is running."""
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_by=worker_id).update(locked_at=timezone.now())
+
+
+def requeue_stale() -> int:
+    """Release jobs whose worker stopped heartbeating (crashed or was killed)."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=_setting('JOBS_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT))
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED,
+        locked_by='',
+        locked_at=None,
+        error='Worker lost while running the job',
+        result={'error': 'Worker lost while running the job', 'type': 'WorkerLost'},
+        result_status=500,
+        finished_at=now,
+        expires_at=_expires_at(now),
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, locked_by='', locked_at=None, run_after=now)
+    if failed or requeued:
+        logger.warning(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
+    return failed + requeued
+
+
+def purge_expired() -> int:
+    """Delete finished jobs past their retention, with their result files."""
+    expired = Job.objects.filter(expires_at__lt=timezone.now())
+    for job in expired.exclude(result_file=''):
+        job.result_file.delete(save=False)
+    deleted, _ = expired.delete()
+    return deleted
+
+
+def queue_stats() -> dict:
+    """Job counts by status."""
+    counts = dict(Job.objects.values_list('status').annotate(n=Count('id')).order_by())
+    return {choice: counts.get(choice, 0) for choice in Job.Status.values}
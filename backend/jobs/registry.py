@@ -0,0 +1,41 @@
+"""
+Job handler registry.
+
+Apps register handlers in their ``tasks.py`` (autodiscovered by JobsConfig)::
+
+    @register('generate_quiz')
+    def generate_quiz(job):
+        ...
+        return payload, status_code
+
+A handler receives the Job and returns ``(payload, status_code)``, the same
+shape as the view helpers it wraps; the result endpoint replays it. Raising
+retries the job with backoff until ``max_attempts``; raise PermanentJobError
+for failures a retry cannot fix.
+"""
+
+_handlers = {}
+
+
+class PermanentJobError(Exception):
+    """Fails the job without further retries."""
+
+
+def register(kind: str):
+    def decorator(func):
+        if kind in _handlers and _handlers[kind] is not func:
+            raise ValueError(f'Job handler "{kind}" is already registered')
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind: str):
+    try:
+        return _handlers[kind]
+    except KeyError:
+        raise PermanentJobError(f'No handler registered for job kind "{kind}"')
+
+
+def registered_kinds():
+    return sorted(_handlers)
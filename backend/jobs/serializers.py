@@ -0,0 +1,19 @@
+from django.urls import reverse
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for polling a job's status."""
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'attempts', 'max_attempts', 'error',
+            'run_after', 'created_at', 'started_at', 'finished_at', 'expires_at', 'result_url'
+        ]
+        read_only_fields = fields
+
+    def get_result_url(self, obj):
+        return reverse('job-result', args=[obj.id])
@@ -0,0 +1,46 @@
+import os
+
+from django.http import FileResponse
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Poll background jobs started by the current user.
+
+    GET /api/jobs/                list recent jobs (?status=queued|running|succeeded|failed)
+    GET /api/jobs/{id}/           status
+    GET /api/jobs/{id}/result/    the finished job's response
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Return jobs for the current user only."""
+        queryset = Job.objects.filter(user=self.request.user)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """Replay the response the endpoint would have returned; 202 while still pending."""
+        job = self.get_object()
+        if not job.is_finished:
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        if job.result_file:
+            filename = (job.result or {}).get('filename') or os.path.basename(job.result_file.name)
+            return FileResponse(
+                job.result_file.open('rb'),
+                as_attachment=True,
+                filename=filename,
+                content_type=(job.result or {}).get('content_type'),
+            )
+        return Response(job.result, status=job.result_status or status.HTTP_200_OK)
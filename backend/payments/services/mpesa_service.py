@@ -3,9 +3,10 @@ import logging
 import os
 from typing import Any, Dict
 
-import requests
 from django.utils import timezone
 
+from services.http_client import get_session
+
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +42,7 @@ class MPesaService:
 
     def _get_access_token(self) -> str:
         token_url = f'{self.base_url}/oauth/v1/generate?grant_type=client_credentials'
-        response = requests.get(
+        response = get_session().get(
             token_url,
             auth=(self.consumer_key, self.consumer_secret),
             timeout=10,
@@ -83,7 +84,7 @@ class MPesaService:
         }
 
         url = f'{self.base_url}/mpesa/stkpush/v1/processrequest'
-        response = requests.post(
+        response = get_session().post(
             url,
             json=payload,
             headers={'Authorization': f'Bearer {token}'},
@@ -0,0 +1,111 @@
+"""
+Minimal async counterpart of DRF's ``@api_view`` for ASGI views.
+
+DRF views are synchronous, so the async views are plain Django coroutines.
+``async_api_view`` gives them the parts of the DRF stack they rely on:
+JWT authentication, the user rate throttle, a parsed JSON body as
+``request.data`` and JSON error responses shaped like DRF's.
+
+``run_blocking`` runs blocking, database-free work (YouTube extraction,
+SDK calls) on a dedicated pool of settings.ASYNC_BLOCKING_THREADS threads.
+That work still uses the shared cache, which is a database table when
+REDIS_URL isn't set, so connections it opens are closed after each call.
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+DEFAULT_BLOCKING_THREADS = 32
+
+_executor_lock = threading.Lock()
+_executor = None
+
+
+def _blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(getattr(settings, 'ASYNC_BLOCKING_THREADS', DEFAULT_BLOCKING_THREADS)),
+                    thread_name_prefix='async-blocking',
+                )
+    return _executor
+
+
+def _closing_connections(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # The database cache backend connects from this thread; don't keep one per pool thread
+        connections.close_all()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await ``func(*args, **kwargs)`` run on the blocking-work pool (no ORM access there)."""
+    loop = asyncio.get_running_loop()
+    # Like asyncio.to_thread, carry context variables (e.g. the telemetry call) into the thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_blocking_executor(), partial(context.run, _closing_connections, func, *args, **kwargs))
+
+
+def _authenticate(request):
+    """``(user, None)`` for a valid bearer token, ``(None, detail)`` otherwise."""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed as exc:
+        return None, exc.detail
+    if result is None:
+        return None, 'Authentication credentials were not provided.'
+    return result[0], None
+
+
+def async_api_view(methods):
+    """Wrap an authenticated async view that accepts the given HTTP ``methods``."""
+    allowed = [method.upper() for method in methods]
+
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+            # User lookup touches the database
+            user, detail = await sync_to_async(_authenticate)(request)
+            if user is None:
+                return JsonResponse(detail if isinstance(detail, dict) else {'detail': detail}, status=401)
+            request.user = user
+
+            # The throttle history lives in the shared cache, which may be a database table
+            throttle = UserRateThrottle()
+            if not await sync_to_async(throttle.allow_request)(request, None):
+                wait = throttle.wait()
+                return JsonResponse(
+                    {'detail': f'Request was throttled. Expected available in {int(wait or 0)} seconds.'},
+                    status=429,
+                )
+
+            try:
+                request.data = json.loads(request.body or b'{}') if request.method != 'GET' else {}
+            except ValueError as exc:
+                return JsonResponse({'detail': f'JSON parse error - {exc}'}, status=400)
+            request.query_params = request.GET
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,41 @@
+"""
+Shared async HTTP client for ASGI views.
+
+The async counterpart of ``services.http_client``: one ``httpx.AsyncClient``
+per event loop keeps connections alive between calls, so a single worker can
+have hundreds of outbound requests waiting at once without a thread each.
+
+The pool is capped at settings.HTTP_ASYNC_MAX_CONNECTIONS connections in
+total; timeouts follow settings.HTTP_DEFAULT_TIMEOUT like the sync session.
+"""
+
+import asyncio
+import weakref
+
+import httpx
+from django.conf import settings
+
+from .http_client import DEFAULT_TIMEOUT
+
+DEFAULT_MAX_CONNECTIONS = 200
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def _build_client() -> httpx.AsyncClient:
+    connect, read = getattr(settings, 'HTTP_DEFAULT_TIMEOUT', DEFAULT_TIMEOUT)
+    max_connections = int(getattr(settings, 'HTTP_ASYNC_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS))
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[loop] = client
+    return client
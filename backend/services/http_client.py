@@ -0,0 +1,137 @@
+"""
+Shared keep-alive HTTP session for outbound calls.
+
+One ``requests.Session`` per process keeps TCP/TLS connections open between
+calls to OpenRouter, YouTube and M-Pesa instead of paying DNS, TCP and TLS
+setup on every request. urllib3 connection pools are thread-safe, so the
+session is shared by all request threads of a worker.
+
+Pool sizes are configured per host with settings.HTTP_POOL_SIZES; hosts not
+listed there share a default pool of settings.HTTP_DEFAULT_POOL_SIZE.
+"""
+
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = 10
+# (connect, read) seconds, used when a caller passes no timeout
+DEFAULT_TIMEOUT = (5, 60)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+# TCP (and TLS) connects per "host:port", counted by the connection classes below
+_connects_lock = threading.Lock()
+_connects = {}
+
+
+def _count_connect(host, port):
+    key = f'{host}:{port}'
+    with _connects_lock:
+        _connects[key] = _connects.get(key, 0) + 1
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _count_connect(self.host, self.port)
+        return super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _count_connect(self.host, self.port)
+        return super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools record every new TCP/TLS connect."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    """Session that applies a default timeout to every request."""
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = getattr(settings, 'HTTP_DEFAULT_TIMEOUT', DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session() -> PooledSession:
+    session = PooledSession()
+    default_size = getattr(settings, 'HTTP_DEFAULT_POOL_SIZE', DEFAULT_POOL_SIZE)
+    for scheme in ('https://', 'http://'):
+        session.mount(scheme, PooledAdapter(pool_connections=default_size, pool_maxsize=default_size))
+    for host, size in getattr(settings, 'HTTP_POOL_SIZES', {}).items():
+        # Longest-prefix match in Session.get_adapter routes the host to its own pool
+        session.mount(f'https://{host}', PooledAdapter(pool_connections=1, pool_maxsize=size))
+    return session
+
+
+def get_session() -> PooledSession:
+    """The process-wide pooled session (rebuilt after a fork)."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def connection_stats() -> list:
+    """
+    Per-host connection reuse for this process.
+
+    ``connects`` counts TCP/TLS handshakes and ``requests`` the requests sent;
+    a reuse ratio near 1.0 means handshakes are being amortized.
+    """
+    if _session is None or _session_pid != os.getpid():
+        return []
+
+    with _connects_lock:
+        connects = dict(_connects)
+
+    stats = []
+    seen = set()
+    for adapter in _session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_requests = pool.num_requests
+            num_connects = connects.get(f'{pool.host}:{pool.port}', 0)
+            stats.append({
+                'host': f'{pool.scheme}://{pool.host}:{pool.port}',
+                'pool_maxsize': pool.pool.maxsize if pool.pool is not None else None,
+                'connects': num_connects,
+                'requests': num_requests,
+                'reuse_ratio': round(max(0.0, 1 - num_connects / num_requests), 4) if num_requests else 0.0,
+            })
+    return stats
@@ -0,0 +1,48 @@
+"""
+Per-process background flushers.
+
+Hot paths buffer writes in memory (AI usage counts, call telemetry) and a
+daemon thread hands them to the database every few seconds, plus once more
+at interpreter exit. The thread is started on first use, so forked server
+workers each get their own.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    """Call ``func`` every ``interval()`` seconds on a daemon thread once started."""
+
+    def __init__(self, name: str, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.func)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval())
+            try:
+                self.func()
+            except Exception:
+                logger.exception("%s flush failed", self.name)
+            finally:
+                # The flusher thread has its own DB connection; don't hold it between runs
+                connection.close()
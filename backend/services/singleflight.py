@@ -0,0 +1,226 @@
+"""
+Single-flight coalescing of identical in-flight work.
+
+When many requests need the same expensive result at once (a class opening
+the same lesson), only one caller computes it and the rest wait for that
+result instead of repeating the YouTube scrape or AI call.
+
+Coalescing happens at two levels:
+
+- Within a process, callers of ``SingleFlight.do`` with the same key wait
+  on the leader's in-flight call.
+- Across processes, the leader holds a lock in the shared Django cache
+  (settings.CACHES: Redis, or a database table) with ``cache.add``; leaders
+  in other workers flag that they are waiting and poll for the result, which
+  the leader publishes there for a short time only when someone waits.
+
+``SingleFlight.ado`` is the coroutine counterpart for async views; it shares
+the cross-process lock and result keys with ``do`` and uses the cache's
+async API, since the database cache can't be called on the event loop.
+
+Waiting is bounded by ``timeout``. A caller that times out, or whose
+remote leader finished without publishing a result (it failed), computes
+the value itself, so a stuck or crashed leader never blocks requests.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import weakref
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60
+# How long a published result stays available to waiters in other processes
+DEFAULT_RESULT_TTL = 30
+
+_MISSING = object()
+
+
+class _LeaderCancelled(Exception):
+    """The async leader was cancelled (client went away); waiters compute instead."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key within ``namespace``."""
+
+    def __init__(self, namespace: str, timeout: float = DEFAULT_TIMEOUT, result_ttl: int = DEFAULT_RESULT_TTL):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = weakref.WeakKeyDictionary()
+        self._stats = {'leader': 0, 'coalesced_local': 0, 'coalesced_remote': 0, 'wait_timeout': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def do(self, key: str, func):
+        """Return ``func()``, sharing one execution among concurrent callers of ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                self._count('coalesced_local')
+                if call.error is not None:
+                    raise call.error
+                return call.value
+            self._count('wait_timeout')
+            logger.warning("Single-flight wait for %s:%s timed out; computing locally", self.namespace, key)
+            return func()
+
+        try:
+            call.value = self._run_shared(key, func)
+            return call.value
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _keys(self, key: str):
+        prefix = f'singleflight:{self.namespace}:{key}'
+        return f'{prefix}:lock', f'{prefix}:result', f'{prefix}:waiting'
+
+    def _run_shared(self, key: str, func):
+        lock_key, result_key, waiting_key = self._keys(key)
+
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, timeout=int(self.timeout) + 1):
+            cache.add(waiting_key, True, timeout=int(self.timeout) + 1)
+            value = self._wait_remote(lock_key, result_key)
+            if value is not _MISSING:
+                self._count('coalesced_remote')
+                return value
+            # Remote leader failed or is too slow; try to take over the lock
+            cache.add(lock_key, token, timeout=int(self.timeout) + 1)
+
+        self._count('leader')
+        succeeded = False
+        try:
+            value = func()
+            succeeded = True
+            return value
+        finally:
+            current = cache.get_many([lock_key, waiting_key])
+            # Only publish when another worker is waiting; each write is a query on the database cache
+            if succeeded and current.get(waiting_key):
+                cache.set(result_key, value, self.result_ttl)
+            if current.get(lock_key) == token:
+                cache.delete_many([lock_key, waiting_key])
+
+    async def ado(self, key: str, func):
+        """Await ``func()`` (a coroutine function), sharing one execution per ``key``."""
+        calls = self._async_calls.setdefault(asyncio.get_running_loop(), {})
+        future = calls.get(key)
+        if future is not None:
+            try:
+                value = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except _LeaderCancelled:
+                return await func()
+            except asyncio.TimeoutError:
+                self._count('wait_timeout')
+                logger.warning("Single-flight wait for %s:%s timed out; computing locally", self.namespace, key)
+                return await func()
+            self._count('coalesced_local')
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        calls[key] = future
+        try:
+            value = await self._arun_shared(key, func)
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            calls.pop(key, None)
+
+    async def _arun_shared(self, key: str, func):
+        # Async cache calls: the shared cache may be a database table
+        lock_key, result_key, waiting_key = self._keys(key)
+
+        token = uuid.uuid4().hex
+        if not await cache.aadd(lock_key, token, timeout=int(self.timeout) + 1):
+            await cache.aadd(waiting_key, True, timeout=int(self.timeout) + 1)
+            value = await self._await_remote(lock_key, result_key)
+            if value is not _MISSING:
+                self._count('coalesced_remote')
+                return value
+            await cache.aadd(lock_key, token, timeout=int(self.timeout) + 1)
+
+        self._count('leader')
+        succeeded = False
+        try:
+            value = await func()
+            succeeded = True
+            return value
+        finally:
+            current = await cache.aget_many([lock_key, waiting_key])
+            if succeeded and current.get(waiting_key):
+                await cache.aset(result_key, value, self.result_ttl)
+            if current.get(lock_key) == token:
+                await cache.adelete_many([lock_key, waiting_key])
+
+    async def _await_remote(self, lock_key: str, result_key: str):
+        deadline = time.monotonic() + self.timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            value = await cache.aget(result_key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if await cache.aget(lock_key) is None:
+                return await cache.aget(result_key, _MISSING)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        self._count('wait_timeout')
+        return _MISSING
+
+    def _wait_remote(self, lock_key: str, result_key: str):
+        """Poll for another process's result until its lock goes away or we time out."""
+        deadline = time.monotonic() + self.timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            value = cache.get(result_key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if cache.get(lock_key) is None:
+                # Lock released: pick up a result published in the meantime, if any
+                return cache.get(result_key, _MISSING)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        self._count('wait_timeout')
+        return _MISSING
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls) + sum(len(calls) for calls in list(self._async_calls.values()))
+            return {**self._stats, 'in_flight': in_flight}
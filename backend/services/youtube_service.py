@@ -8,12 +8,99 @@ import requests
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from django.conf import settings
+
+from services.http_client import get_session
+from services.singleflight import SingleFlight
+
+# Concurrent extractions of the same video and language share one set of YouTube requests
+transcript_flight = SingleFlight('youtube', timeout=120)
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def _get_extraction_pool() -> ThreadPoolExecutor:
+    """Threads for the independent steps of an extraction (oEmbed, captions)."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'YOUTUBE_EXTRACTION_WORKERS', 8),
+                    thread_name_prefix='youtube',
+                )
+    return _extraction_pool
+
+
+class WatchPage:
+    """
+    A youtube.com/watch page parsed once for everything the service reads
+    from it: caption tracks, chapters, duration and transcript panel text.
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self.caption_tracks = self._parse_caption_tracks(html)
+        self.chapters = [
+            {'timestamp': timestamp, 'title': title}
+            for timestamp, title in re.findall(
+                r'"macroMarkersListItemRenderer".*?"timeDescription":\{"simpleText":"([^"]+)".*?"title":\{"simpleText":"([^"]+)"',
+                html
+            )
+        ]
+        match = re.search(r'"lengthSeconds":"(\d+)"', html)
+        self.duration = int(match.group(1)) if match else 0
+
+    @staticmethod
+    def _parse_caption_tracks(html: str) -> List[Dict]:
+        match = re.search(r'"captionTracks":(\[)', html)
+        if not match:
+            return []
+        try:
+            tracks, _ = json.JSONDecoder().raw_decode(html, match.start(1))
+        except ValueError:
+            # Fall back to the language names alone
+            captions = re.search(r'"captionTracks":\[(.*?)\]', html)
+            languages = re.findall(r'"languageCode":"([^"]+)".*?"name":\{"simpleText":"([^"]+)"', captions.group(1)) if captions else []
+            return [
+                {'language_code': code, 'language_name': name, 'auto_generated': 'auto-generated' in name.lower(), 'base_url': ''}
+                for code, name in languages
+            ]
+        parsed = []
+        for track in tracks:
+            name = track.get('name', {})
+            name = name.get('simpleText') or ''.join(run.get('text', '') for run in name.get('runs', []))
+            parsed.append({
+                'language_code': track.get('languageCode', ''),
+                'language_name': name,
+                'auto_generated': track.get('kind') == 'asr' or 'auto-generated' in name.lower(),
+                'base_url': track.get('baseUrl', ''),
+            })
+        return parsed
+
+    @property
+    def available_languages(self) -> List[Dict]:
+        return [
+            {key: track[key] for key in ('language_code', 'language_name', 'auto_generated')}
+            for track in self.caption_tracks
+        ]
+
+    def caption_url(self, language_code: str) -> str:
+        """The caption track URL for ``language_code``, preferring manual captions; '' if none."""
+        tracks = [track for track in self.caption_tracks if track['base_url'] and track['language_code'] == language_code]
+        tracks.sort(key=lambda track: track['auto_generated'])
+        return tracks[0]['base_url'] if tracks else ''
+
+
 class YouTubeTranscriptService:
     """
     Service to extract transcripts and metadata from YouTube videos
@@ -25,6 +112,9 @@ class YouTubeTranscriptService:
         self.video_info_base = "https://www.youtube.com/watch"
         # Debug info: store last HTTP response captured when contacting YouTube
         self.last_response_info = None
+        # Watch pages fetched by this service instance (one per extraction)
+        self._watch_pages = {}
+        self._watch_page_lock = threading.Lock()
         # Headers to mimic a real browser and bypass bot detection
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -42,7 +132,7 @@ class YouTubeTranscriptService:
         """
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, headers=self.headers, timeout=timeout)
+                response = get_session().get(url, headers=self.headers, timeout=timeout)
                 # Check for successful response
                 if response.status_code == 200:
                     return response
@@ -115,40 +205,39 @@ class YouTubeTranscriptService:
             'extracted_at': datetime.now().isoformat()
         }
     
+    def get_watch_page(self, video_id: str) -> Optional[WatchPage]:
+        """
+        The video's watch page, parsed; None if it can't be fetched.
+
+        Fetched at most once per service instance, however many steps of an
+        extraction read it (concurrent callers wait for the first fetch).
+        """
+        with self._watch_page_lock:
+            if video_id in self._watch_pages:
+                return self._watch_pages[video_id]
+            page = None
+            try:
+                video_url = f"https://www.youtube.com/watch?v={video_id}"
+                response = self._make_request(video_url)
+                # record response for debugging
+                if response:
+                    self._record_response(response, video_url)
+                if response and response.status_code == 200:
+                    page = WatchPage(response.text)
+            except Exception as e:
+                print(f"Error fetching watch page: {e}")
+            self._watch_pages[video_id] = page
+            return page
+
     def get_available_transcripts(self, video_id: str) -> List[Dict]:
         """
         Get list of available transcript languages for a video
         """
         try:
-            # Method 1: Try to get transcript list from video page
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self._make_request(video_url)
-            # record response for debugging
-            if response:
-                self._record_response(response, video_url)
-
-            if response and response.status_code == 200:
-                # Look for transcript data in the page
-                content = response.text
-                
-                # Extract captions data from the page
-                captions_pattern = r'"captions":.*?"playerCaptionsTracklistRenderer":\{"captionTracks":\[(.*?)\]'
-                match = re.search(captions_pattern, content)
-                
-                if match:
-                    captions_data = match.group(1)
-                    # Parse available languages
-                    lang_pattern = r'"languageCode":"([^"]+)".*?"name":\{"simpleText":"([^"]+)"'
-                    languages = re.findall(lang_pattern, captions_data)
-                    
-                    return [
-                        {
-                            'language_code': lang[0],
-                            'language_name': lang[1],
-                            'auto_generated': 'auto-generated' in lang[1].lower()
-                        }
-                        for lang in languages
-                    ]
+            # Transcript list from the video page
+            page = self.get_watch_page(video_id)
+            if page is not None and page.caption_tracks:
+                return page.available_languages
         
         except Exception as e:
             print(f"Error getting available transcripts: {e}")
@@ -157,6 +246,12 @@ class YouTubeTranscriptService:
         return [{'language_code': 'en', 'language_name': 'English', 'auto_generated': True}]
     
     def extract_transcript(self, video_id: str, language_code: str = 'en') -> Dict:
+        return transcript_flight.do(
+            f'transcript:{video_id}:{language_code}',
+            lambda: self._extract_transcript(video_id, language_code),
+        )
+
+    def _extract_transcript(self, video_id: str, language_code: str) -> Dict:
         fallbacks = []
         # Try youtube-transcript-api
         try:
@@ -308,8 +403,12 @@ class YouTubeTranscriptService:
         Extract using direct YouTube API calls
         """
         try:
-            # Try several timedtext endpoint variants to maximize chance of getting captions
-            candidates = [
+            # Try several timedtext endpoint variants to maximize chance of getting captions,
+            # starting with the caption track URL listed on the watch page
+            page = self.get_watch_page(video_id)
+            caption_url = page.caption_url(language_code) if page is not None else ''
+            candidates = [caption_url] if caption_url else []
+            candidates += [
                 f"{self.transcript_api_base}?lang={language_code}&v={video_id}",
                 f"{self.transcript_api_base}?v={video_id}",
                 f"{self.transcript_api_base}?tlang={language_code}&v={video_id}",
@@ -394,14 +493,10 @@ class YouTubeTranscriptService:
         """
         try:
             # This is a simplified version - in production you'd want more robust scraping
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self._make_request(video_url)
-            # record response for debugging
-            if response:
-                self._record_response(response, video_url)
+            page = self.get_watch_page(video_id)
 
-            if response and response.status_code == 200:
-                content = response.text
+            if page is not None:
+                content = page.html
                 
                 # Look for transcript data in the page source
                 # This is a simplified pattern - real implementation would be more complex
@@ -484,7 +579,7 @@ class YouTubeTranscriptService:
             if not url:
                 continue
             try:
-                r = requests.get(url, headers=self.headers, timeout=15)
+                r = get_session().get(url, headers=self.headers, timeout=15)
                 if r.status_code != 200 or not r.content.strip():
                     continue
                 text = r.content.decode('utf-8', errors='replace')
@@ -547,26 +642,9 @@ class YouTubeTranscriptService:
         Extract video chapters/timestamps if available
         """
         try:
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self._make_request(video_url)
-            # record response for debugging
-            if response:
-                self._record_response(response, video_url)
-
-            if response and response.status_code == 200:
-                content = response.text
-                
-                # Look for chapters data
-                chapters_pattern = r'"macroMarkersListItemRenderer".*?"timeDescription":\{"simpleText":"([^"]+)".*?"title":\{"simpleText":"([^"]+)"'
-                chapters = re.findall(chapters_pattern, content)
-                
-                return [
-                    {
-                        'timestamp': chapter[0],
-                        'title': chapter[1]
-                    }
-                    for chapter in chapters
-                ]
+            page = self.get_watch_page(video_id)
+            if page is not None:
+                return page.chapters
                 
         except Exception as e:
             print(f"Error extracting chapters: {e}")
@@ -584,18 +662,33 @@ class YouTubeTranscriptService:
                 'error': 'Invalid YouTube URL',
                 'url': video_url
             }
-        
-        # Get metadata
-        metadata = self.get_video_metadata(video_id)
-        
-        # Get available transcripts
+
+        result = transcript_flight.do(
+            f'complete:{video_id}:{language_code}',
+            lambda: self._extract_complete_video_data(video_id, video_url, language_code),
+        )
+        # A coalesced result may come from a caller that used another URL form
+        return {**result, 'url': video_url}
+
+    def _extract_complete_video_data(self, video_id: str, video_url: str, language_code: str) -> Dict:
+        # oEmbed metadata and the transcript don't depend on each other or on
+        # the watch page, so they run alongside the page fetch; the page is
+        # fetched once and shared by languages, chapters and caption fallbacks
+        pool = _get_extraction_pool()
+        metadata_future = pool.submit(self.get_video_metadata, video_id)
+        transcript_future = pool.submit(self.extract_transcript, video_id, language_code)
+
+        # Get available transcripts and chapters (one watch page fetch)
         available_transcripts = self.get_available_transcripts(video_id)
-        
-        # Extract transcript
-        transcript_data = self.extract_transcript(video_id, language_code)
-        
-        # Get chapters
         chapters = self.get_video_chapters(video_id)
+
+        metadata = metadata_future.result()
+        transcript_data = transcript_future.result()
+
+        # oEmbed has no duration; the watch page does
+        page = self.get_watch_page(video_id)
+        if not metadata.get('duration') and page is not None and page.duration:
+            metadata['duration'] = page.duration
         
         return {
             'success': transcript_data.get('success', False),
@@ -5,9 +5,28 @@ echo "Starting EduReach Backend..."
 # Run database migrations (don't exit on error)
 python manage.py migrate --noinput || echo "Migration failed, continuing..."
 
+# Table for the shared cache when REDIS_URL isn't set (no-op if it exists)
+python manage.py createcachetable || echo "Cache table creation failed, continuing..."
+
 # Collect static files (don't exit on error)
 python manage.py collectstatic --noinput || echo "Static files collection failed, continuing..."
 
+# SERVER_MODE=asgi runs Uvicorn workers with the async AI/YouTube views, so
+# slow provider calls wait on the event loop instead of holding a thread.
+# ASYNC_BLOCKING_THREADS sizes the pool for blocking work (YouTube extraction, Gemini SDK).
+if [ "$SERVER_MODE" = "asgi" ]; then
+    echo "Starting Gunicorn with Uvicorn workers (ASGI)..."
+    export ASYNC_VIEWS=True
+    exec gunicorn edureach_project.asgi:application \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --bind 0.0.0.0:$PORT \
+        --workers 2 \
+        --timeout 120 \
+        --access-logfile - \
+        --error-logfile - \
+        --log-level info
+fi
+
 # Start Gunicorn (this must succeed)
 echo "Starting Gunicorn server..."
 exec gunicorn edureach_project.wsgi:application \
@@ -0,0 +1,250 @@
+"""
+AI usage metering against the tier limits in MonthlyUsage.get_tier_limits.
+
+With a Redis or memcached cache the hot path does not touch the database.
+Each (user, month) has a counter in the shared cache, seeded once from
+MonthlyUsage.ai_queries_used, which is incremented atomically to admit a
+query and decremented to refund it. Every worker increments the same
+counter, so a limit holds across processes. Admitted queries are also added
+to a per-process tally that a background thread flushes to MonthlyUsage
+every AI_USAGE_FLUSH_INTERVAL seconds (and at exit), with one ``F()`` update
+per user rather than a write per query.
+
+Other cache backends (the database cache used without REDIS_URL, local
+memory) can't increment atomically across workers, so there MonthlyUsage is
+the counter: a query is admitted by a conditional ``F()`` update that only
+matches while the user is under the limit. That is an UPDATE and a SELECT
+on every AI request, not batched; batched counting needs Redis (or
+memcached).
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import IntegrityError
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from services.periodic import PeriodicFlusher
+from .models import MonthlyUsage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 10  # seconds
+
+_pending = defaultdict(int)  # (user_id, month) -> queries not yet in MonthlyUsage
+_pending_lock = threading.Lock()
+
+# Backends whose incr/decr are atomic and seen by every worker
+_ATOMIC_COUNTER_BACKENDS = (
+    'django.core.cache.backends.redis',
+    'django.core.cache.backends.memcached',
+    'django_redis.cache',
+)
+
+
+def _counts_in_cache() -> bool:
+    return type(caches['default']).__module__ in _ATOMIC_COUNTER_BACKENDS
+
+
+def _month_start(now=None):
+    # Same period boundary as User.get_current_usage
+    return (now or timezone.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _counter_key(user_id, month) -> str:
+    return f"ai_usage:{user_id}:{month.strftime('%Y-%m')}"
+
+
+def _counter_timeout(month) -> int:
+    # Keep the counter a day past the end of its month
+    next_month = MonthlyUsage(month=month).resets_at
+    return max(60, int((next_month - timezone.now()).total_seconds()) + 24 * 60 * 60)
+
+
+def ai_query_limit(user):
+    """The user's monthly AI query limit (may be ``float('inf')``)."""
+    user.get_effective_tier()  # reverts an expired trial
+    return MonthlyUsage(user=user).get_tier_limits()['ai_queries']
+
+
+def _seed_counter(user_id, month, key):
+    used = MonthlyUsage.objects.filter(user_id=user_id, month=month).values_list('ai_queries_used', flat=True).first() or 0
+    with _pending_lock:
+        used += _pending.get((user_id, month), 0)
+    # add() keeps a counter another worker seeded first
+    cache.add(key, used, _counter_timeout(month))
+
+
+def _incr(user_id, month, delta: int) -> int:
+    key = _counter_key(user_id, month)
+    for _ in range(2):
+        try:
+            return cache.incr(key, delta) if delta >= 0 else cache.decr(key, -delta)
+        except ValueError:
+            # Not seeded yet (or evicted)
+            _seed_counter(user_id, month, key)
+    return cache.incr(key, delta) if delta >= 0 else cache.decr(key, -delta)
+
+
+def _reserve_in_db(user_id, month, count: int, limit):
+    """Admit ``count`` queries with one conditional update; ``(allowed, used)``."""
+    row = MonthlyUsage.objects.filter(user_id=user_id, month=month)
+    admit = row if limit == float('inf') else row.filter(ai_queries_used__lte=limit - count)
+    allowed = bool(admit.update(ai_queries_used=F('ai_queries_used') + count))
+    if not allowed:
+        # Over the limit, or the month's row doesn't exist yet (possibly being created by another worker)
+        MonthlyUsage.objects.get_or_create(user_id=user_id, month=month)
+        allowed = bool(admit.update(ai_queries_used=F('ai_queries_used') + count))
+    return allowed, row.values_list('ai_queries_used', flat=True).get()
+
+
+def _record(user_id, month, delta: int):
+    with _pending_lock:
+        _pending[(user_id, month)] += delta
+    _flusher.ensure_started()
+
+
+def reserve_ai_queries(user, count: int = 1):
+    """
+    Admit ``count`` AI queries for ``user`` if the tier limit allows.
+
+    Returns ``(allowed, used, limit)``; ``used`` includes the admitted queries.
+    """
+    limit = ai_query_limit(user)
+    month = _month_start()
+    if not _counts_in_cache():
+        allowed, used = _reserve_in_db(user.pk, month, count, limit)
+        return allowed, used, limit
+    used = _incr(user.pk, month, count)
+    if used > limit:
+        _incr(user.pk, month, -count)
+        return False, used - count, limit
+    _record(user.pk, month, count)
+    return True, used, limit
+
+
+def refund_ai_queries(user, count: int = 1):
+    """Give back queries reserved for a request that did not get an answer."""
+    month = _month_start()
+    if not _counts_in_cache():
+        MonthlyUsage.objects.filter(user_id=user.pk, month=month).update(
+            ai_queries_used=Greatest(F('ai_queries_used') - count, Value(0))
+        )
+        return
+    _incr(user.pk, month, -count)
+    _record(user.pk, month, -count)
+
+
+def ai_queries_used(user) -> int:
+    """This month's AI queries for ``user``, including ones not flushed yet."""
+    month = _month_start()
+    if not _counts_in_cache():
+        return MonthlyUsage.objects.filter(user_id=user.pk, month=month).values_list('ai_queries_used', flat=True).first() or 0
+    key = _counter_key(user.pk, month)
+    used = cache.get(key)
+    if used is None:
+        _seed_counter(user.pk, month, key)
+        used = cache.get(key, 0)
+    return used
+
+
+def flush_ai_usage():
+    """Write this process's pending counts to MonthlyUsage."""
+    with _pending_lock:
+        pending = {key: delta for key, delta in _pending.items() if delta}
+        _pending.clear()
+
+    for (user_id, month), delta in pending.items():
+        try:
+            updated = MonthlyUsage.objects.filter(user_id=user_id, month=month).update(
+                ai_queries_used=Greatest(F('ai_queries_used') + delta, Value(0))
+            )
+            if not updated:
+                try:
+                    MonthlyUsage.objects.create(user_id=user_id, month=month, ai_queries_used=max(delta, 0))
+                except IntegrityError:
+                    # Another worker created the row first
+                    MonthlyUsage.objects.filter(user_id=user_id, month=month).update(
+                        ai_queries_used=Greatest(F('ai_queries_used') + delta, Value(0))
+                    )
+        except Exception as e:
+            logger.warning(f"AI usage flush failed for user {user_id}, will retry: {e}")
+            with _pending_lock:
+                _pending[(user_id, month)] += delta
+    return len(pending)
+
+
+_flusher = PeriodicFlusher(
+    'ai-usage-flush',
+    flush_ai_usage,
+    lambda: getattr(settings, 'AI_USAGE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+)
+
+
+def quota_exceeded_payload(used, limit) -> dict:
+    return {
+        'error': 'Monthly AI query limit reached for your plan',
+        'type': 'AIQuotaExceeded',
+        'used': used,
+        'limit': limit,
+        'resets_at': MonthlyUsage(month=_month_start()).resets_at.isoformat(),
+    }
+
+
+def ai_limits_enabled() -> bool:
+    return getattr(settings, 'AI_USAGE_LIMITS_ENABLED', True)
+
+
+def _request_of(args):
+    # (self, request, ...) for ViewSet actions, (request, ...) for function views
+    return args[1] if isinstance(args[0], APIView) else args[0]
+
+
+def ai_metered(view):
+    """
+    Meter an AI view as one query: 429 once the user's monthly quota is used
+    up, and a refund when the view answers with an error status.
+
+    Works on sync and async function views and on ViewSet actions.
+    """
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            if not ai_limits_enabled():
+                return await view(*args, **kwargs)
+            user = _request_of(args).user
+            allowed, used, limit = await sync_to_async(reserve_ai_queries)(user)
+            if not allowed:
+                return JsonResponse(quota_exceeded_payload(used, limit), status=429)
+            response = await view(*args, **kwargs)
+            if response.status_code >= 400:
+                await sync_to_async(refund_ai_queries)(user)
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ai_limits_enabled():
+            return view(*args, **kwargs)
+        user = _request_of(args).user
+        allowed, used, limit = reserve_ai_queries(user)
+        if not allowed:
+            return Response(quota_exceeded_payload(used, limit), status=429)
+        response = view(*args, **kwargs)
+        if response.status_code >= 400:
+            refund_ai_queries(user)
+        return response
+
+    return wrapper